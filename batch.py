@@ -0,0 +1,480 @@
+import os
+import time
+import random
+import asyncio
+import argparse
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from main import (
+    World, WorldConfig, FrameClock, Camera, Level, LevelLayout, ArrayLevel, Bonus, SpawnTable, sweep,
+    XWIN, YWIN, HALF_XWIN, HALF_YWIN, FPS, PLAYER_SIZE, PLAYER_MAX_SPEED, PLAYER_MAX_FALL_SPEED,
+    PLAYER_START_SPEED, PLAYER_ACCEL, PLAYER_DECCEL, MONSTER_SIZE, BULLET_SIZE, METRE,
+)
+
+PLAYER_START = (int(HALF_XWIN) - PLAYER_SIZE[0]//2, int(HALF_YWIN) + int(HALF_YWIN)//2)
+
+def _rect_round(values):
+    # pygame.Rect rounds float coordinates half away from zero
+    return np.trunc(values + np.copysign(0.5, values)).astype(np.int64)
+
+def _fall(velocity, gravity, dt, limit):
+    # main.fall over every world at once, in the same order of operations
+    free = velocity * dt + gravity * dt * (dt + 1) / 2
+    capped = velocity + gravity * dt > limit
+    if not capped.any():
+        return free, velocity + gravity * dt
+    reach = np.maximum(limit - velocity, 0) / gravity
+    clamped = velocity * reach + gravity * reach * (reach + 1) / 2 + limit * (dt - reach)
+    return np.where(capped, clamped, free), np.where(capped, limit, velocity + gravity * dt)
+
+def _rows(mask):
+    # the worlds to work on: a slice when it is all of them, so indexing makes views
+    return slice(None) if mask.all() else np.flatnonzero(mask)
+
+def _overlap(left, top, right, bottom, x, y, w, h):
+    return (left < x + w) & (right > x) & (top < y + h) & (bottom > y)
+
+class _LayoutSource:
+    # what LevelLayout reads from its level, one per batch slot
+    def __init__(self, config):
+        self.rng = random.Random()
+        self.platform_size = config.platform_size
+        self.distance_min, self.distance_max = config.platform_distance_gap
+        self.spawns = SpawnTable.for_config(config)
+
+# N worlds with the rules of main.World, stepped together. Each state field is
+# an array with one row per world; platforms are [N, max_platform_number] in
+# generation order like Level.platforms, bullets [N, capacity] in Level's
+# swap-remove order. The common path (gravity, steering, wrap, monster patrol,
+# bullet flight, camera) is vectorized; the rare events that Level resolves
+# in list order (landings, monster hits) are replayed per world in the same
+# order, so every world matches a main.World fed the same input exactly.
+# Only the rows of live worlds are worked on. Platform rows still come from
+# each world's own LevelLayout and random.Random, one at a time, which is
+# most of what a step costs now; --compare prints both rates.
+class BatchWorld:
+    PLATFORM_COLUMNS = {
+        "platform_x": "int64", "platform_y": "int64",
+        "breakable": "bool", "breaking": "bool", "break_start": "int64", "bonus": "bool",
+        "monster": "bool", "monster_x": "int64", "monster_carry": "float64", "monster_dir": "int64",
+        "monster_dead": "bool", "monster_death": "int64", "pending": "bool",
+    }
+    BULLET_COLUMNS = {
+        "bullet_x": "int64", "bullet_y": "int64", "bullet_carry": "float64", "bullet_id": "int64",
+    }
+
+    def __init__(self, n, config=None, sim_hz=FPS, bullet_capacity=8):
+        self.n = n
+        self.config = config or WorldConfig()
+        self.clock = FrameClock(sim_hz)
+        camera = Camera(self.clock)
+        self.center = camera.center
+        self.follow = 1 - (1 - 1 / camera.lerp) ** self.clock.scale
+        self.capacity = self.config.max_platform_number
+        self.layouts = [LevelLayout(_LayoutSource(self.config)) for _ in range(n)]
+        self.__next_bullet_id = 0
+        self.__bullets_to_remove = [[] for _ in range(n)]
+
+        self.x = np.zeros(n, np.int64)
+        self.y = np.zeros(n, np.int64)
+        self.carry_x = np.zeros(n)
+        self.carry_y = np.zeros(n)
+        self.vx = np.zeros(n)
+        self.vy = np.zeros(n)
+        self.input = np.zeros(n, np.int64)
+        self.last_shot = np.zeros(n, np.int64)
+        self.dead = np.ones(n, bool)
+        self.camera_y = np.zeros(n, np.int64)
+        self.camera_carry = np.zeros(n)
+        self.maxheight = np.zeros(n, np.int64)
+        self.frame = np.zeros(n, np.int64)
+        self.ticks = np.zeros(n, np.int64)
+        self.score = np.zeros(n, np.int64)
+        self.count = np.zeros(n, np.int64)
+        self.bullet_count = np.zeros(n, np.int64)
+        for name, dtype in self.PLATFORM_COLUMNS.items():
+            setattr(self, name, np.zeros((n, self.capacity), dtype))
+        for name, dtype in self.BULLET_COLUMNS.items():
+            setattr(self, name, np.zeros((n, bullet_capacity), dtype))
+
+    def reset(self, seeds, worlds=None):
+        worlds = np.arange(self.n) if worlds is None else np.asarray(worlds, np.int64)
+        self.x[worlds], self.y[worlds] = PLAYER_START
+        self.carry_x[worlds] = self.carry_y[worlds] = 0.0
+        self.vx[worlds] = self.vy[worlds] = 0.0
+        self.input[worlds] = 0
+        self.last_shot[worlds] = -self.config.bullet_cooldown
+        self.dead[worlds] = False
+        self.camera_y[worlds] = 0
+        self.camera_carry[worlds] = 0.0
+        self.maxheight[worlds] = self.center
+        self.frame[worlds] = self.ticks[worlds] = 0
+        self.score[worlds] = 0
+        self.count[worlds] = 0
+        self.bullet_count[worlds] = 0
+        for w, seed in zip(worlds.tolist(), seeds):
+            self.__bullets_to_remove[w].clear()
+            layout = self.layouts[w]
+            layout.level.rng.seed(seed)
+            layout.reset()
+        self._add_platforms(worlds, 1)
+
+    def step(self, direction, shoot=None):
+        # direction -1/0/1 and shoot per world, as Player.move and Player.shoot
+        # take them; returns which worlds are still alive
+        active = ~self.dead
+        self._act(active, np.broadcast_to(np.asarray(direction, np.int64), (self.n,)), shoot)
+        self._update_player(active)
+        self._update_level(active)
+        self.frame[active] += 1
+        self.ticks[active] = (self.frame[active] * self.clock.frame_duration).astype(np.int64)
+        alive = active & ~self.dead
+        self._follow(alive)
+        return alive
+
+    def _act(self, active, direction, shoot):
+        turn = active & (direction != self.input)
+        steer = turn & (direction != 0)
+        self.vx[steer] = direction[steer] * PLAYER_START_SPEED
+        self.input[turn] = direction[turn]
+        if shoot is None:
+            return
+        fire = active & np.broadcast_to(np.asarray(shoot, bool), (self.n,))
+        fire &= self.ticks - self.last_shot >= self.config.bullet_cooldown
+        if fire.any():
+            worlds = np.flatnonzero(fire)
+            self.last_shot[worlds] = self.ticks[worlds]
+            self._add_bullets(
+                worlds, self.x[worlds] + PLAYER_SIZE[0]//2 - BULLET_SIZE[0]//2, self.y[worlds]
+            )
+
+    def _add_bullets(self, worlds, x, y):
+        slots = self.bullet_count[worlds]
+        needed = int(slots.max()) + 1
+        if needed > self.bullet_x.shape[1]:
+            for name in self.BULLET_COLUMNS:
+                old = getattr(self, name)
+                new = np.zeros((self.n, max(needed, old.shape[1] * 2)), old.dtype)
+                new[:, :old.shape[1]] = old
+                setattr(self, name, new)
+        self.bullet_x[worlds, slots] = x
+        self.bullet_y[worlds, slots] = y
+        self.bullet_carry[worlds, slots] = 0.0
+        self.bullet_id[worlds, slots] = np.arange(self.__next_bullet_id, self.__next_bullet_id + len(worlds))
+        self.__next_bullet_id += len(worlds)
+        self.bullet_count[worlds] += 1
+
+    def _add_platforms(self, worlds, needed):
+        rows = []
+        for w in worlds.tolist():
+            layout = self.layouts[w]
+            for slot in range(int(self.count[w]), needed):
+                rows.append((w, slot, *layout.next_row()))
+        if not rows:
+            return
+        w, slot, x, y, bonus, breakable, monster = (np.array(column) for column in zip(*rows))
+        self.platform_x[w, slot], self.platform_y[w, slot] = x, y
+        self.breakable[w, slot], self.breaking[w, slot] = breakable, False
+        self.break_start[w, slot] = self.ticks[w]
+        self.bonus[w, slot] = bonus & ~breakable
+        self.monster[w, slot] = monster & ~breakable
+        self.monster_x[w, slot], self.monster_carry[w, slot] = x, 0.0
+        self.monster_dir[w, slot], self.monster_dead[w, slot], self.monster_death[w, slot] = 1, False, 0
+        self.pending[w, slot] = False
+        self.count[worlds] = needed
+
+    def _update_player(self, active):
+        dt = self.clock.scale
+        self.dead |= active & (self.y - self.camera_y > YWIN * 2)
+        worlds = _rows(active & ~self.dead)
+        x0, y0, carry_x, carry_y = self.x[worlds], self.y[worlds], self.carry_x[worlds], self.carry_y[worlds]
+        vx, vy, steer = self.vx[worlds], self.vy[worlds], self.input[worlds]
+        gravity = self.config.gravity
+        rise = vy + gravity / 2
+        dy, vy = _fall(vy, gravity, dt, PLAYER_MAX_FALL_SPEED)
+        steering = steer != 0
+        coasting = ~steering & (vx != 0)
+        vx = np.where(steering, vx + steer * PLAYER_ACCEL * dt, vx)
+        vx = np.where(coasting, vx - np.copysign(1, vx) * PLAYER_DECCEL * dt, vx)
+        vx = np.maximum(np.minimum(vx, PLAYER_MAX_SPEED), -PLAYER_MAX_SPEED)
+        width = XWIN - PLAYER_SIZE[0]
+        exact_x = np.mod(x0 + carry_x + vx * dt, width)
+        exact_y = y0 + carry_y + dy
+        x, y = _rect_round(exact_x), _rect_round(exact_y)
+        # where a step that goes over the top of the jump reaches it, as in Player.update
+        over = (rise < 0) & (rise + gravity * dt > 0)
+        t = np.where(over, -rise / (gravity or 1), 0)
+        apex_x = np.where(over, _rect_round(np.mod(x0 + carry_x + vx * t, width)), x0)
+        apex_y = np.where(over, _rect_round(y0 + carry_y + rise * t / 2), y0)
+        self.vx[worlds], self.vy[worlds] = vx, vy
+        self.carry_x[worlds], self.carry_y[worlds] = exact_x - x, exact_y - y
+        self.x[worlds], self.y[worlds] = x, y
+        # swept from where the step started, straight down after a wrap, as Player.collisions does
+        start_x = np.where(np.abs(x - x0) >= HALF_XWIN, x, x0)
+        apex_x = np.where(np.abs(x - apex_x) >= HALF_XWIN, x, apex_x)
+        self._collisions(worlds, start_x, y0, apex_x, apex_y)
+
+    def _collisions(self, worlds, start_x, start_y, apex_x, apex_y):
+        w, h = PLAYER_SIZE
+        pw, ph = self.config.platform_size
+        x, y = self.x[worlds], self.y[worlds]
+        # the box around both ends of the move holds the whole swept path; only
+        # worlds where it touches something go through the exact sweep
+        path = (
+            np.minimum(np.minimum(start_x, apex_x), x)[:, None],
+            np.minimum(np.minimum(start_y, apex_y), y)[:, None],
+            np.maximum(np.maximum(start_x, apex_x), x)[:, None] + w,
+            np.maximum(start_y, y)[:, None] + h,
+        )
+        px, py = self.platform_x[worlds], self.platform_y[worlds]
+        valid = np.arange(self.capacity) < self.count[worlds, None]
+        bonus_x, bonus_y = px + pw//2 - Bonus.WIDTH//2, py - Bonus.HEIGHT
+        touching = (
+            _overlap(*path, px, py, pw, ph)
+            | (self.bonus[worlds] & _overlap(*path, bonus_x, bonus_y, Bonus.WIDTH, Bonus.HEIGHT))
+            | (self.monster[worlds] & ~self.monster_dead[worlds]
+               & _overlap(*path, self.monster_x[worlds], py - MONSTER_SIZE[1], *MONSTER_SIZE))
+        )
+        ids = np.arange(self.n)[worlds]
+        for i in np.flatnonzero((touching & valid).any(axis=1)).tolist():
+            self._resolve_collisions(int(ids[i]), int(start_x[i]), int(start_y[i]), int(apex_x[i]), int(apex_y[i]))
+
+    def _resolve_collisions(self, w, start_x, start_y, apex_x, apex_y):
+        # Player.collisions for one world, over the rows Level.query returns
+        width, height = PLAYER_SIZE
+        pw, ph = self.config.platform_size
+        start = pygame.Rect(start_x, start_y, width, height)
+        drop = pygame.Rect(apex_x, apex_y, width, height)
+        rect = pygame.Rect(int(self.x[w]), int(self.y[w]), width, height)
+        dx, dy = rect.x - start.x, rect.y - start.y
+        top = min(start.top, drop.top, rect.top) - height - Level.REACH
+        bottom = max(start.bottom, rect.bottom)
+        rows = [r for r in range(int(self.count[w])) if top - ph < self.platform_y[w, r] < bottom + Level.REACH]
+        if self.vy[w] > 0.5:
+            first = landing = None
+            for r in rows:
+                px, py = int(self.platform_x[w, r]), int(self.platform_y[w, r])
+                targets = [(pygame.Rect(px, py, pw, ph), False)]
+                if self.bonus[w, r]:
+                    bonus = pygame.Rect(px + pw//2 - Bonus.WIDTH//2, py - Bonus.HEIGHT, Bonus.WIDTH, Bonus.HEIGHT)
+                    targets.insert(0, (bonus, True))
+                for target, bonus in targets:
+                    t = sweep(drop, rect.x - drop.x, rect.y - drop.y, target)
+                    if t is not None and (first is None or t < first):
+                        first, landing = t, (r, target, bonus)
+            if landing:
+                r, target, bonus = landing
+                rect.bottom = target.top
+                self.carry_y[w] = 0.0
+                if bonus:
+                    self.vy[w] = -self.config.player_bonus_jumpforce
+                else:
+                    self.vy[w] = -self.config.player_jumpforce
+                    if self.breakable[w, r] and not self.breaking[w, r]:
+                        self.breaking[w, r] = True
+                        self.break_start[w, r] = self.ticks[w]
+                dx, dy = rect.x - start.x, rect.y - start.y
+        for r in rows:
+            if self.monster[w, r] and not self.monster_dead[w, r]:
+                monster = pygame.Rect(int(self.monster_x[w, r]), int(self.platform_y[w, r]) - MONSTER_SIZE[1], *MONSTER_SIZE)
+                if sweep(start, dx, dy, monster) is not None:
+                    self.dead[w] = True
+                    break
+        self.y[w] = rect.y
+
+    def _apply_removals(self, active):
+        valid = np.arange(self.capacity) < self.count[:, None]
+        removing = active & (self.pending & valid).any(axis=1)
+        if removing.any():
+            worlds = np.flatnonzero(removing)
+            keep = valid[worlds] & ~self.pending[worlds]
+            order = np.argsort(~keep, axis=1, kind="stable")
+            for name in self.PLATFORM_COLUMNS:
+                column = getattr(self, name)
+                column[worlds] = np.take_along_axis(column[worlds], order, axis=1)
+            self.count[worlds] = keep.sum(axis=1)
+            self.pending[worlds] = False
+        # swap-remove in the order Level queued them, as ArrayLevel does
+        for w in np.flatnonzero(active).tolist():
+            queue = self.__bullets_to_remove[w]
+            if not queue:
+                continue
+            count = int(self.bullet_count[w])
+            position = {int(b): i for i, b in enumerate(self.bullet_id[w, :count])}
+            for bullet_id in queue:
+                i = position.pop(bullet_id)
+                count -= 1
+                if i != count:
+                    for name in self.BULLET_COLUMNS:
+                        column = getattr(self, name)
+                        column[w, i] = column[w, count]
+                    position[int(self.bullet_id[w, i])] = i
+            self.bullet_count[w] = count
+            queue.clear()
+
+    def _update_level(self, active):
+        self._apply_removals(active)
+        worlds = _rows(active)
+        valid = np.arange(self.capacity) < self.count[worlds, None]
+        now = self.ticks[worlds, None]
+        scale = self.clock.scale
+        start_x = self.platform_x[worlds]
+
+        monster, dead, direction = self.monster[worlds], self.monster_dead[worlds], self.monster_dir[worlds]
+        patrolling = valid & monster & ~dead
+        exact = self.monster_x[worlds] + self.monster_carry[worlds] + np.where(
+            patrolling, direction * self.config.monster_speed * scale, 0.0
+        )
+        monster_x = _rect_round(exact)
+        self.monster_carry[worlds] = np.where(valid, exact - monster_x, self.monster_carry[worlds])
+        monster_x = self.monster_x[worlds] = np.where(valid, monster_x, self.monster_x[worlds])
+        right = patrolling & (monster_x > start_x + self.config.platform_size[0] - MONSTER_SIZE[0])
+        left = patrolling & ~right & (monster_x < start_x)
+        direction[right] = -1
+        direction[left] = 1
+        self.monster_dir[worlds] = direction
+        self.monster[worlds] = monster & ~(
+            valid & dead & (now - self.monster_death[worlds] >= ArrayLevel.MONSTER_LINGER)
+        )
+
+        broken = self.breaking[worlds] & (
+            (now - self.break_start[worlds]) // ArrayLevel.BREAK_FRAME_DURATION >= ArrayLevel.BREAK_FRAMES - 1
+        )
+        below = self.platform_y[worlds] - self.camera_y[worlds, None] + self.config.platform_size[1] > YWIN
+        self.pending[worlds] |= valid & (broken | below)
+
+        self._update_bullets(active)
+        self._add_platforms(np.flatnonzero(active & (self.count < self.capacity)), self.capacity)
+
+    def _update_bullets(self, active):
+        # only the worlds with bullets in flight, and only as many columns as the most of them
+        worlds = np.flatnonzero(active & (self.bullet_count > 0))
+        if not len(worlds):
+            return
+        width = int(self.bullet_count[worlds].max())
+        live = np.arange(width) < self.bullet_count[worlds, None]
+        previous = self.bullet_y[worlds, :width]
+        exact = previous + self.bullet_carry[worlds, :width] + self.config.bullet_speed * self.clock.scale
+        bullet_y = np.where(live, _rect_round(exact), previous)
+        self.bullet_carry[worlds, :width] = np.where(live, exact - bullet_y, self.bullet_carry[worlds, :width])
+        self.bullet_y[worlds, :width] = bullet_y
+        done = live & (bullet_y - self.camera_y[worlds, None] < -50)
+
+        count = self.count[worlds]
+        rows = int(count.max())
+        valid = np.arange(rows) < count[:, None]
+        targets = valid & self.monster[worlds, :rows] & ~self.monster_dead[worlds, :rows]
+        bx = self.bullet_x[worlds, :width, None]
+        # swept over the span between the previous and new y, as Bullet.update does
+        path_top = np.minimum(previous, bullet_y)[:, :, None]
+        path_bottom = np.maximum(previous, bullet_y)[:, :, None] + BULLET_SIZE[1]
+        mx = self.monster_x[worlds, None, :rows]
+        my = self.platform_y[worlds, None, :rows] - MONSTER_SIZE[1]
+        hits = (
+            live[:, :, None] & targets[:, None, :]
+            & (bx < mx + MONSTER_SIZE[0]) & (bx + BULLET_SIZE[0] > mx)
+            & (path_top < my + MONSTER_SIZE[1]) & (path_bottom > my)
+        )
+        # a monster only absorbs the first bullet that reaches it
+        for i, b in zip(*np.nonzero(hits.any(axis=2))):
+            w = worlds[i]
+            for r in np.flatnonzero(hits[i, b]):
+                if not self.monster_dead[w, r]:
+                    self.monster_dead[w, r] = True
+                    self.monster_death[w, r] = self.ticks[w]
+                    done[i, b] = True
+                    break
+        for i in np.flatnonzero(done.any(axis=1)).tolist():
+            w = worlds[i]
+            self.__bullets_to_remove[w].extend(self.bullet_id[w, :width][done[i]].tolist())
+
+    def _follow(self, alive):
+        self.maxheight = np.where(alive & (self.y < self.maxheight), self.y, self.maxheight)
+        y = self.camera_y + self.camera_carry
+        y = y - ((y + self.center) - self.maxheight) * self.follow
+        camera_y = _rect_round(y)
+        self.camera_carry = np.where(alive, y - camera_y, self.camera_carry)
+        self.camera_y = np.where(alive, camera_y, self.camera_y)
+        self.score = np.where(alive, -self.camera_y // METRE, self.score)
+
+def random_actions(n, frames, seed):
+    # held arrow keys that change now and then, plus the odd shot
+    rng = np.random.default_rng(seed)
+    change = rng.random((frames, n)) < 0.05
+    change[0] = True
+    picks = rng.integers(-1, 2, (frames, n))
+    held = np.maximum.accumulate(np.where(change, np.arange(frames)[:, None], 0), axis=0)
+    direction = np.take_along_axis(picks, held, axis=0)
+    shoot = rng.random((frames, n)) < 0.05
+    return direction, shoot
+
+def run_batch(n, frames, seed, direction, shoot, sim_hz):
+    batch = BatchWorld(n, sim_hz=sim_hz)
+    batch.reset(range(seed, seed + n))
+    steps = 0
+    start = time.perf_counter()
+    for frame in range(frames):
+        steps += int((~batch.dead).sum())
+        if not batch.step(direction[frame], shoot[frame]).any():
+            break
+    return batch, steps, time.perf_counter() - start
+
+async def run_worlds(n, frames, seed, direction, shoot, sim_hz):
+    pygame.display.set_mode((1, 1))
+    world = World(sim_hz=sim_hz)
+    results = []
+    steps = 0
+    start = time.perf_counter()
+    for i in range(n):
+        world.reset(seed + i)
+        player = world.player
+        alive = True
+        frame = 0
+        while alive and frame < frames:
+            player.move(int(direction[frame, i]))
+            if shoot[frame, i]:
+                player.shoot()
+            alive = await world.step()
+            frame += 1
+        steps += frame
+        results.append((world.score, frame, world.player.rect.topleft, world.camera.state.y))
+    return results, steps, time.perf_counter() - start
+
+def differences(batch, results):
+    # worlds whose run_worlds result (score, frames, player topleft, camera y) the batch does not match
+    return [
+        i for i, (score, frames, topleft, camera_y) in enumerate(results)
+        if (score, frames, topleft, camera_y) != (
+            int(batch.score[i]), int(batch.frame[i]), (int(batch.x[i]), int(batch.y[i])), int(batch.camera_y[i])
+        )
+    ]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Step many worlds at once with random input")
+    parser.add_argument("--worlds", type=int, default=256)
+    parser.add_argument("--frames", type=int, default=FPS * 60, help="frame limit per world")
+    parser.add_argument("--seed", type=int, default=0, help="first level seed; worlds use consecutive seeds")
+    parser.add_argument("--sim-hz", type=int, default=FPS)
+    parser.add_argument("--compare", action="store_true",
+                        help="also play every world one by one with main.World and check the results match")
+    args = parser.parse_args(argv)
+
+    direction, shoot = random_actions(args.worlds, args.frames, args.seed)
+    batch, steps, elapsed = run_batch(args.worlds, args.frames, args.seed, direction, shoot, args.sim_hz)
+    print(f"batch:  {args.worlds} worlds, {steps} steps in {elapsed:.2f}s ({steps / elapsed:.0f} steps/s), "
+          f"score mean {batch.score.mean():.1f}")
+    if args.compare:
+        results, steps, elapsed = asyncio.run(
+            run_worlds(args.worlds, args.frames, args.seed, direction, shoot, args.sim_hz)
+        )
+        print(f"worlds: {args.worlds} worlds, {steps} steps in {elapsed:.2f}s ({steps / elapsed:.0f} steps/s)")
+        mismatches = differences(batch, results)
+        print(f"{len(mismatches)} of {args.worlds} worlds differ" + (f": {mismatches[:10]}" if mismatches else ""))
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
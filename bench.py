@@ -0,0 +1,403 @@
+import os
+import sys
+import gc
+import json
+import itertools
+import time
+import random
+import platform
+import statistics
+import asyncio
+import argparse
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from pygame.locals import KEYDOWN, KEYUP, K_LEFT, K_RIGHT, K_SPACE
+
+from main import (
+    Game, Replay, PhaseTimer, PROFILE_PHASES, ArrayLevel, Platform, Bullet, Bonus, Monster, GameState, SpawnTable,
+    TextureTarget,
+    FPS, XWIN, YWIN, PLATFORM_SIZE, BULLET_SIZE,
+)
+
+PHASES = PROFILE_PHASES + ("frame",)
+PLATFORM_COUNTS = (10, 100, 1000, 10000)
+SPAWN_KINDS = (2, 8, 32, 128)
+BULLET_COUNTS = (0, 10, 100, 1000)
+
+def make_corpus(directory, count, frames, seed):
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    for i in range(count):
+        replay = Replay(rng.getrandbits(32))
+        replay.frames = frames
+        held = None
+        frame = 0
+        while frame < frames:
+            key = rng.choice((K_LEFT, K_RIGHT, None))
+            if held != key:
+                if held:
+                    replay.add(frame, pygame.event.Event(KEYUP, key=held))
+                if key:
+                    replay.add(frame, pygame.event.Event(KEYDOWN, key=key))
+                held = key
+            if rng.random() < 0.2:
+                replay.add(frame, pygame.event.Event(KEYDOWN, key=K_SPACE))
+            frame += rng.randint(FPS // 4, FPS * 2)
+        path = os.path.join(directory, f"corpus-{i:02d}.djr")
+        replay.save(path)
+        print(f"wrote {path} ({len(replay.events)} events, seed {replay.seed})")
+
+async def bench_replays(paths, repeat, render):
+    game = Game(headless=True)
+    results = {}
+    total = PhaseTimer()
+    for path in paths:
+        replay = Replay.load(path)
+        game.replay = replay
+        timer = PhaseTimer()
+        for _ in range(repeat):
+            game.profiler = timer
+            stats = await game.simulate(replay.frames, render=render)
+        for phase, values in timer.samples.items():
+            total.samples.setdefault(phase, []).extend(values)
+        results[path] = {"frames": stats["frames"], "score": stats["score"], "phases": timer.summary()}
+    game.profiler = None
+    return results, total.summary()
+
+async def bench_alloc(frames, interval, seed):
+    game = Game(headless=True)
+    rng = random.Random(seed)
+    keys = (K_LEFT, K_RIGHT, None)
+    held = None
+    samples = []
+    tracemalloc.start()
+    collections = [s["collections"] for s in gc.get_stats()]
+    for frame in range(frames):
+        if game.game_state != GameState.PLAYING:
+            game.reset(rng.getrandbits(32))
+            held = None
+        if frame % (FPS // 4) == 0:
+            key = rng.choice(keys)
+            if held:
+                game.player.handle_event(pygame.event.Event(KEYUP, key=held))
+            if key:
+                game.player.handle_event(pygame.event.Event(KEYDOWN, key=key))
+            held = key
+            game.player.handle_event(pygame.event.Event(KEYDOWN, key=K_SPACE))
+        await game._update_loop()
+        if frame % interval == 0:
+            current, peak = tracemalloc.get_traced_memory()
+            gcs = [s["collections"] - c for s, c in zip(gc.get_stats(), collections)]
+            samples.append({"frame": frame, "traced_bytes": current, "peak_bytes": peak, "gc_collections": gcs})
+    tracemalloc.stop()
+    pools = {cls.__name__: cls.pool.stats() for cls in (Platform, Monster, Bonus, Bullet)}
+    return samples, pools
+
+def measure(fn, setup=None, min_time=0.2, min_rounds=3, max_rounds=1000):
+    times = []
+    spent = 0.0
+    while len(times) < min_rounds or (spent < min_time and len(times) < max_rounds):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        times.append(elapsed)
+        spent += elapsed
+    mean = statistics.fmean(times)
+    return {
+        "min": min(times),
+        "max": max(times),
+        "mean": mean,
+        "stddev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "median": statistics.median(times),
+        "rounds": len(times),
+        "ops": 1 / mean if mean else 0.0,
+    }
+
+class Suite:
+    def __init__(self, max_platforms, max_bullets, seed=0):
+        self.game = Game(headless=True)
+        self.platform_counts = [n for n in PLATFORM_COUNTS if n <= max_platforms]
+        self.bullet_counts = [n for n in BULLET_COUNTS if n <= max_bullets]
+        self.seed = seed
+        self.results = []
+        self.loop = asyncio.new_event_loop()
+
+    def populate(self, platforms, bullets=0):
+        game = self.game
+        game.reset(self.seed)
+        game.lvl.max_platforms = platforms
+        self.loop.run_until_complete(game.lvl._generation())
+        self.refill_bullets(bullets)
+
+    def refill_bullets(self, bullets):
+        lvl = self.game.lvl
+        lvl.clear_bullets()
+        for i in range(bullets):
+            lvl.add_bullet(Bullet.spawn(self.game.world, i * 7 % (XWIN - BULLET_SIZE[0]), YWIN - i % YWIN))
+
+    def record(self, case, params, stats):
+        name = case + "[" + "-".join(f"{k}={v}" for k, v in params.items()) + "]"
+        self.results.append({"group": case, "name": name, "params": params, "stats": stats})
+        print(f"{name:<48} mean {stats['mean'] * 1000:10.4f} ms  "
+              f"median {stats['median'] * 1000:10.4f} ms  rounds {stats['rounds']}")
+
+    def platform_construction(self):
+        for n in self.platform_counts:
+            self.populate(10)
+            built = []
+            def build():
+                for i in range(n):
+                    built.append(Platform.spawn(self.game.world, i % (XWIN - PLATFORM_SIZE[0]), -i * 100, *PLATFORM_SIZE))
+            def release():
+                for platform in built:
+                    platform.release()
+                built.clear()
+            self.record("platform_construction", {"platforms": n}, measure(build, setup=release))
+
+    def level_update(self):
+        for n in self.platform_counts:
+            self.populate(n)
+            lvl = self.game.lvl
+            self.record("level_update", {"platforms": n}, measure(lambda: self.loop.run_until_complete(lvl.update())))
+
+    def player_collisions(self):
+        for n in self.platform_counts:
+            self.populate(n)
+            player = self.game.player
+            def fall():
+                player.reset()
+                player.rect.y = -YWIN
+                player._velocity.y = 5
+                player._previous = (player.rect.x, player.rect.y - 5)
+            self.record("player_collisions", {"platforms": n}, measure(player.collisions, setup=fall))
+
+    def bullet_update(self):
+        for n in self.platform_counts:
+            for b in self.bullet_counts:
+                self.populate(n)
+                bullets = self.game.lvl.bullets
+                def update():
+                    for bullet in list(bullets):
+                        bullet.update()
+                self.record("bullet_update", {"platforms": n, "bullets": b},
+                            measure(update, setup=lambda: self.refill_bullets(b)))
+
+    def level_draw(self):
+        for n in self.platform_counts:
+            for b in self.bullet_counts:
+                self.populate(n, b)
+                lvl, window = self.game.lvl, self.game.window
+                self.record("level_draw", {"platforms": n, "bullets": b}, measure(lambda: lvl.draw(window)))
+
+    def background_draw(self):
+        self.populate(10)
+        background, window = self.game.background, self.game.window
+        # camera pixels per frame; the compositor's work should follow this
+        for speed in (0, 2, 8, 32):
+            offsets = itertools.count(0, -speed)
+            self.record("background_draw", {"speed": speed},
+                        measure(lambda: background.draw(window, next(offsets))))
+
+    def frame(self):
+        game = self.game
+        for n in self.platform_counts:
+            for b in self.bullet_counts:
+                self.populate(n, b)
+                def revive():
+                    if len(game.lvl.bullets) < b:
+                        self.refill_bullets(b)
+                    game.player.dead = False
+                    game.game_state = GameState.PLAYING
+                def step():
+                    self.loop.run_until_complete(game._update_loop())
+                    game._render_loop()
+                self.record("frame", {"platforms": n, "bullets": b}, measure(step, setup=revive))
+
+    def level_backend(self):
+        game = self.game
+        original = game.lvl
+        for backend in ("object", "array"):
+            game.world.level = original if backend == "object" else ArrayLevel(game.world)
+            for n in self.platform_counts:
+                for b in (0, 100):
+                    if b > self.bullet_counts[-1]:
+                        continue
+                    self.populate(n, b)
+                    lvl = game.lvl
+                    def step():
+                        self.loop.run_until_complete(lvl.update())
+                        lvl.draw(game.window)
+                    self.record("level_backend", {"backend": backend, "platforms": n, "bullets": b},
+                                measure(step, setup=lambda: self.refill_bullets(b)))
+            self.loop.run_until_complete(game.lvl.layout.stop())
+        game.world.level = original
+
+    def render_backend(self):
+        # a whole frame drawn and presented; the renderer is SDL's software one without a GPU
+        game = self.game
+        target = TextureTarget(hidden=True)
+        for backend in ("surface", "renderer"):
+            window = game.window if backend == "surface" else target
+            present = pygame.display.update if backend == "surface" else target.present
+            for n in self.platform_counts:
+                for b in (0, 100):
+                    if b > self.bullet_counts[-1]:
+                        continue
+                    self.populate(n, b)
+                    # the camera moves a little each frame, the sprites stay on screen
+                    offsets = itertools.cycle((0, -4))
+                    def draw():
+                        game.camera.view_y = next(offsets)
+                        game.draw_frame(window)
+                        present()
+                    self.record("render_backend", {"backend": backend, "platforms": n, "bullets": b},
+                                measure(draw))
+        target.close()
+
+    def world_snapshot(self):
+        world = self.game.world
+        for n in self.platform_counts:
+            self.populate(n, min(10, self.bullet_counts[-1]))
+            data = world.snapshot()
+            self.record("world_snapshot", {"platforms": n, "bytes": len(data)}, measure(world.snapshot))
+            self.record("world_restore", {"platforms": n}, measure(lambda: world.restore(data)))
+
+    def spawn_table(self):
+        # 1000 platforms from tables with more and more kinds; the cost should not follow
+        import numpy as np
+        rng = random.Random(self.seed)
+        metres = [rng.randrange(2000) for _ in range(1000)]
+        uniforms = [rng.random() for _ in range(1000)]
+        metres_array, uniforms_array = np.array(metres), np.array(uniforms)
+        for kinds in SPAWN_KINDS:
+            table = SpawnTable({
+                "kind": {f"kind{i}": [[0, i + 1], [1000, kinds - i]] for i in range(kinds)},
+                "bonus": {"none": 10, "bonus": 1},
+                "monster": {"none": 15, "monster": {"weight": 1, "not_with": ["kind0"]}},
+            })
+            def each():
+                for m, u in zip(metres, uniforms):
+                    table.sample(m, u)
+            self.record("spawn_table", {"kinds": kinds, "mode": "each"}, measure(each))
+            self.record("spawn_table", {"kinds": kinds, "mode": "bulk"},
+                        measure(lambda: table.sample_many(metres_array, uniforms_array)))
+
+    CASES = (
+        "platform_construction", "level_update", "player_collisions", "bullet_update",
+        "level_draw", "background_draw", "frame", "level_backend", "render_backend", "world_snapshot",
+        "spawn_table",
+    )
+
+    def run(self, cases):
+        for case in cases:
+            getattr(self, case)()
+
+    def close(self):
+        self.loop.run_until_complete(self.game.world.close())
+        self.loop.close()
+
+    def report(self):
+        return {
+            "machine_info": {
+                "python_version": platform.python_version(),
+                "pygame_version": pygame.version.ver,
+                "machine": platform.machine(),
+                "system": platform.system(),
+            },
+            "datetime": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "benchmarks": self.results,
+        }
+
+def compare(baseline_path, current_path):
+    with open(baseline_path) as f:
+        baseline = {b["name"]: b["stats"] for b in json.load(f)["benchmarks"]}
+    with open(current_path) as f:
+        current = {b["name"]: b["stats"] for b in json.load(f)["benchmarks"]}
+    for name, stats in current.items():
+        if name in baseline:
+            ratio = stats["median"] / baseline[name]["median"]
+            print(f"{name:<48} {baseline[name]['median'] * 1000:10.4f} ms -> "
+                  f"{stats['median'] * 1000:10.4f} ms  x{ratio:.2f}")
+
+def print_summary(title, summary):
+    print(title)
+    print(f"  {'phase':<8} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for phase in PHASES:
+        if phase in summary:
+            s = summary[phase]
+            print(f"  {phase:<8} {s['p50']:9.4f} {s['p90']:9.4f} {s['p99']:9.4f} {s['max']:9.4f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Doodle Jump benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    corpus = commands.add_parser("make-corpus", help="generate synthetic replays to benchmark against")
+    corpus.add_argument("directory")
+    corpus.add_argument("--count", type=int, default=5)
+    corpus.add_argument("--frames", type=int, default=FPS * 60)
+    corpus.add_argument("--seed", type=int, default=0)
+
+    replay = commands.add_parser("replay", help="replay a corpus and report per-phase frame times")
+    replay.add_argument("replays", nargs="+")
+    replay.add_argument("--repeat", type=int, default=1)
+    replay.add_argument("--no-render", dest="render", action="store_false",
+                        help="skip drawing, time the simulation only")
+    replay.add_argument("--json", metavar="PATH", help="write the results as JSON")
+
+    suite = commands.add_parser("suite", help="run the micro and macro benchmark suite")
+    suite.add_argument("--case", dest="cases", action="append", choices=Suite.CASES,
+                       help="case to run, may be repeated (default: all)")
+    suite.add_argument("--max-platforms", type=int, default=PLATFORM_COUNTS[-1])
+    suite.add_argument("--max-bullets", type=int, default=BULLET_COUNTS[-1])
+    suite.add_argument("--json", metavar="PATH", help="write the results as JSON")
+
+    alloc = commands.add_parser("alloc", help="track allocations and GC over a long headless session")
+    alloc.add_argument("--frames", type=int, default=FPS * 60 * 10)
+    alloc.add_argument("--interval", type=int, default=FPS * 30)
+    alloc.add_argument("--seed", type=int, default=0)
+    alloc.add_argument("--json", metavar="PATH", help="write the samples as JSON")
+
+    diff = commands.add_parser("compare", help="compare two suite JSON files by median time")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+
+    args = parser.parse_args(argv)
+    if args.command == "make-corpus":
+        make_corpus(args.directory, args.count, args.frames, args.seed)
+    elif args.command == "replay":
+        results, summary = asyncio.run(bench_replays(args.replays, args.repeat, args.render))
+        for path, result in results.items():
+            print_summary(f"{path}: {result['frames']} frames, score {result['score']} m", result["phases"])
+        print_summary("all replays", summary)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump({"replays": results, "summary": summary}, f, indent=2)
+    elif args.command == "suite":
+        suite = Suite(args.max_platforms, args.max_bullets)
+        suite.run(args.cases or Suite.CASES)
+        suite.close()
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(suite.report(), f, indent=2)
+    elif args.command == "alloc":
+        samples, pools = asyncio.run(bench_alloc(args.frames, args.interval, args.seed))
+        print(f"{'frame':>8} {'traced KiB':>11} {'peak KiB':>9}  gc collections (gen0, gen1, gen2)")
+        for sample in samples:
+            print(f"{sample['frame']:8d} {sample['traced_bytes'] / 1024:11.1f} "
+                  f"{sample['peak_bytes'] / 1024:9.1f}  {sample['gc_collections']}")
+        for name, stats in pools.items():
+            print(f"{name:<9} created {stats['created']:6d}  reused {stats['reused']:8d}  free {stats['free']:5d}")
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump({"samples": samples, "pools": pools}, f, indent=2)
+    elif args.command == "compare":
+        compare(args.baseline, args.current)
+    pygame.quit()
+
+if __name__ == "__main__":
+    sys.exit(main())
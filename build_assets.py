@@ -0,0 +1,103 @@
+import os
+import json
+import math
+import shutil
+import argparse
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from main import MENU_ASSETS, GAMEPLAY_ASSETS, ATLAS_MANIFEST
+
+ATLAS_IMAGE = "atlas.png"
+BUNDLE_FILES = ("main.py",)
+
+def used_images():
+    # every (path, size) the game asks AssetCache for, in a stable order
+    return sorted({(path, size) for path, size, _ in MENU_ASSETS + GAMEPLAY_ASSETS})
+
+def unused_files(images, root="assets"):
+    used = {os.path.normpath(path) for path, _ in images}
+    return sorted(
+        os.path.normpath(os.path.join(directory, name))
+        for directory, _, names in os.walk(root) for name in names
+        if name.endswith(".png") and os.path.normpath(os.path.join(directory, name)) not in used
+    )
+
+def pack(sizes):
+    # shelf packing, tallest first; returns (width, height, positions)
+    width = max(max(w for w, _ in sizes), math.ceil(math.sqrt(sum(w * h for w, h in sizes))))
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    positions = [None] * len(sizes)
+    x = y = shelf = 0
+    for i in order:
+        w, h = sizes[i]
+        if x + w > width:
+            x, y, shelf = 0, y + shelf, 0
+        positions[i] = (x, y)
+        x += w
+        shelf = max(shelf, h)
+    return width, y + shelf, positions
+
+def build_atlas(images):
+    # scaled exactly as AssetCache.image would, so the atlas holds the same pixels
+    scaled = [pygame.transform.scale(pygame.image.load(path).convert_alpha(), size) for path, size in images]
+    width, height, positions = pack([size for _, size in images])
+    atlas = pygame.Surface((width, height), pygame.SRCALPHA)
+    entries = []
+    for (path, size), surface, (x, y) in zip(images, scaled, positions):
+        # MAX onto the cleared atlas copies alpha instead of blending it in
+        atlas.blit(surface, (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+        entries.append({"path": path.replace(os.sep, "/"), "size": list(size), "rect": [x, y, *size]})
+    return atlas, entries
+
+def quantize(path, colors):
+    try:
+        from PIL import Image
+    except ImportError:
+        print("Pillow is not installed; the atlas stays 32-bit RGBA")
+        return False
+    with Image.open(path) as image:
+        image.load()
+    image.quantize(colors, method=Image.Quantize.FASTOCTREE).save(path, optimize=True)
+    return True
+
+def file_size(paths):
+    return sum(os.path.getsize(path) for path in paths)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pack the images the game uses into one atlas for the web bundle")
+    parser.add_argument("--out", default=os.path.join("build", "bundle"),
+                        help="directory to stage the bundle in (default: %(default)s)")
+    parser.add_argument("--colors", type=int, default=256, help="palette size when quantizing")
+    parser.add_argument("--no-quantize", action="store_true", help="keep the atlas as 32-bit RGBA")
+    args = parser.parse_args(argv)
+
+    pygame.display.set_mode((1, 1))
+    images = used_images()
+    atlas, entries = build_atlas(images)
+    assets_dir = os.path.join(args.out, os.path.dirname(ATLAS_MANIFEST))
+    if os.path.isdir(assets_dir):
+        shutil.rmtree(assets_dir)
+    os.makedirs(assets_dir)
+    atlas_path = os.path.join(assets_dir, ATLAS_IMAGE)
+    pygame.image.save(atlas, atlas_path)
+    quantized = not args.no_quantize and quantize(atlas_path, args.colors)
+    with open(os.path.join(args.out, ATLAS_MANIFEST), "w") as f:
+        json.dump({"atlas": ATLAS_IMAGE, "quantized": quantized, "images": entries}, f, indent=1)
+    for name in BUNDLE_FILES:
+        shutil.copy(name, os.path.join(args.out, name))
+
+    dropped = unused_files(images)
+    sources = sorted({path for path, _ in images})
+    print(f"{len(entries)} images from {len(sources)} files packed into {atlas.get_width()}x{atlas.get_height()} "
+          f"{atlas_path} ({'quantized to ' + str(args.colors) + ' colors' if quantized else 'RGBA'})")
+    print(f"left out {len(dropped)} unreferenced files: {', '.join(os.path.relpath(p, 'assets') for p in dropped)}")
+    print(f"assets/: {file_size(sources + dropped) / 1024:.0f} KiB, used files {file_size(sources) / 1024:.0f} KiB, "
+          f"atlas + manifest {file_size([atlas_path, os.path.join(args.out, ATLAS_MANIFEST)]) / 1024:.0f} KiB")
+    print(f"bundle staged in {args.out}; build the web version with: pygbag {args.out}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import os
+import time
+import random
+import asyncio
+import argparse
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from main import Game, World, XWIN, YWIN, FPS, PLAYER_MAX_SPEED
+
+def surface_pixels(surface):
+    # The surface's own pixel memory as an (height, width, 3) RGB array, no
+    # copy. The array keeps the surface alive and locked: nothing can be
+    # blitted to or from it until the array is gone. None for pixel formats
+    # surfarray has no view of.
+    try:
+        return pygame.surfarray.pixels3d(surface).swapaxes(0, 1)
+    except ValueError:
+        return None
+
+# reset()/step() access to one game, driven by actions instead of key events.
+# "features" observations are a fresh float32 vector per step: the player
+# followed by one row per platform slot, in Level.platforms order. "pixels"
+# observations are the rendered frame (full size or downscaled) seen through
+# surface_pixels, or a grayscale buffer the env reuses. A grayscale
+# observation is overwritten by the next step, so copy it to keep it; a kept
+# RGB one stays as it is, as the env draws the next frame into another surface.
+# Game is a singleton, so only one pixel env per process.
+class DoodleJumpEnv:
+    ACTIONS = ("none", "left", "right", "shoot")
+    NONE, LEFT, RIGHT, SHOOT = range(4)
+    PLAYER_FEATURES = 5
+    PLATFORM_FEATURES = 8
+
+    def __init__(self, observation="features", config=None, sim_hz=FPS, frame_skip=1, max_steps=None,
+                 level_backend="object", size=None, grayscale=False, smooth=False):
+        if observation not in ("features", "pixels"):
+            raise ValueError(f"observation must be 'features' or 'pixels', not {observation!r}")
+        self.observation = observation
+        self.frame_skip = frame_skip
+        self.max_steps = max_steps
+        self.steps = 0
+        self.game = None
+        if observation == "pixels":
+            self.game = Game(headless=True, level_backend=level_backend, sim_hz=sim_hz, config=config)
+            self.world = self.game.world
+        else:
+            # entity images are converted for the display format, so a mode must be set
+            if not pygame.display.get_surface():
+                pygame.display.set_mode((1, 1))
+            self.world = World(config, sim_hz, level_backend)
+        self.slots = self.world.config.max_platform_number
+        self.feature_size = self.PLAYER_FEATURES + self.slots * self.PLATFORM_FEATURES
+        self.__loop = asyncio.new_event_loop()
+        self.__size = size
+        self.__grayscale = grayscale
+        self.__smooth = smooth
+        if self.game:
+            self.__setup_pixels()
+
+    def __setup_pixels(self):
+        window = self.game.window
+        self.__frame = pygame.Surface(self.__size or window.get_size(), 0, window)
+        self.__spare = None
+        # a downscaled frame is drawn full size here first; the window is left alone
+        self.__canvas = pygame.Surface(window.get_size(), 0, window) if self.__size else None
+        width, height = self.__frame.get_size()
+        self.__gray = np.empty((height, width), np.uint8)
+        self.__scratch = np.empty((2, height, width), np.uint16)
+
+    @property
+    def observation_shape(self):
+        if self.observation == "features":
+            return (self.feature_size,)
+        width, height = self.__frame.get_size()
+        return (height, width) if self.__grayscale else (height, width, 3)
+
+    def reset(self, seed=None):
+        if seed is None:
+            seed = random.getrandbits(32)
+        if self.game:
+            self.game.reset(seed)
+        else:
+            self.world.reset(seed)
+        self.steps = 0
+        return self._observe(), {"seed": seed, "score": 0, "frame": 0}
+
+    def step(self, action):
+        player = self.world.player
+        if action == self.SHOOT:
+            player.shoot()
+        else:
+            player.move((0, -1, 1)[action])
+        score = self.world.score
+        alive = self.__loop.run_until_complete(self._advance())
+        self.steps += 1
+        reward = self.world.score - score
+        truncated = alive and self.max_steps is not None and self.steps >= self.max_steps
+        info = {"score": self.world.score, "frame": self.world.clock.frame}
+        return self._observe(), reward, not alive, truncated, info
+
+    async def _advance(self):
+        for _ in range(self.frame_skip):
+            if not await self.world.step():
+                return False
+        return True
+
+    def _observe(self):
+        return self.pixels() if self.observation == "pixels" else self.features()
+
+    def features(self):
+        world = self.world
+        player = world.player
+        rect = player.rect
+        obs = np.zeros(self.feature_size, np.float32)
+        obs[:self.PLAYER_FEATURES] = (
+            rect.x / XWIN,
+            (rect.y - world.camera.state.y) / YWIN,
+            player._velocity.x / PLAYER_MAX_SPEED,
+            player._velocity.y / world.config.player_jumpforce,
+            player._input,
+        )
+        rows = obs[self.PLAYER_FEATURES:].reshape(self.slots, self.PLATFORM_FEATURES)
+        for row, platform in zip(rows, world.level.platforms):
+            monster = platform.monster
+            alive = monster is not None and not monster.dead
+            row[:] = (
+                1.0,
+                (platform.rect.centerx - rect.centerx) / XWIN,
+                (platform.rect.y - rect.bottom) / YWIN,
+                platform.breakable,
+                platform.breaking,
+                platform.bonus is not None,
+                alive,
+                (monster.rect.centerx - rect.centerx) / XWIN if alive else 0.0,
+            )
+        return obs
+
+    def pixels(self):
+        if not self.game:
+            raise RuntimeError("pixels need DoodleJumpEnv(observation='pixels')")
+        self.render()
+        rgb = surface_pixels(self.__frame)
+        if rgb is None:
+            rgb = pygame.surfarray.array3d(self.__frame).swapaxes(0, 1)
+        if not self.__grayscale:
+            return rgb
+        # ITU-R 601 luma in 8-bit fixed point; several times faster than
+        # pygame.transform.grayscale on a full-size frame
+        total, channel = self.__scratch
+        np.multiply(rgb[..., 0], 77, out=total, dtype=np.uint16)
+        np.multiply(rgb[..., 1], 150, out=channel, dtype=np.uint16)
+        total += channel
+        np.multiply(rgb[..., 2], 29, out=channel, dtype=np.uint16)
+        total += channel
+        np.right_shift(total, 8, out=total)
+        np.copyto(self.__gray, total, casting="unsafe")
+        return self.__gray
+
+    def render(self):
+        game = self.game
+        game.score_txt = game.score_hud.render(self.world.score)
+        game.camera.interpolate(1.0)
+        frame = self.__frame
+        if frame.get_locked():
+            # the caller kept the last observation, which still views this
+            # frame; draw into the other one, or a new one if that is kept too
+            spare = self.__spare
+            if spare is None or spare.get_locked():
+                spare = pygame.Surface(frame.get_size(), 0, frame)
+            self.__frame, self.__spare = spare, frame
+        if self.__canvas:
+            game.draw_frame(self.__canvas)
+            scale = pygame.transform.smoothscale if self.__smooth else pygame.transform.scale
+            scale(self.__canvas, self.__size, self.__frame)
+        else:
+            game.draw_frame(self.__frame)
+
+    def close(self):
+        # the level layout's lookahead task lives on this loop too
+        self.__loop.run_until_complete(self.world.close())
+        self.__loop.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Step the environment with random actions and report steps/s")
+    parser.add_argument("--observation", choices=("features", "pixels"), default="features")
+    parser.add_argument("--steps", type=int, default=10000)
+    parser.add_argument("--frame-skip", type=int, default=1)
+    parser.add_argument("--size", type=int, nargs=2, metavar=("W", "H"), help="downscale pixel observations")
+    parser.add_argument("--grayscale", action="store_true")
+    parser.add_argument("--smooth", action="store_true", help="filter when downscaling instead of sampling")
+    parser.add_argument("--level-backend", choices=("object", "array"), default="object")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    env = DoodleJumpEnv(args.observation, frame_skip=args.frame_skip, level_backend=args.level_backend,
+                        size=tuple(args.size) if args.size else None, grayscale=args.grayscale,
+                        smooth=args.smooth)
+    rng = random.Random(args.seed)
+    seed = args.seed
+    obs, info = env.reset(seed)
+    episodes = 0
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        obs, reward, terminated, truncated, info = env.step(rng.randrange(len(env.ACTIONS)))
+        if terminated or truncated:
+            episodes += 1
+            seed += 1
+            obs, info = env.reset(seed)
+    elapsed = time.perf_counter() - start
+    print(f"{args.steps} steps ({episodes} episodes) in {elapsed:.2f}s: {args.steps / elapsed:.0f} steps/s, "
+          f"observation {obs.dtype} {obs.shape}")
+    env.close()
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
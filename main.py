@@ -1,24 +1,35 @@
+import time
+
+STARTED = time.perf_counter()
+
 import pygame
 import sys
 import random
 import asyncio
 from math import copysign
+from collections import deque
 from pygame.math import Vector2
 from pygame.locals import (
-    KEYDOWN, KEYUP, K_LEFT, K_RIGHT, K_ESCAPE, K_RETURN, K_SPACE, QUIT
+    KEYDOWN, KEYUP, K_LEFT, K_RIGHT, K_ESCAPE, K_RETURN, K_SPACE, K_F3, QUIT, WINDOWCLOSE, SRCALPHA
 )
-from pygame.sprite import collide_rect
-from pygame.font import SysFont
 import os
 import math
+import struct
+import bisect
+import argparse
+import itertools
+import json
+import weakref
 
-pygame.init()
+np = None  # numpy is imported on demand by ArrayLevel
+video = None  # pygame._sdl2.video is imported on demand by TextureTarget
 
 XWIN, YWIN = 600, 800
 HALF_XWIN, HALF_YWIN = XWIN/2, YWIN/2
 DISPLAY = (XWIN, YWIN)
 FLAGS = 0
 FPS = 60
+MAX_FRAME_TIME = 0.25
 
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -30,6 +41,10 @@ FOREST_GREEN = (87, 189, 68)
 PLAYER_SIZE = (25, 35)
 PLAYER_COLOR = ANDROID_GREEN
 PLAYER_MAX_SPEED = 20
+PLAYER_MAX_FALL_SPEED = 100
+PLAYER_START_SPEED = 1.5
+PLAYER_ACCEL = 0.5
+PLAYER_DECCEL = 0.6
 PLAYER_JUMPFORCE = 20
 PLAYER_BONUS_JUMPFORCE = 70
 GRAVITY = 0.98
@@ -47,13 +62,36 @@ BULLET_COLOR = ANDROID_GREEN
 BULLET_SPEED = -15
 BULLET_COOLDOWN = 250
 
-LARGE_FONT = SysFont("", 128)
-SMALL_FONT = SysFont("arial", 24)
-
 MONSTER_SIZE = (30, 30)
 MONSTER_SPAWN_CHANCE = 15
 MONSTER_SPEED = 2
 
+# pixels climbed per metre of score
+METRE = 50
+# spawn weights that change with height are tabulated every this many metres
+SPAWN_BAND = 10
+# the row flags a spawn option can set, in LevelLayout row order
+SPAWN_FLAGS = ("bonus", "breakable", "monster")
+
+# image, size, scroll speed relative to the platforms, and the vertical
+# spacing of a layer's copies (None: the layer fills the screen and tiles)
+BACKGROUND_LAYERS = (
+    (os.path.join("assets", "junglebackground.png"), DISPLAY, 1.0, None),
+)
+
+# frame images (scaled to the size the animation is drawn at), milliseconds
+# per frame, whether it loops, and the color to fall back to without images
+ANIMATIONS = {
+    "trampoline": (
+        [os.path.join("assets", "trampoline", f"{name}.png") for name in ("trampoline", "trampoline-activate")],
+        150, False, GRAY,
+    ),
+    "break": (
+        [os.path.join("assets", "blocks", f"breakable-block-{i}.png") for i in range(4)],
+        50, False, PLATFORM_COLOR_LIGHT,
+    ),
+}
+
 class GameState:
     MENU = "menu"
     PLAYING = "playing"
@@ -61,7 +99,7 @@ class GameState:
 
 class Singleton:
     def __new__(cls, *args, **kwargs):
-        if not hasattr(cls, 'instance'):
+        if not isinstance(getattr(cls, 'instance', None), cls):
             cls.instance = super(Singleton, cls).__new__(cls)
         return cls.instance
 
@@ -73,19 +111,151 @@ class PlayerState:
     SHOOT = "shoot"
     SHOOT_JUMP = "shoot_jump"
 
+# written by build_assets.py; without it images are loaded and scaled one by one
+ATLAS_MANIFEST = os.path.join("assets", "atlas.json")
+
+class AssetCache:
+    def __init__(self, manifest=ATLAS_MANIFEST):
+        self.__surfaces = {}
+        self.__manifest = manifest
+        self.__atlas = None
+        self.__regions = None
+        self.hits = 0
+        self.misses = 0
+
+    def _atlas_region(self, path, size):
+        if self.__regions is None:
+            self.__regions = {}
+            if self.__manifest and os.path.exists(self.__manifest):
+                with open(self.__manifest) as f:
+                    manifest = json.load(f)
+                atlas_path = os.path.join(os.path.dirname(self.__manifest), manifest["atlas"])
+                self.__atlas = pygame.image.load(atlas_path).convert_alpha()
+                self.__regions = {
+                    (entry["path"], tuple(entry["size"])): pygame.Rect(entry["rect"])
+                    for entry in manifest["images"]
+                }
+        rect = self.__regions.get((path.replace(os.sep, "/"), size))
+        return self.__atlas.subsurface(rect) if rect else None
+
+    def image(self, path, size=None, alpha=True):
+        key = (path, size, alpha)
+        surface = self.__surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+        self.misses += 1
+        region = self._atlas_region(path, size) if size else None
+        if region is not None:
+            surface = region if alpha else region.convert()
+        elif size:
+            surface = pygame.transform.scale(self.image(path, alpha=alpha), size)
+        else:
+            surface = pygame.image.load(path)
+            surface = surface.convert_alpha() if alpha else surface.convert()
+        self.__surfaces[key] = surface
+        return surface
+
+    def surface(self, key, build):
+        surface = self.__surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = self.__surfaces[key] = build()
+        return surface
+
+    def solid(self, size, color):
+        def build():
+            surface = pygame.Surface(size)
+            surface.fill(color)
+            return surface.convert()
+        return self.surface(("solid", size, color), build)
+
+    def ellipse(self, size, color):
+        def build():
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.ellipse(surface, color, (0, 0, *size))
+            return surface
+        return self.surface(("ellipse", size, color), build)
+
+    def font(self, size, name=None):
+        # SysFont has to search the installed fonts, so named fonts are only
+        # looked up the first time something draws with them
+        def build():
+            if not pygame.font.get_init():
+                pygame.font.init()
+            return pygame.font.SysFont(name, size) if name else pygame.font.Font(None, size)
+        return self.surface(("font", name, size), build)
+
+    def sequence(self, name, size):
+        def build():
+            paths, frame_duration, loop, color = ANIMATIONS[name]
+            try:
+                frames = [self.image(path, size) for path in paths]
+            except pygame.error:
+                print(f"Couldn't load {name} animation images")
+                frames = [self.solid(size, color)] * len(paths)
+            return FrameSequence(frames, frame_duration, loop)
+        return self.surface(("sequence", name, size), build)
+
+    def preload(self, specs):
+        # one image at a time, yielding each path so the loading can be sliced
+        for path, size, alpha in specs:
+            self.image(path, size, alpha)
+            yield path
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "surfaces": len(self.__surfaces)}
+
+    def clear(self):
+        self.__surfaces.clear()
+        self.__atlas = None
+        self.__regions = None
+        self.hits = 0
+        self.misses = 0
+
+ASSETS = AssetCache()
+
+class Pool:
+    def __init__(self, cls):
+        self.cls = cls
+        self.free = []
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, *args, **kwargs):
+        if self.free:
+            obj = self.free.pop()
+            obj.__init__(*args, **kwargs)
+            self.reused += 1
+            return obj
+        self.created += 1
+        return self.cls(*args, **kwargs)
+
+    def release(self, obj):
+        self.free.append(obj)
+
+    def stats(self):
+        return {"created": self.created, "reused": self.reused, "free": len(self.free)}
+
 class MainMenu:
     def __init__(self):
-        self.title_font = pygame.font.Font(None, 74)
-        self.font = pygame.font.Font(None, 36)
+        self.title_font = ASSETS.font(74)
+        self.font = ASSETS.font(36)
         try:
-            self.bg_image = pygame.image.load(os.path.join("assets", "main_menu.png")).convert_alpha()
-            self.bg_image = pygame.transform.scale(self.bg_image, (XWIN, YWIN))
+            self.bg_image = ASSETS.image(*MENU_ASSETS[0])
         except pygame.error:
             self.bg_image = pygame.Surface(DISPLAY)
             self.bg_image.fill(WHITE)
         self.title = self.title_font.render("Doodle Jump", True, FOREST_GREEN)
         self.start_text = self.font.render("Press ENTER to Start", True, ANDROID_GREEN)
+        self.start_rect = self.start_text.get_rect(centerx=HALF_XWIN, centery=YWIN * 0.6)
+        self.start_text_faded = {}
         self.instruction_text = self.font.render("Use arrows to move, SPACE to shoot", True, GRAY)
+        self.background = self.bg_image.convert()
+        instruction_rect = self.instruction_text.get_rect(centerx=HALF_XWIN, centery=YWIN * 0.7)
+        self.background.blit(self.instruction_text, instruction_rect)
         self.title_y = YWIN // 4
         self.title_bounce = 0
         self.text_alpha = 255
@@ -98,71 +268,244 @@ class MainMenu:
             self.alpha_direction *= -1
             
     def draw(self, surface):
-        surface.blit(self.bg_image, (0, 0))
+        self.draw_background(surface)
+        self.draw_foreground(surface)
+
+    def draw_background(self, surface):
+        surface.blit(self.background, (0, 0))
+
+    def draw_foreground(self, surface):
         title_rect = self.title.get_rect(centerx=HALF_XWIN, centery=self.title_y + self.title_bounce)
         surface.blit(self.title, title_rect)
-        start_text_copy = self.start_text.copy()
-        start_text_copy.set_alpha(self.text_alpha)
-        start_rect = start_text_copy.get_rect(centerx=HALF_XWIN, centery=YWIN * 0.6)
-        surface.blit(start_text_copy, start_rect)
-        instruction_rect = self.instruction_text.get_rect(centerx=HALF_XWIN, centery=YWIN * 0.7)
-        surface.blit(self.instruction_text, instruction_rect)
+        start_text = self.start_text_faded.get(self.text_alpha)
+        if start_text is None:
+            start_text = self.start_text.copy()
+            start_text.set_alpha(self.text_alpha)
+            self.start_text_faded[self.text_alpha] = start_text
+        surface.blit(start_text, self.start_rect)
 
 class GameOverScreen:
     def __init__(self):
-        self.font_large = pygame.font.Font(None, 74)
-        self.font_small = pygame.font.Font(None, 36)
+        self.font_large = ASSETS.font(74)
+        self.font_small = ASSETS.font(36)
         self.title_y = YWIN // 3
-        self.score = 0
-        
-    def update(self, score):
-        self.score = score
-        
-    def draw(self, surface):
-        gradient = pygame.Surface(DISPLAY)
+        self.score = None
+        self.backdrop = None
+        self.screen = None
+        self.update(0)
+
+    def _render_backdrop(self):
+        backdrop = pygame.Surface(DISPLAY)
         for y in range(YWIN):
             color = pygame.Color(255, 255, 255)
             color.hsla = (120, 50, max(0, min(100 - (y / YWIN * 30), 100)), 100)
-            pygame.draw.line(gradient, color, (0, y), (XWIN, y))
-        surface.blit(gradient, (0, 0))
+            pygame.draw.line(backdrop, color, (0, y), (XWIN, y))
         game_over_text = self.font_large.render("Game Over!", True, FOREST_GREEN)
         shadow_text = self.font_large.render("Game Over!", True, (0, 0, 0, 128))
         text_rect = game_over_text.get_rect(centerx=HALF_XWIN, centery=self.title_y)
-        surface.blit(shadow_text, (text_rect.x + 3, text_rect.y + 3))
-        surface.blit(game_over_text, text_rect)
-        score_text = self.font_small.render(f"Final Score: {self.score} m", True, ANDROID_GREEN)
-        score_rect = score_text.get_rect(centerx=HALF_XWIN, centery=self.title_y + 80)
-        surface.blit(score_text, score_rect)
+        backdrop.blit(shadow_text, (text_rect.x + 3, text_rect.y + 3))
+        backdrop.blit(game_over_text, text_rect)
         restart_text = self.font_small.render("Press ENTER to Restart", True, GRAY)
         restart_rect = restart_text.get_rect(centerx=HALF_XWIN, centery=self.title_y + 140)
-        surface.blit(restart_text, restart_rect)
+        backdrop.blit(restart_text, restart_rect)
+        return backdrop
 
+    def update(self, score):
+        if score == self.score:
+            return
+        self.score = score
+        if self.backdrop is None:
+            self.backdrop = self._render_backdrop()
+        self.screen = self.backdrop.copy()
+        score_text = self.font_small.render(f"Final Score: {self.score} m", True, ANDROID_GREEN)
+        score_rect = score_text.get_rect(centerx=HALF_XWIN, centery=self.title_y + 80)
+        self.screen.blit(score_text, score_rect)
+
+    def draw(self, surface):
+        surface.blit(self.screen, (0, 0))
+
+class GlyphAtlas:
+    def __init__(self, font, color, characters="0123456789- m"):
+        self.glyphs = {c: font.render(c, True, color) for c in characters}
+        self.height = font.get_height()
+
+    def render(self, text):
+        glyphs = [self.glyphs[c] for c in text]
+        surface = pygame.Surface((sum(g.get_width() for g in glyphs), self.height), pygame.SRCALPHA)
+        x = 0
+        for glyph in glyphs:
+            # glyphs never overlap, so MAX copies their alpha instead of blending it twice
+            surface.blit(glyph, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            x += glyph.get_width()
+        return surface
+
+class ScoreHUD:
+    def __init__(self, font, color):
+        self.atlas = GlyphAtlas(font, color)
+        self.score = None
+        self.surface = None
+
+    def render(self, score):
+        if score != self.score:
+            self.score = score
+            self.surface = self.atlas.render(f"{score} m")
+        return self.surface
+
+class ParallaxLayer:
+    def __init__(self, image, factor, spacing=None):
+        self.factor = factor
+        self.spacing = spacing
+        if spacing is None:
+            # tiled a screen past one period, so any screen-high window is one blit
+            self.period = image.get_height()
+            self.strip = pygame.Surface((image.get_width(), self.period + YWIN)).convert()
+            for y in range(0, self.period + YWIN, self.period):
+                self.strip.blit(image, (0, y))
+            self.strip_y = 0
+        else:
+            # only the rows that have something on them
+            bounds = image.get_bounding_rect()
+            self.strip = image.subsurface(bounds)
+            self.strip_y = bounds.y
+            self.period = spacing
+        self.height = self.strip.get_height()
+
+    def offset(self, camera_y):
+        return math.floor(camera_y * self.factor)
+
+    def copies(self, offset):
+        # screen y of each copy of a spaced layer that reaches the screen
+        y = (self.strip_y - offset) % self.spacing
+        y -= -(-(y + self.height) // self.spacing) * self.spacing
+        while y < YWIN:
+            if y + self.height > 0:
+                yield y
+            y += self.spacing
+
+    def draw(self, surface, offset, top, bottom):
+        if self.spacing is None:
+            area = (0, (offset + top) % self.period, self.strip.get_width(), bottom - top)
+            surface.blit(self.strip, (0, top), area)
+        else:
+            for y in self.copies(offset):
+                if y < bottom and y + self.height > top:
+                    surface.blit(self.strip, (0, y))
+
+def merge_spans(spans):
+    merged = []
+    for top, bottom in sorted((max(top, 0), min(bottom, YWIN)) for top, bottom in spans):
+        if top >= bottom:
+            continue
+        if merged and top <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], bottom)
+        else:
+            merged.append([top, bottom])
+    return merged
+
+# Composites the layers into a persistent buffer. When the camera moves, the
+# buffer is scrolled along with the first (full screen) layer and only the
+# rows that changed are composited again: the ones scrolled in, and the ones
+# a layer moving at another speed has left or reached. The work per frame
+# follows the camera's speed instead of the screen's area.
 class Background:
-    def __init__(self):
-        try:
-            self.image = pygame.image.load(os.path.join("assets", "junglebackground.png")).convert()
-            self.image = pygame.transform.scale(self.image, (XWIN, YWIN))
-        except pygame.error:
-            self.image = pygame.Surface(DISPLAY)
-            self.image.fill(WHITE)
-        self.rect = self.image.get_rect()
-        
+    def __init__(self, layers=BACKGROUND_LAYERS):
+        self.layers = []
+        for path, size, factor, spacing in layers:
+            try:
+                image = ASSETS.image(path, size, alpha=spacing is not None)
+            except pygame.error:
+                if spacing is not None:
+                    continue
+                image = pygame.Surface(size)
+                image.fill(WHITE)
+            self.layers.append(ParallaxLayer(image, factor, spacing))
+        self.buffer = pygame.Surface(DISPLAY).convert()
+        self.rect = self.buffer.get_rect()
+        self.offsets = None
+        self.redrawn = 0
+
+    def update(self, camera_y):
+        offsets = [layer.offset(camera_y) for layer in self.layers]
+        previous, self.offsets = self.offsets, offsets
+        shift = previous[0] - offsets[0] if previous else YWIN
+        if abs(shift) >= YWIN:
+            spans = [(0, YWIN)]
+        else:
+            spans = []
+            if shift:
+                self.buffer.scroll(0, shift)
+                spans.append((0, shift) if shift > 0 else (YWIN + shift, YWIN))
+            for layer, old, new in zip(self.layers[1:], previous[1:], offsets[1:]):
+                if old - new != shift:
+                    spans.extend((y + shift, y + shift + layer.height) for y in layer.copies(old))
+                    spans.extend((y, y + layer.height) for y in layer.copies(new))
+        self.redrawn = 0
+        for top, bottom in merge_spans(spans):
+            self.redrawn += bottom - top
+            self.buffer.set_clip((0, top, XWIN, bottom - top))
+            for layer, offset in zip(self.layers, offsets):
+                layer.draw(self.buffer, offset, top, bottom)
+        self.buffer.set_clip(None)
+
     def draw(self, surface, camera_y=0):
-        rel_y = camera_y % self.rect.height
-        surface.blit(self.image, (0, rel_y - self.rect.height))
-        if rel_y < YWIN:
-            surface.blit(self.image, (0, rel_y))
+        if isinstance(surface, TextureTarget):
+            # layers are textures there: copying them is cheaper than
+            # uploading a buffer that changes whenever the camera moves
+            for layer in self.layers:
+                layer.draw(surface, layer.offset(camera_y), 0, YWIN)
+            return
+        self.update(camera_y)
+        surface.blit(self.buffer, (0, 0))
+
+class FrameClock:
+    def __init__(self, fps=FPS):
+        self.configure(fps)
+        self.frame = 0
+        self.ticks = 0
+        self.alpha = 1.0
+
+    def configure(self, fps):
+        self.fps = fps
+        self.frame_duration = 1000 / fps
+        # movement constants are per 1/FPS s frame; scale them to one step
+        self.scale = FPS / fps
+
+    def reset(self):
+        self.frame = 0
+        self.ticks = 0
+
+    def advance(self):
+        self.frame += 1
+        self.ticks = int(self.frame * self.frame_duration)
 
-class Camera(Singleton):
-    def __init__(self, lerp=5, width=XWIN, height=YWIN):
+    def get_ticks(self):
+        return self.ticks
+
+class Camera:
+    def __init__(self, clock, lerp=5, width=XWIN, height=YWIN):
+        self.clock = clock
         self.state = pygame.Rect(0, 0, width, height)
         self.lerp = lerp
         self.center = height // 2
         self.maxheight = self.center
+        self.previous_y = 0
+        self.view_y = 0
+        self.alpha = 1.0
+        self._carry = 0.0
 
     def reset(self):
         self.state.y = 0
         self.maxheight = self.center
+        self.previous_y = 0
+        self.view_y = 0
+        self._carry = 0.0
+
+    def save(self):
+        return self.state.y, self.maxheight, self.previous_y, self._carry
+
+    def load(self, y, maxheight, previous_y, carry):
+        self.state.y, self.maxheight, self.previous_y, self._carry = y, maxheight, previous_y, carry
+        self.view_y = y
 
     def apply_rect(self, rect):
         return rect.move((0, -self.state.topleft[1]))
@@ -170,25 +513,64 @@ class Camera(Singleton):
     def apply(self, target):
         return self.apply_rect(target.rect)
 
+    def interpolate(self, alpha):
+        self.alpha = alpha
+        self.view_y = self.previous_y + (self.state.y - self.previous_y) * alpha
+
+    def view(self, sprite):
+        # where to draw a sprite this frame, between its last two simulated positions
+        rect = sprite.rect
+        x0, y0 = sprite._previous
+        offset = round(self.view_y)
+        if (x0, y0) == rect.topleft:
+            return rect.move(0, -offset)
+        x = round(x0 + (rect.x - x0) * self.alpha) if abs(rect.x - x0) < HALF_XWIN else rect.x
+        y = round(y0 + (rect.y - y0) * self.alpha)
+        return rect.move(x - rect.x, y - offset - rect.y)
+
     def update(self, target):
+        self.previous_y = self.state.y
         if target.y < self.maxheight:
             self.maxheight = target.y
-        speed = ((self.state.y + self.center) - self.maxheight) / self.lerp
-        self.state.y -= speed
+        follow = 1 - (1 - 1 / self.lerp) ** self.clock.scale
+        y = self.state.y + self._carry
+        y -= ((y + self.center) - self.maxheight) * follow
+        self.state.y = y
+        self._carry = y - self.state.y
 
 class Sprite:
-    def __init__(self, x, y, w, h, color):
+    __slots__ = ("__color", "_image", "rect", "camera_rect", "_previous", "_carry_x", "_carry_y", "world")
+
+    def __init__(self, x, y, w, h, color, world=None):
+        self.world = world
         self.__color = color
-        self._image = pygame.Surface((w, h))
-        self._image.fill(color)
-        self._image = self._image.convert()
+        self._image = ASSETS.solid((w, h), color)
         self.rect = pygame.Rect(x, y, w, h)
         self.camera_rect = self.rect.copy()
+        self._previous = self.rect.topleft
+        self._carry_x = self._carry_y = 0.0
+
+    @classmethod
+    def spawn(cls, *args, **kwargs):
+        return cls.pool.acquire(*args, **kwargs)
+
+    def release(self):
+        self.pool.release(self)
 
     @property
     def image(self):
         return self._image
 
+    @property
+    def position(self):
+        return self.rect.x + self._carry_x, self.rect.y + self._carry_y
+
+    def move_to(self, x, y):
+        # rect coordinates are ints; keep the sub-pixel rest for the next step
+        self.rect.x, self.rect.y = x, y
+        self._carry_x = x - self.rect.x
+        self._carry_y = y - self.rect.y
+
     @property
     def color(self):
         return self.__color
@@ -196,85 +578,128 @@ class Sprite:
     @color.setter
     def color(self, new):
         self.__color = new
-        self._image.fill(new)
+        self._image = ASSETS.solid(self.rect.size, new)
 
     def draw(self, surface):
-        if Camera.instance:
-            self.camera_rect = Camera.instance.apply(self)
+        if self.world:
+            self.camera_rect = self.world.camera.view(self)
             surface.blit(self._image, self.camera_rect)
         else:
             surface.blit(self._image, self.rect)
 
+def sweep(rect, dx, dy, target):
+    # Earliest fraction of the step, 0 to 1, at which rect moving by (dx, dy)
+    # overlaps target the way colliderect does, or None if it never does.
+    # Testing the whole path instead of where the step ends means nothing is
+    # stepped over, however far one step goes.
+    enter, leave = 0.0, 1.0
+    for start, size, delta, near, far in ((rect.x, rect.width, dx, target.x, target.right),
+                                         (rect.y, rect.height, dy, target.y, target.bottom)):
+        low, high = near - size - start, far - start
+        if not delta:
+            if not low < 0 < high:
+                return None
+            continue
+        low, high = low / delta, high / delta
+        if low > high:
+            low, high = high, low
+        enter, leave = max(enter, low), min(leave, high)
+        if enter >= leave:
+            return None
+    return enter
+
+def fall(velocity, gravity, dt, limit):
+    # Distance covered and speed reached over dt frames of gravity, capped at
+    # limit. The per-frame reference (v += g; y += v) traces the parabola
+    # y = (v + g/2)t + g t²/2 at whole frames, so following that curve keeps
+    # every jump the same height at any sim rate and 60 Hz unchanged.
+    if velocity >= limit:
+        return limit * dt, limit
+    if velocity + gravity * dt <= limit:
+        return velocity * dt + gravity * dt * (dt + 1) / 2, velocity + gravity * dt
+    reach = (limit - velocity) / gravity
+    return velocity * reach + gravity * reach * (reach + 1) / 2 + limit * (dt - reach), limit
+
 class Monster(Sprite):
-    def __init__(self, x, y, platform_width):
-        super().__init__(x, y, *MONSTER_SIZE, ANDROID_GREEN)
+    __slots__ = ("platform_width", "start_x", "direction", "speed", "dead", "death_time",
+                 "normal_image", "dead_image")
+
+    def __init__(self, world, x, y, platform_width):
+        super().__init__(x, y, *MONSTER_SIZE, ANDROID_GREEN, world)
         self.platform_width = platform_width
         self.start_x = x
         self.direction = 1
-        self.speed = MONSTER_SPEED
+        self.speed = world.config.monster_speed
         self.dead = False
+        self.death_time = 0
         try:
-            self.normal_image = pygame.image.load(
-                os.path.join("assets", "normalmonster", "monster.png")
-            ).convert_alpha()
-            self.dead_image = pygame.image.load(
-                os.path.join("assets", "normalmonster", "dead-monster.png")
-            ).convert_alpha()
-            self.normal_image = pygame.transform.scale(self.normal_image, MONSTER_SIZE)
-            self.dead_image = pygame.transform.scale(self.dead_image, MONSTER_SIZE)
+            self.normal_image = ASSETS.image(
+                os.path.join("assets", "normalmonster", "monster.png"), MONSTER_SIZE
+            )
+            self.dead_image = ASSETS.image(
+                os.path.join("assets", "normalmonster", "dead-monster.png"), MONSTER_SIZE
+            )
             self._image = self.normal_image
         except pygame.error:
             print("Couldn't load monster images")
     
     def kill(self):
         self.dead = True
-        self.death_time = pygame.time.get_ticks()
+        self.death_time = self.world.clock.get_ticks()
         self._image = self.dead_image
 
     def update(self):
+        self._previous = self.rect.topleft
         if not self.dead:
-            self.rect.x += self.direction * self.speed
+            x, y = self.position
+            self.move_to(x + self.direction * self.speed * self.world.clock.scale, y)
             if self.rect.x > self.start_x + self.platform_width - self.rect.width:
                 self.direction = -1
             elif self.rect.x < self.start_x:
                 self.direction = 1
 
 class Bullet(Sprite):
-    def __init__(self, x, y):
-        super().__init__(x, y, *BULLET_SIZE, BULLET_COLOR)
-        self.velocity = BULLET_SPEED
-        self._image = pygame.Surface(BULLET_SIZE, pygame.SRCALPHA)
-        pygame.draw.ellipse(self._image, ANDROID_GREEN, (0, 0, *BULLET_SIZE))
+    __slots__ = ("velocity", "index")
+
+    def __init__(self, world, x, y):
+        super().__init__(x, y, *BULLET_SIZE, BULLET_COLOR, world)
+        self.velocity = world.config.bullet_speed
+        self.index = -1
+        self._image = ASSETS.ellipse(BULLET_SIZE, ANDROID_GREEN)
 
     def update(self):
-        self.rect.y += self.velocity
-        lvl = Level.instance
-        if lvl:
-            for platform in lvl.platforms:
-                if platform.monster and not platform.monster.dead:
-                    if collide_rect(self, platform.monster):
-                        platform.monster.kill()
-                        lvl.remove_bullet(self)
-                        return
-        if self.camera_rect.y < -50:
+        self._previous = self.rect.topleft
+        x, y = self.position
+        self.move_to(x, y + self.velocity * self.world.clock.scale)
+        lvl = self.world.level
+        # bullets only move vertically, so the box between both ends is the swept path
+        path = self.rect.union(pygame.Rect(self._previous, self.rect.size))
+        for platform in lvl.query(path.top, path.bottom):
+            if platform.monster and not platform.monster.dead:
+                if path.colliderect(platform.monster.rect):
+                    platform.monster.kill()
+                    lvl.remove_bullet(self)
+                    return
+        if self.world.camera.apply(self).y < -50:
             lvl.remove_bullet(self)
 
-class Player(Sprite, Singleton):
-    def __init__(self, x, y, w, h, color):
-        Sprite.__init__(self, x, y, w, h, color)
+class Player(Sprite):
+    def __init__(self, world, x, y, w, h, color):
+        Sprite.__init__(self, x, y, w, h, color, world)
         self.__startrect = self.rect.copy()
-        self.__maxvelocity = Vector2(PLAYER_MAX_SPEED, 100)
-        self.__startspeed = 1.5
+        self.__maxvelocity = Vector2(PLAYER_MAX_SPEED, PLAYER_MAX_FALL_SPEED)
+        self.__startspeed = PLAYER_START_SPEED
         self._velocity = Vector2()
         self._input = 0
-        self._jumpforce = PLAYER_JUMPFORCE
-        self._bonus_jumpforce = PLAYER_BONUS_JUMPFORCE
-        self.gravity = GRAVITY
-        self.accel = 0.5
-        self.deccel = 0.6
+        self._jumpforce = world.config.player_jumpforce
+        self._bonus_jumpforce = world.config.player_bonus_jumpforce
+        self.gravity = world.config.gravity
+        self.accel = PLAYER_ACCEL
+        self.deccel = PLAYER_DECCEL
         self.dead = False
         self.facing_right = True
-        self.last_shoot_time = 0
+        self.cooldown = world.config.bullet_cooldown
+        self.last_shoot_time = -self.cooldown
         self.images = {}
         image_dir = os.path.join("assets", "player")
         for state in [PlayerState.IDLE_RIGHT, PlayerState.IDLE_LEFT, 
@@ -282,16 +707,14 @@ class Player(Sprite, Singleton):
                      PlayerState.SHOOT, PlayerState.SHOOT_JUMP]:
             path = os.path.join(image_dir, f"{state}.png")
             try:
-                img = pygame.image.load(path).convert_alpha()
-                img = pygame.transform.scale(img, (w, h))
-                self.images[state] = img
+                self.images[state] = ASSETS.image(path, (w, h))
             except pygame.error:
                 print(f"Couldn't load image: {path}")
                 self.images[state] = self._image
         self.current_state = PlayerState.IDLE_RIGHT
 
     def update_state(self):
-        shooting = pygame.time.get_ticks() - self.last_shoot_time < 200
+        shooting = self.world.clock.get_ticks() - self.last_shoot_time < 200
         jumping = abs(self._velocity.y) > 0.5
         if shooting:
             self.current_state = PlayerState.SHOOT_JUMP if jumping else PlayerState.SHOOT
@@ -309,171 +732,257 @@ class Player(Sprite, Singleton):
         self._velocity = Vector2()
         self.rect = self.__startrect.copy()
         self.camera_rect = self.__startrect.copy()
+        self._previous = self.rect.topleft
+        self._carry_x = self._carry_y = 0.0
         self.dead = False
+        self._input = 0
+        self.facing_right = True
+        self.last_shoot_time = -self.cooldown
+
+    def save(self):
+        return (self.rect.x, self.rect.y, self._carry_x, self._carry_y, *self._previous,
+                self._velocity.x, self._velocity.y, self._input, self.dead, self.facing_right,
+                self.last_shoot_time)
+
+    def load(self, x, y, carry_x, carry_y, previous_x, previous_y, vx, vy, direction, dead, facing_right,
+             last_shoot_time):
+        self.rect.topleft = x, y
+        self.camera_rect = self.rect.copy()
+        self._carry_x, self._carry_y = carry_x, carry_y
+        self._previous = previous_x, previous_y
+        self._velocity.update(vx, vy)
+        self._input = direction
+        self.dead = dead
+        self.facing_right = facing_right
+        self.last_shoot_time = last_shoot_time
 
     def shoot(self):
-        current_time = pygame.time.get_ticks()
-        if current_time - self.last_shoot_time >= BULLET_COOLDOWN:
+        current_time = self.world.clock.get_ticks()
+        if current_time - self.last_shoot_time >= self.cooldown:
             self.last_shoot_time = current_time
-            bullet = Bullet(self.rect.centerx - BULLET_SIZE[0]//2, self.rect.top)
-            Level.instance.add_bullet(bullet)
+            bullet = Bullet.spawn(self.world, self.rect.centerx - BULLET_SIZE[0]//2, self.rect.top)
+            self.world.level.add_bullet(bullet)
+
+    def move(self, direction):
+        # -1 left, 1 right, 0 to let go; what the arrow keys do
+        if direction == self._input:
+            return
+        if direction:
+            self._velocity.x = direction * self.__startspeed
+            self.facing_right = direction > 0
+        self._input = direction
 
     def handle_event(self, event):
         if event.type == KEYDOWN:
             if event.key == K_LEFT:
-                self._velocity.x = -self.__startspeed
-                self._input = -1
-                self.facing_right = False
+                self.move(-1)
             elif event.key == K_RIGHT:
-                self._velocity.x = self.__startspeed
-                self._input = 1
-                self.facing_right = True
+                self.move(1)
             elif event.key == K_SPACE:
                 self.shoot()
         elif event.type == KEYUP:
             if (event.key == K_LEFT and self._input == -1) or (event.key == K_RIGHT and self._input == 1):
-                self._input = 0
+                self.move(0)
 
     def jump(self, force=None):
         self._velocity.y = -force if force else -self._jumpforce
 
     def onCollide(self, obj):
         self.rect.bottom = obj.rect.top
+        self._carry_y = 0.0
         self.jump()
 
-    def collisions(self):
-        lvl = Level.instance
-        if not lvl: return
-        for platform in lvl.platforms:
-            if self._velocity.y > 0.5:
-                if platform.bonus and collide_rect(self, platform.bonus):
-                    self.onCollide(platform.bonus)
-                    self.jump(platform.bonus.force)
-                if collide_rect(self, platform):
-                    self.onCollide(platform)
+    def collisions(self, apex=None):
+        # Swept against the move from _previous, so a fast fall or a coarse
+        # timestep cannot carry the player through a platform or a monster.
+        # Of everything the path touches, the player lands on what it reaches
+        # first and only the path up to there can run into a monster.
+        # A step that went over the top of the jump at apex lands from there,
+        # on the way down, rather than along the chord under the arc.
+        lvl = self.world.level
+        rect = self.rect
+        start = pygame.Rect(self._previous, rect.size)
+        if abs(rect.x - start.x) >= HALF_XWIN:
+            # wrapped around the side; sweep straight down the new column
+            start.x = rect.x
+        drop = pygame.Rect(apex, rect.size) if apex else start
+        if abs(rect.x - drop.x) >= HALF_XWIN:
+            drop.x = rect.x
+        dx, dy = rect.x - start.x, rect.y - start.y
+        # landing can lift the player by its own height plus a bonus, so look that far above too
+        top = min(start.top, drop.top, rect.top) - rect.height - Level.REACH
+        platforms = lvl.query(top, max(start.bottom, rect.bottom))
+        if self._velocity.y > 0.5:
+            first = landing = None
+            for platform in platforms:
+                for target in (platform.bonus, platform):
+                    if target:
+                        t = sweep(drop, rect.x - drop.x, rect.y - drop.y, target.rect)
+                        if t is not None and (first is None or t < first):
+                            first, landing = t, (platform, target)
+            if landing:
+                platform, target = landing
+                self.onCollide(target)
+                if target is platform:
                     platform.onCollide()
+                else:
+                    self.jump(target.force)
+                dx, dy = rect.x - start.x, rect.y - start.y
+        for platform in platforms:
             if platform.monster and not platform.monster.dead:
-                if collide_rect(self, platform.monster):
+                if sweep(start, dx, dy, platform.monster.rect) is not None:
                     self.dead = True
                     return
 
     def update(self):
-        if self.camera_rect.y > YWIN * 2:
+        self._previous = self.rect.topleft
+        if self.world.camera.apply(self).y > YWIN * 2:
             self.dead = True
             return
-        self._velocity.y += self.gravity
+        dt = self.world.clock.scale
+        # speed the curve leaves the start of the step at; negative while rising
+        rise = self._velocity.y + self.gravity / 2
+        dy, self._velocity.y = fall(self._velocity.y, self.gravity, dt, self.__maxvelocity.y)
         if self._input:
-            self._velocity.x += self._input * self.accel
+            self._velocity.x += self._input * self.accel * dt
         elif self._velocity.x:
-            self._velocity.x -= copysign(1, self._velocity.x) * self.deccel
+            self._velocity.x -= copysign(1, self._velocity.x) * self.deccel * dt
         self._fix_velocity()
-        self.rect.x = (self.rect.x + self._velocity.x) % (XWIN - self.rect.width)
-        self.rect.y += self._velocity.y
-        self.collisions()
+        x, y = self.position
+        width = XWIN - self.rect.width
+        apex = None
+        if rise < 0 < rise + self.gravity * dt:
+            # the top of the jump is inside this step
+            t = -rise / self.gravity
+            apex = pygame.Rect(((x + self._velocity.x * t) % width, y + rise * t / 2), self.rect.size).topleft
+        self.move_to((x + self._velocity.x * dt) % width, y + dy)
+        self.collisions(apex)
 
     def draw(self, surface):
         self.update_state()
-        if Camera.instance:
-            self.camera_rect = Camera.instance.apply(self)
-            surface.blit(self.images[self.current_state], self.camera_rect)
-        else:
-            surface.blit(self.images[self.current_state], self.rect)
+        self.camera_rect = self.world.camera.view(self)
+        surface.blit(self.images[self.current_state], self.camera_rect)
 
-def chance(x):
-    return not random.randint(0, x)
+# The frames of one ANIMATIONS entry at one size, loaded once through
+# ASSETS.sequence and shared by every animation that plays them.
+class FrameSequence:
+    __slots__ = ("frames", "frame_duration", "loop")
 
-class Animation:
-    def __init__(self, frames, loop=True, frame_duration=100):
-        self.frames = frames
-        self.loop = loop
+    def __init__(self, frames, frame_duration, loop=False):
+        self.frames = tuple(frames)
         self.frame_duration = frame_duration
-        self.current_frame = 0
-        self.start_time = pygame.time.get_ticks()
-        self.finished = False
-        
-    def update(self):
-        if self.finished and not self.loop:
-            return self.frames[-1]
-        current_time = pygame.time.get_ticks()
-        elapsed = current_time - self.start_time
-        if self.loop:
-            self.current_frame = (elapsed // self.frame_duration) % len(self.frames)
-        else:
-            self.current_frame = min((elapsed // self.frame_duration), len(self.frames) - 1)
-            if self.current_frame == len(self.frames) - 1:
-                self.finished = True
-        return self.frames[self.current_frame]
+        self.loop = loop
+
+    def index(self, elapsed):
+        i = elapsed // self.frame_duration
+        return i % len(self.frames) if self.loop else min(i, len(self.frames) - 1)
+
+    def finished(self, elapsed):
+        return not self.loop and elapsed // self.frame_duration >= len(self.frames) - 1
+
+# One playing animation: a sequence and the tick it started on. Nothing is
+# stored per frame; the current frame follows from the clock when asked for.
+class AnimationHandle:
+    __slots__ = ("clock", "sequence", "start")
+
+    def __init__(self, clock, sequence):
+        self.clock = clock
+        self.sequence = sequence
+        self.start = clock.now
+
+    def restart(self):
+        self.start = self.clock.now
+
+    @property
+    def finished(self):
+        return self.sequence.finished(self.clock.now - self.start)
+
+    @property
+    def frame(self):
+        return self.sequence.frames[self.sequence.index(self.clock.now - self.start)]
+
+# Time for every animation in a world. World ticks it once per step from the
+# simulation clock, so handles cost nothing per frame however many there are;
+# while paused, now stays put and resuming carries on from there.
+class AnimationClock:
+    def __init__(self, source):
+        self.source = source
+        self.reset()
+
+    def reset(self):
+        self.now = self.source.get_ticks()
+        self.paused = False
+        self.__offset = 0
+
+    def tick(self):
+        if not self.paused:
+            self.now = self.source.get_ticks() - self.__offset
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        if self.paused:
+            self.paused = False
+            self.__offset = self.source.get_ticks() - self.now
+
+    def save(self):
+        return self.now, self.paused, self.__offset
+
+    def load(self, now, paused, offset):
+        self.now, self.paused, self.__offset = now, paused, offset
+
+    def start(self, name, size):
+        return AnimationHandle(self, ASSETS.sequence(name, size))
 
 class Bonus(Sprite):
+    __slots__ = ("force", "activated", "animation")
     WIDTH = 15
     HEIGHT = 15
 
-    def __init__(self, parent, color=GRAY, force=PLAYER_BONUS_JUMPFORCE):
+    def __init__(self, parent, color=GRAY, force=None):
         x = parent.rect.centerx - self.WIDTH//2
         y = parent.rect.y - self.HEIGHT
-        super().__init__(x, y, self.WIDTH, self.HEIGHT, color)
-        self.force = force
+        super().__init__(x, y, self.WIDTH, self.HEIGHT, color, parent.world)
+        self.force = force or self.world.config.player_bonus_jumpforce
         self.activated = False
-        try:
-            trampoline_normal = pygame.image.load(os.path.join("assets", "trampoline", "trampoline.png")).convert_alpha()
-            trampoline_active = pygame.image.load(os.path.join("assets", "trampoline", "trampoline-activate.png")).convert_alpha()
-            self.trampoline_frames = [
-                pygame.transform.scale(trampoline_normal, (self.WIDTH, self.HEIGHT)),
-                pygame.transform.scale(trampoline_active, (self.WIDTH, self.HEIGHT))
-            ]
-        except pygame.error:
-            print("Couldn't load trampoline images")
-            self.trampoline_frames = [self._image, self._image]
-        self.animation = Animation(self.trampoline_frames, loop=False, frame_duration=150)
+        self.animation = self.world.animations.start("trampoline", (self.WIDTH, self.HEIGHT))
         
     def activate(self):
         if not self.activated:
             self.activated = True
-            self.animation = Animation(self.trampoline_frames, loop=False, frame_duration=150)
+            self.animation.restart()
             
     def draw(self, surface):
-        if Camera.instance:
-            self.camera_rect = Camera.instance.apply(self)
-            surface.blit(self.animation.update(), self.camera_rect)
-        else:
-            surface.blit(self.animation.update(), self.rect)
+        self.camera_rect = self.world.camera.view(self)
+        surface.blit(self.animation.frame, self.camera_rect)
 
 class Platform(Sprite):
-    def __init__(self, x, y, width, height, initial_bonus=False, breakable=False):
+    __slots__ = ("breakable", "__bonus", "breaking", "monster", "break_animation")
+
+    def __init__(self, world, x, y, width, height, initial_bonus=False, breakable=False, monster=False):
         color = PLATFORM_COLOR_LIGHT if breakable else PLATFORM_COLOR
-        super().__init__(x, y, width, height, color)
+        super().__init__(x, y, width, height, color, world)
         self.breakable = breakable
-        self.__level = Level.instance
         self.__bonus = None
         self.breaking = False
         self.monster = None
 
         if not breakable:
             try:
-                normal_img = pygame.image.load(
-                    os.path.join("assets", "blocks", "normalblock.png")
-                ).convert_alpha()
-                self._image = pygame.transform.scale(normal_img, (width, height))
+                self._image = ASSETS.image(
+                    os.path.join("assets", "blocks", "normalblock.png"), (width, height)
+                )
             except pygame.error:
                 self._image.fill(color)
 
         self.break_animation = None
         if breakable:
-            try:
-                break_frames = []
-                for i in range(4):
-                    img = pygame.image.load(
-                        os.path.join("assets", "blocks", f"breakable-block-{i}.png")
-                    ).convert_alpha()
-                    break_frames.append(pygame.transform.scale(img, (width, height)))
-                self.break_animation = Animation(break_frames, loop=False, frame_duration=50)
-                self._image = break_frames[0]
-            except pygame.error:
-                self.break_animation = None
-                self._image.fill(color)
+            self.break_animation = world.animations.start("break", (width, height))
+            self._image = self.break_animation.sequence.frames[0]
 
-        if not breakable and chance(MONSTER_SPAWN_CHANCE):
-            self.monster = Monster(x, y - MONSTER_SIZE[1], width)
+        if monster and not breakable:
+            self.monster = Monster.spawn(world, x, y - MONSTER_SIZE[1], width)
 
         if initial_bonus:
             self.add_bonus(Bonus)
@@ -484,16 +993,24 @@ class Platform(Sprite):
 
     def add_bonus(self, bonus_type):
         if not self.breakable:
-            self.__bonus = bonus_type(self)
+            self.__bonus = bonus_type.spawn(self)
 
     def remove_bonus(self):
+        if self.__bonus:
+            self.__bonus.release()
         self.__bonus = None
 
+    def release(self):
+        self.remove_bonus()
+        if self.monster:
+            self.monster.release()
+            self.monster = None
+        super().release()
+
     def onCollide(self):
         if self.breakable and not self.breaking:
             self.breaking = True
-            if self.break_animation:
-                self.break_animation = Animation(self.break_animation.frames, loop=False, frame_duration=50)
+            self.break_animation.restart()
         if self.__bonus:
             self.__bonus.activate()
 
@@ -501,109 +1018,478 @@ class Platform(Sprite):
         if self.monster:
             self.monster.update()
             if self.monster.dead:
-                current_time = pygame.time.get_ticks()
+                current_time = self.world.clock.get_ticks()
                 if current_time - self.monster.death_time >= 200:
+                    self.monster.release()
                     self.monster = None
 
-        if self.breaking and self.break_animation and self.break_animation.finished:
-            self.__level.remove_platform(self)
-            
-        if Camera.instance:
-            camera_rect = Camera.instance.apply(self)
-        else:
-            camera_rect = self.rect
-        if camera_rect.y + self.rect.height > YWIN:
-            self.__level.remove_platform(self)
+        if self.breaking and self.break_animation.finished:
+            self.world.level.remove_platform(self)
+
+        if self.world.camera.apply(self).y + self.rect.height > YWIN:
+            self.world.level.remove_platform(self)
 
     def draw(self, surface):
-        if self.breakable and self.breaking and self.break_animation:
-            current_frame = self.break_animation.update()
+        if self.breaking:
+            current_frame = self.break_animation.frame
         else:
             current_frame = self._image
 
-        if Camera.instance:
-            camera_rect = Camera.instance.apply(self)
-        else:
-            camera_rect = self.rect
-
-        surface.blit(current_frame, camera_rect)
+        camera = self.world.camera
+        surface.blit(current_frame, camera.view(self))
 
         if self.__bonus:
             self.__bonus.draw(surface)
 
         if self.monster:
-            if Camera.instance:
-                monster_camera_rect = Camera.instance.apply(self.monster)
-                surface.blit(self.monster._image, monster_camera_rect)
-            else:
-                surface.blit(self.monster._image, self.monster.rect)
+            surface.blit(self.monster._image, camera.view(self.monster))
+
+# A spawn table is an ordered dict of layers, each picking one option per
+# platform: {layer: {option: weight}}. A weight is a number, a list of
+# [metres, weight] points interpolated over the height the platform spawns
+# at (held flat past both ends), or {"weight": w, "not_with": [options]} for
+# an option that never comes with the named options of earlier layers; the
+# layer then picks among the rest by their weights. An option named in
+# SPAWN_FLAGS sets that row flag, any other name sets nothing. Plain dicts,
+# lists and numbers, so a table can be kept in JSON.
+def spawn_table(config):
+    # the classic odds: each chance x means 1 in x + 1
+    return {
+        "kind": {"normal": config.breakable_platform_chance, "breakable": 1},
+        "bonus": {"none": config.bonus_spawn_chance, "bonus": {"weight": 1, "not_with": ["breakable"]}},
+        "monster": {"none": config.monster_spawn_chance, "monster": {"weight": 1, "not_with": ["breakable"]}},
+    }
+
+def _alias_table(weights):
+    # Vose's alias method: slot i keeps i with probability[i], else alias[i]
+    n = len(weights)
+    total = sum(weights)
+    scaled = [w * n / total for w in weights]
+    probability = [1.0] * n
+    alias = list(range(n))
+    small = [i for i, p in enumerate(scaled) if p < 1]
+    large = [i for i, p in enumerate(scaled) if p >= 1]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        probability[s], alias[s] = scaled[s], l
+        scaled[l] -= 1 - scaled[s]
+        (small if scaled[l] < 1 else large).append(l)
+    return probability, alias
+
+# A spawn table compiled over every combination of its options, with one
+# alias table per SPAWN_BAND metres of height up to its last weight point.
+# A platform costs one uniform and two lookups however many layers and
+# options the table has; sample_many does the same for arrays of them.
+class SpawnTable:
+    __compiled = {}
+
+    def __init__(self, table, band=SPAWN_BAND):
+        self.band = band
+        layers = []
+        earlier = set()
+        for layer, options in table.items():
+            if not options:
+                raise ValueError(f"spawn layer {layer!r} has no options")
+            parsed = []
+            for name, weight in options.items():
+                not_with = ()
+                if isinstance(weight, dict):
+                    not_with = tuple(weight.get("not_with", ()))
+                    weight = weight["weight"]
+                points = sorted(tuple(p) for p in weight) if isinstance(weight, (list, tuple)) else [(0, weight)]
+                if not points or any(w < 0 for _, w in points):
+                    raise ValueError(f"spawn option {layer}.{name} needs weights >= 0")
+                unknown = set(not_with) - earlier
+                if unknown:
+                    raise ValueError(f"spawn option {layer}.{name}: not_with names no earlier option "
+                                     f"{', '.join(sorted(unknown))}")
+                parsed.append((name, points, not_with))
+            earlier.update(name for name, _, _ in parsed)
+            layers.append(parsed)
+        self.outcomes = [tuple(name for name, _, _ in combo) for combo in itertools.product(*layers)]
+        self.flags = [tuple(flag in names for flag in SPAWN_FLAGS) for names in self.outcomes]
+        self.n = len(self.outcomes)
+        top = max(m for layer in layers for _, points, _ in layer for m, _ in points)
+        self.probability = []
+        self.alias = []
+        for b in range(max(0, int(top // band)) + 1):
+            weights = [self._weight(layers, combo, b * band) for combo in itertools.product(*layers)]
+            if not any(weights):
+                raise ValueError(f"spawn table has nothing to spawn at {b * band} m")
+            probability, alias = _alias_table(weights)
+            self.probability.append(probability)
+            self.alias.append(alias)
+        self.last = len(self.alias) - 1
+        self.__arrays = None
+
+    @staticmethod
+    def _at(points, metres):
+        if metres <= points[0][0]:
+            return points[0][1]
+        for (m0, w0), (m1, w1) in zip(points, points[1:]):
+            if metres <= m1:
+                return w0 + (w1 - w0) * (metres - m0) / (m1 - m0)
+        return points[-1][1]
+
+    def _weight(self, layers, combo, metres):
+        # each layer's odds given what the earlier layers picked
+        chosen = set()
+        weight = 1.0
+        for options, (name, points, not_with) in zip(layers, combo):
+            if chosen.intersection(not_with):
+                return 0.0
+            allowed = sum(self._at(p, metres) for _, p, exclude in options if not chosen.intersection(exclude))
+            if not allowed:
+                return 0.0
+            weight *= self._at(points, metres) / allowed
+            chosen.add(name)
+        return weight
+
+    @classmethod
+    def for_config(cls, config):
+        # compiled once per distinct table, however many levels use it
+        table = config.spawn_table or spawn_table(config)
+        key = json.dumps(table)
+        compiled = cls.__compiled.get(key)
+        if compiled is None:
+            compiled = cls.__compiled[key] = cls(table)
+        return compiled
+
+    def sample(self, metres, u):
+        # the outcome index for a platform at this height, from a uniform u in [0, 1)
+        b = min(max(int(metres // self.band), 0), self.last)
+        x = u * self.n
+        i = int(x)
+        return i if x - i < self.probability[b][i] else self.alias[b][i]
+
+    def sample_many(self, metres, uniforms):
+        global np
+        import numpy as np
+        if self.__arrays is None:
+            self.__arrays = (np.array(self.probability), np.array(self.alias), np.array(self.flags, bool))
+        probability, alias, _ = self.__arrays
+        b = np.clip(np.floor_divide(metres, self.band).astype(np.int64), 0, self.last)
+        x = np.asarray(uniforms) * self.n
+        i = x.astype(np.int64)
+        return np.where(x - i < probability[b, i], i, alias[b, i])
+
+    def flags_many(self, outcomes):
+        # SPAWN_FLAGS columns for an array of sample_many outcomes
+        return self.__arrays[2][outcomes]
+
+# Produces the level layout (x, y, bonus, breakable, monster) a chunk of rows
+# at a time from the level's rng. A task keeps LOOKAHEAD chunks ready so the
+# frame only pops rows; if it has fallen behind, the frame makes the chunk
+# itself. Either way the rows come out in the same order, so a seed always
+# yields the same level. The rows are drawn one by one from random.Random,
+# whose order of draws is what a seed means, on the game thread: the task
+# runs while the loop waits for the next frame (Game.run, Game.simulate),
+# never inside a frame. Loops that only await World.step never wait, so
+# there the frame makes every chunk and stalls counts them.
+class LevelLayout:
+    CHUNK_SIZE = 32
+    LOOKAHEAD = 2
+
+    def __init__(self, level):
+        self.level = level
+        self.ready = deque()
+        self.rows = deque()
+        self.last_y = None
+        # rows handed to the level, and how often the frame had to make a chunk
+        self.served = 0
+        self.stalls = 0
+        self.__task = None
+        self.__wanted = None
 
-class Level(Singleton):
-    def __init__(self):
-        self.platform_size = PLATFORM_SIZE
-        self.max_platforms = MAX_PLATFORM_NUMBER
-        self.distance_min, self.distance_max = PLATFORM_DISTANCE_GAP
-        self.bonus_platform_chance = BONUS_SPAWN_CHANCE
-        self.breakable_platform_chance = BREAKABLE_PLATFORM_CHANCE
+    def reset(self):
+        self.ready.clear()
+        self.rows.clear()
+        self.last_y = None
+        if self.__wanted:
+            self.__wanted.set()
+
+    def chunk(self):
+        lvl = self.level
+        rng = lvl.rng
+        spawns = lvl.spawns
+        rows = []
+        y = self.last_y
+        if y is None:
+            # the starting platform only ever gets a monster from the table
+            y = int(HALF_YWIN) + YWIN//3
+            monster = spawns.flags[spawns.sample(-y // METRE, rng.random())][2]
+            rows.append((int(HALF_XWIN) - lvl.platform_size[0]//2, y, False, False, monster))
+        span = XWIN - lvl.platform_size[0]
+        for _ in range(self.CHUNK_SIZE - len(rows)):
+            y -= rng.randint(lvl.distance_min, lvl.distance_max)
+            x = rng.randint(0, span)
+            rows.append((x, y, *spawns.flags[spawns.sample(-y // METRE, rng.random())]))
+        self.last_y = y
+        return rows
+
+    def save(self):
+        return self.last_y, list(self.rows), [list(chunk) for chunk in self.ready]
+
+    def load(self, last_y, rows, ready):
+        self.reset()
+        self.last_y = last_y
+        self.rows.extend(rows)
+        self.ready.extend(ready)
+
+    def next_row(self):
+        if not self.rows:
+            if self.ready:
+                self.rows.extend(self.ready.popleft())
+            else:
+                self.stalls += 1
+                self.rows.extend(self.chunk())
+            if self.__wanted:
+                self.__wanted.set()
+        self.served += 1
+        return self.rows.popleft()
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        if self.__task is None or self.__task.done() or self.__task.get_loop() is not loop:
+            self.__wanted = asyncio.Event()
+            self.__task = loop.create_task(self._fill())
+
+    def cancel(self):
+        # the filler stops at its next await and start() makes a new one once
+        # it has; a loop that never yields (the tools step worlds back to back)
+        # would otherwise collect a pending task per reset
+        task = self.__task
+        if task is not None and not task.done() and not task.get_loop().is_closed():
+            task.cancel()
+        return task
+
+    async def stop(self):
+        # cancels the filler and waits for it, so no loop is closed or
+        # dropped with it still pending
+        task = self.cancel()
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _fill(self):
+        while True:
+            while len(self.ready) < self.LOOKAHEAD:
+                self.ready.append(self.chunk())
+                await asyncio.sleep(0)
+            self.__wanted.clear()
+            await self.__wanted.wait()
+
+class Level:
+    # how far above its own rect a platform's monster or bonus can reach
+    REACH = max(MONSTER_SIZE[1], Bonus.HEIGHT)
+    # what save() records per platform and bullet; named after ArrayLevel's columns
+    PLATFORM_STATE = (
+        "x", "y", "breakable", "breaking", "bonus", "bonus_active", "monster", "monster_dead", "pending",
+        "break_start", "bonus_start", "monster_x", "monster_carry", "monster_previous", "monster_dir",
+        "monster_death",
+    )
+    BULLET_STATE = ("bullet_x", "bullet_y", "bullet_carry", "bullet_previous")
+
+    def __init__(self, world):
+        self.world = world
+        config = world.config
+        self.platform_size = config.platform_size
+        self.max_platforms = config.max_platform_number
+        self.distance_min, self.distance_max = config.platform_distance_gap
+        self.spawns = SpawnTable.for_config(config)
+        self.rng = random.Random()
+        self.layout = LevelLayout(self)
         self.__platforms = []
+        self.__keys = []
         self.__bullets = []
         self.__to_remove = []
-        self.__base_platform = Platform(
-            HALF_XWIN - PLATFORM_SIZE[0]//2,
-            HALF_YWIN + YWIN//3,
-            *PLATFORM_SIZE
-        )
 
     @property
     def platforms(self):
         return self.__platforms
 
+    @property
+    def bullets(self):
+        return self.__bullets
+
+    def counts(self):
+        return {
+            "platforms": len(self.__platforms),
+            "monsters": sum(1 for platform in self.__platforms if platform.monster),
+            "bullets": len(self.__bullets),
+        }
+
     def add_bullet(self, bullet):
+        bullet.index = len(self.__bullets)
         self.__bullets.append(bullet)
 
     def remove_bullet(self, bullet):
-        if bullet in self.__bullets:
+        if bullet.index >= 0:
             self.__to_remove.append(bullet)
 
+    def _discard_bullet(self, bullet):
+        last = self.__bullets.pop()
+        if last is not bullet:
+            self.__bullets[bullet.index] = last
+            last.index = bullet.index
+        bullet.index = -1
+        bullet.release()
+
     def remove_platform(self, platform):
-        if platform in self.__platforms:
+        if self._platform_index(platform) >= 0:
             self.__to_remove.append(platform)
             return True
         return False
 
+    # Platforms are generated in strictly decreasing y, so __keys (their -y)
+    # stays sorted and doubles as the spatial index for collision queries.
+    def _add_platform(self, platform):
+        self.__platforms.append(platform)
+        self.__keys.append(-platform.rect.y)
+
+    def _platform_index(self, platform):
+        key = -platform.rect.y
+        i = bisect.bisect_left(self.__keys, key)
+        while i < len(self.__keys) and self.__keys[i] == key:
+            if self.__platforms[i] is platform:
+                return i
+            i += 1
+        return -1
+
+    def _delete_platforms(self, indices):
+        # indices in descending order, so deleting a run leaves the rest valid;
+        # the platforms left below the screen are one run at the front, gone
+        # in a single slice instead of one shift of the whole list each
+        start = stop = indices[0]
+        for i in indices[1:]:
+            if i != start - 1:
+                del self.__platforms[start:stop + 1]
+                del self.__keys[start:stop + 1]
+                stop = i
+            start = i
+        del self.__platforms[start:stop + 1]
+        del self.__keys[start:stop + 1]
+
+    def query(self, top, bottom):
+        lo = bisect.bisect_right(self.__keys, -(bottom + self.REACH))
+        hi = bisect.bisect_left(self.__keys, -(top - self.platform_size[1]))
+        return self.__platforms[lo:hi]
+
     async def _generation(self):
         needed = self.max_platforms - len(self.__platforms)
         for _ in range(needed):
             self.create_platform()
 
     def create_platform(self):
-        if self.__platforms:
-            offset = random.randint(self.distance_min, self.distance_max)
-            x = random.randint(0, XWIN - self.platform_size[0])
-            y = self.__platforms[-1].rect.y - offset
-            self.__platforms.append(Platform(
-                x, y, *self.platform_size,
-                initial_bonus=chance(self.bonus_platform_chance),
-                breakable=chance(self.breakable_platform_chance)
-            ))
-        else:
-            self.__platforms.append(self.__base_platform)
+        x, y, bonus, breakable, monster = self.layout.next_row()
+        self._add_platform(Platform.spawn(
+            self.world, x, y, *self.platform_size, initial_bonus=bonus, breakable=breakable, monster=monster
+        ))
 
-    def reset(self):
-        self.__platforms = [self.__base_platform]
-        self.__bullets = []
+    def clear_bullets(self):
+        for bullet in self.__bullets:
+            bullet.index = -1
+            bullet.release()
+        self.__bullets.clear()
+
+    def reset(self, seed=None):
+        for platform in self.__platforms:
+            platform.release()
+        self.__platforms.clear()
+        self.__keys.clear()
+        self.clear_bullets()
+        self.__to_remove.clear()
+        self.rng.seed(seed)
+        self.layout.reset()
+        self.create_platform()
+
+    # Platforms, bullets and the removal queue as PLATFORM_STATE and
+    # BULLET_STATE rows plus queued bullet indices; the rng and the layout
+    # are saved separately.
+    def save(self):
+        pending = {id(p) for p in self.__to_remove if not isinstance(p, Bullet)}
+        platforms = []
+        for p in self.__platforms:
+            bonus, monster = p.bonus, p.monster
+            platforms.append((
+                p.rect.x, p.rect.y, p.breakable, p.breaking,
+                bonus is not None, bonus is not None and bonus.activated,
+                monster is not None, monster is not None and monster.dead, id(p) in pending,
+                p.break_animation.start if p.break_animation else 0, bonus.animation.start if bonus else 0,
+                *((monster.rect.x, monster._carry_x, monster._previous[0], monster.direction, monster.death_time)
+                  if monster else (p.rect.x, 0.0, p.rect.x, 1, 0)),
+            ))
+        bullets = [(b.rect.x, b.rect.y, b._carry_y, b._previous[1]) for b in self.__bullets]
+        removals = [b.index for b in self.__to_remove if isinstance(b, Bullet)]
+        return platforms, bullets, removals
+
+    def load(self, platforms, bullets, removals):
+        # Platforms and bullets that are still around are patched in place, so
+        # rewinding a few steps hardly touches the pools.
+        world = self.world
+        live = {(p.rect.x, p.rect.y, p.breakable, p.bonus is not None): p for p in self.__platforms}
+        self.__platforms.clear()
+        self.__keys.clear()
+        self.__to_remove.clear()
+        for (x, y, breakable, breaking, bonus, bonus_active, monster, monster_dead, pending, break_start,
+             bonus_start, monster_x, monster_carry, monster_previous, monster_dir, monster_death) in platforms:
+            platform = live.pop((x, y, breakable, bonus), None)
+            if platform is None:
+                platform = Platform.spawn(world, x, y, *self.platform_size, initial_bonus=bonus, breakable=breakable)
+            platform.breaking = breaking
+            if platform.break_animation:
+                platform.break_animation.start = break_start
+            if platform.bonus:
+                platform.bonus.activated = bonus_active
+                platform.bonus.animation.start = bonus_start
+            if monster:
+                m = platform.monster
+                if m is None:
+                    m = platform.monster = Monster.spawn(world, x, y - MONSTER_SIZE[1], self.platform_size[0])
+                m.rect.x, m._carry_x, m._previous = monster_x, monster_carry, (monster_previous, m.rect.y)
+                m.direction, m.dead, m.death_time = monster_dir, monster_dead, monster_death
+                m._image = m.dead_image if monster_dead else m.normal_image
+            elif platform.monster:
+                platform.monster.release()
+                platform.monster = None
+            self._add_platform(platform)
+            if pending:
+                self.__to_remove.append(platform)
+        for platform in live.values():
+            platform.release()
+        reused = self.__bullets[:]
+        self.__bullets.clear()
+        for i, (x, y, carry, previous) in enumerate(bullets):
+            bullet = reused[i] if i < len(reused) else Bullet.spawn(world, x, y)
+            bullet.rect.topleft = x, y
+            bullet._carry_x, bullet._carry_y, bullet._previous = 0.0, carry, (x, previous)
+            self.add_bullet(bullet)
+        for bullet in reused[len(bullets):]:
+            bullet.index = -1
+            bullet.release()
+        self.__to_remove.extend(self.__bullets[i] for i in removals)
 
     async def update(self):
+        # Bullets are unordered and swap-removed in O(1). Platforms must keep
+        # their y order for the index, so the ones going are found by bisection
+        # and deleted a run of neighbours at a time.
+        gone = set()
         for p in self.__to_remove:
-            if p in self.__platforms:
-                self.__platforms.remove(p)
-            if p in self.__bullets:
-                self.__bullets.remove(p)
-        self.__to_remove = []
+            if isinstance(p, Bullet):
+                if p.index >= 0:
+                    self._discard_bullet(p)
+                continue
+            i = self._platform_index(p)
+            if i >= 0 and i not in gone:
+                gone.add(i)
+                p.release()
+        self.__to_remove.clear()
+        if gone:
+            self._delete_platforms(sorted(gone, reverse=True))
         for platform in self.__platforms:
             platform.update()
         for bullet in self.__bullets:
             bullet.update()
+        self.layout.start()
         await self._generation()
 
     def draw(self, surface):
@@ -612,90 +1498,1332 @@ class Level(Singleton):
         for bullet in self.__bullets:
             bullet.draw(surface)
 
-class Game(Singleton):
-    def __init__(self):
-        self.__alive = True
-        self.window = pygame.display.set_mode(DISPLAY, FLAGS)
-        pygame.display.set_caption("Doodle Jump")
-        self.clock = pygame.time.Clock()
-        self.camera = Camera()
-        self.lvl = Level()
+class _MonsterView:
+    __slots__ = ("level", "i")
+
+    def __init__(self, level, i):
+        self.level = level
+        self.i = i
+
+    @property
+    def rect(self):
+        lvl, i = self.level, self.i
+        return pygame.Rect(int(lvl.monster_x[i]), int(lvl.y[i]) - MONSTER_SIZE[1], *MONSTER_SIZE)
+
+    @property
+    def dead(self):
+        return bool(self.level.monster_dead[self.i])
+
+    def kill(self):
+        self.level.monster_dead[self.i] = True
+        self.level.monster_death[self.i] = self.level.world.clock.get_ticks()
+
+class _BonusView:
+    __slots__ = ("level", "i")
+
+    def __init__(self, level, i):
+        self.level = level
+        self.i = i
+
+    @property
+    def force(self):
+        return self.level.world.config.player_bonus_jumpforce
+
+    @property
+    def rect(self):
+        lvl, i = self.level, self.i
+        x = int(lvl.x[i]) + int(lvl.w[i]) // 2 - Bonus.WIDTH // 2
+        return pygame.Rect(x, int(lvl.y[i]) - Bonus.HEIGHT, Bonus.WIDTH, Bonus.HEIGHT)
+
+    def activate(self):
+        lvl, i = self.level, self.i
+        if not lvl.bonus_active[i]:
+            lvl.bonus_active[i] = True
+            lvl.bonus_start[i] = lvl.world.animations.now
+
+class _PlatformView:
+    __slots__ = ("level", "i")
+
+    def __init__(self, level, i):
+        self.level = level
+        self.i = i
+
+    @property
+    def rect(self):
+        lvl, i = self.level, self.i
+        return pygame.Rect(int(lvl.x[i]), int(lvl.y[i]), int(lvl.w[i]), int(lvl.h[i]))
+
+    @property
+    def breakable(self):
+        return bool(self.level.breakable[self.i])
+
+    @property
+    def breaking(self):
+        return bool(self.level.breaking[self.i])
+
+    @property
+    def bonus(self):
+        return _BonusView(self.level, self.i) if self.level.bonus[self.i] else None
+
+    @property
+    def monster(self):
+        return _MonsterView(self.level, self.i) if self.level.monster[self.i] else None
+
+    def onCollide(self):
+        lvl, i = self.level, self.i
+        if lvl.breakable[i] and not lvl.breaking[i]:
+            lvl.breaking[i] = True
+            lvl.break_start[i] = lvl.world.animations.now
+        if lvl.bonus[i]:
+            _BonusView(lvl, i).activate()
+
+class _BulletView:
+    __slots__ = ("rect",)
+
+    def __init__(self, rect):
+        self.rect = rect
+
+def _round_half_away(values):
+    # the rounding pygame.Rect applies when a coordinate is set from a float
+    return np.trunc(values + np.copysign(0.5, values)).astype(np.int64)
+
+def _interpolate(previous, current, alpha):
+    return np.where(previous == current, current, np.round(previous + (current - previous) * alpha).astype(np.int64))
+
+# Same rules as Level, but platforms and their monster/bonus live in NumPy
+# columns (struct of arrays) and bullets in a second, smaller set. Row order
+# is generation order, i.e. strictly decreasing y, like Level.platforms.
+class ArrayLevel:
+    REACH = Level.REACH
+    BREAK_FRAMES = len(ANIMATIONS["break"][0])
+    BREAK_FRAME_DURATION = ANIMATIONS["break"][1]
+    MONSTER_LINGER = 200
+    COLUMNS = {
+        "x": "int64", "y": "int64", "key": "int64", "w": "int64", "h": "int64",
+        "breakable": "bool", "breaking": "bool", "break_start": "int64",
+        "bonus": "bool", "bonus_active": "bool", "bonus_start": "int64",
+        "monster": "bool", "monster_x": "int64", "monster_carry": "float64", "monster_previous": "int64",
+        "monster_start": "int64",
+        "monster_dir": "int64", "monster_dead": "bool", "monster_death": "int64",
+        "pending": "bool",
+    }
+    BULLET_COLUMNS = {
+        "bullet_x": "int64", "bullet_y": "int64", "bullet_carry": "float64", "bullet_previous": "int64",
+        "bullet_id": "int64",
+    }
+
+    def __init__(self, world, capacity=64):
+        global np
+        import numpy as np
+        self.world = world
+        config = world.config
+        self.platform_size = config.platform_size
+        self.max_platforms = config.max_platform_number
+        self.distance_min, self.distance_max = config.platform_distance_gap
+        self.spawns = SpawnTable.for_config(config)
+        self.monster_speed = config.monster_speed
+        self.bullet_speed = config.bullet_speed
+        self.rng = random.Random()
+        self.layout = LevelLayout(self)
+        self.count = 0
+        self.bullet_count = 0
+        self.__next_bullet_id = 0
+        self.__bullets_to_remove = []
+        for name, dtype in self.COLUMNS.items():
+            setattr(self, name, np.zeros(capacity, dtype))
+        for name, dtype in self.BULLET_COLUMNS.items():
+            setattr(self, name, np.zeros(capacity, dtype))
+        self._load_images()
+
+    def _load_images(self):
+        blocks = os.path.join("assets", "blocks")
+        try:
+            self.normal_image = ASSETS.image(os.path.join(blocks, "normalblock.png"), self.platform_size)
+        except pygame.error:
+            self.normal_image = ASSETS.solid(self.platform_size, PLATFORM_COLOR)
+        # the break and bonus columns hold each row's start tick on the world's
+        # AnimationClock, so these play like the handles Level's sprites keep
+        self.break_sequence = ASSETS.sequence("break", self.platform_size)
+        self.trampoline_sequence = ASSETS.sequence("trampoline", (Bonus.WIDTH, Bonus.HEIGHT))
+        try:
+            self.monster_images = [
+                ASSETS.image(os.path.join("assets", "normalmonster", "monster.png"), MONSTER_SIZE),
+                ASSETS.image(os.path.join("assets", "normalmonster", "dead-monster.png"), MONSTER_SIZE),
+            ]
+        except pygame.error:
+            self.monster_images = [ASSETS.solid(MONSTER_SIZE, ANDROID_GREEN)] * 2
+        self.bullet_image = ASSETS.ellipse(BULLET_SIZE, ANDROID_GREEN)
+
+    def _grow(self, columns, needed):
+        for name in columns:
+            old = getattr(self, name)
+            if len(old) < needed:
+                new = np.zeros(max(needed, len(old) * 2), old.dtype)
+                new[:len(old)] = old
+                setattr(self, name, new)
+
+    @property
+    def platforms(self):
+        return [_PlatformView(self, i) for i in range(self.count)]
+
+    @property
+    def bullets(self):
+        return [
+            _BulletView(pygame.Rect(int(self.bullet_x[i]), int(self.bullet_y[i]), *BULLET_SIZE))
+            for i in range(self.bullet_count)
+        ]
+
+    def counts(self):
+        return {
+            "platforms": self.count,
+            "monsters": int(self.monster[:self.count].sum()),
+            "bullets": self.bullet_count,
+        }
+
+    def add_bullet(self, bullet):
+        i = self.bullet_count
+        self._grow(self.BULLET_COLUMNS, i + 1)
+        self.bullet_x[i], self.bullet_y[i] = bullet.rect.x, bullet.rect.y
+        self.bullet_carry[i], self.bullet_previous[i] = 0.0, bullet.rect.y
+        self.bullet_id[i] = self.__next_bullet_id
+        self.__next_bullet_id += 1
+        self.bullet_count += 1
+        bullet.release()
+
+    def clear_bullets(self):
+        self.bullet_count = 0
+        self.__bullets_to_remove.clear()
+
+    def save(self):
+        n, m = self.count, self.bullet_count
+        platforms = list(zip(*(getattr(self, name)[:n].tolist() for name in Level.PLATFORM_STATE)))
+        bullets = list(zip(*(getattr(self, name)[:m].tolist() for name in Level.BULLET_STATE)))
+        position = {b: i for i, b in enumerate(self.bullet_id[:m].tolist())}
+        return platforms, bullets, [position[b] for b in self.__bullets_to_remove]
+
+    def load(self, platforms, bullets, removals):
+        n, m = len(platforms), len(bullets)
+        self._grow(self.COLUMNS, n)
+        self._grow(self.BULLET_COLUMNS, m)
+        for name, values in zip(Level.PLATFORM_STATE, zip(*platforms)):
+            getattr(self, name)[:n] = values
+        for name, values in zip(Level.BULLET_STATE, zip(*bullets)):
+            getattr(self, name)[:m] = values
+        self.count, self.bullet_count = n, m
+        self.key[:n] = -self.y[:n]
+        self.w[:n], self.h[:n] = self.platform_size
+        self.monster_start[:n] = self.x[:n]
+        self.bullet_id[:m] = np.arange(m)
+        self.__next_bullet_id = m
+        self.__bullets_to_remove[:] = removals
+
+    def remove_platform(self, platform):
+        self.pending[platform.i] = True
+        return True
+
+    def query(self, top, bottom):
+        keys = self.key[:self.count]
+        lo = int(np.searchsorted(keys, -(bottom + self.REACH), "right"))
+        hi = int(np.searchsorted(keys, -(top - self.platform_size[1]), "left"))
+        return [_PlatformView(self, i) for i in range(lo, hi)]
+
+    async def _generation(self):
+        for _ in range(self.max_platforms - self.count):
+            self.create_platform()
+
+    def create_platform(self):
+        self._add_platform(*self.layout.next_row())
+
+    def _add_platform(self, x, y, bonus, breakable, monster):
+        i = self.count
+        self._grow(self.COLUMNS, i + 1)
+        now = self.world.animations.now
+        w, h = self.platform_size
+        monster = monster and not breakable
+        bonus = bonus and not breakable
+        self.x[i], self.y[i], self.key[i], self.w[i], self.h[i] = x, y, -int(y), w, h
+        # no animation reads as a start of 0, as on the object backend, so snapshots match
+        self.breakable[i], self.breaking[i], self.break_start[i] = breakable, False, now if breakable else 0
+        self.bonus[i], self.bonus_active[i], self.bonus_start[i] = bonus, False, now if bonus else 0
+        self.monster[i], self.monster_x[i], self.monster_start[i] = monster, x, x
+        self.monster_carry[i], self.monster_previous[i] = 0.0, x
+        self.monster_dir[i], self.monster_dead[i], self.monster_death[i] = 1, False, 0
+        self.pending[i] = False
+        self.count += 1
+
+    def reset(self, seed=None):
+        self.count = 0
+        self.clear_bullets()
+        self.rng.seed(seed)
+        self.layout.reset()
+        self.create_platform()
+
+    def _apply_removals(self):
+        n = self.count
+        pending = self.pending[:n]
+        if pending.any():
+            keep = ~pending
+            m = int(keep.sum())
+            for name in self.COLUMNS:
+                column = getattr(self, name)
+                column[:m] = column[:n][keep]
+            self.count = m
+        # Level swap-removes bullets in the order they were queued; do the same
+        # so the surviving bullets end up in the same order.
+        if self.__bullets_to_remove:
+            position = {int(b): i for i, b in enumerate(self.bullet_id[:self.bullet_count])}
+            for bullet_id in self.__bullets_to_remove:
+                i = position.pop(bullet_id)
+                last = self.bullet_count - 1
+                if i != last:
+                    for name in self.BULLET_COLUMNS:
+                        column = getattr(self, name)
+                        column[i] = column[last]
+                    position[int(self.bullet_id[i])] = i
+                self.bullet_count = last
+            self.__bullets_to_remove.clear()
+
+    async def update(self):
+        self._apply_removals()
+        n = self.count
+        clock = self.world.clock
+        now = clock.get_ticks()
+        scale = clock.scale
+        camera_y = self.world.camera.state.y
+        x, y, h = self.x[:n], self.y[:n], self.h[:n]
+
+        monster, dead = self.monster[:n], self.monster_dead[:n]
+        direction, monster_x = self.monster_dir[:n], self.monster_x[:n]
+        patrolling = monster & ~dead
+        self.monster_previous[:n] = monster_x
+        exact = monster_x + self.monster_carry[:n] + np.where(patrolling, direction * self.monster_speed * scale, 0.0)
+        monster_x[:] = _round_half_away(exact)
+        self.monster_carry[:n] = exact - monster_x
+        right = patrolling & (monster_x > self.monster_start[:n] + self.w[:n] - MONSTER_SIZE[0])
+        left = patrolling & ~right & (monster_x < self.monster_start[:n])
+        direction[right] = -1
+        direction[left] = 1
+        gone = monster & dead & (now - self.monster_death[:n] >= self.MONSTER_LINGER)
+        if gone.any():
+            # back to a monsterless row, as the object backend saves one
+            monster[gone] = dead[gone] = False
+            monster_x[gone] = self.monster_previous[:n][gone] = x[gone]
+            self.monster_carry[:n][gone], direction[gone], self.monster_death[:n][gone] = 0.0, 1, 0
+
+        broken = self.breaking[:n] & (
+            (self.world.animations.now - self.break_start[:n]) // self.BREAK_FRAME_DURATION >= self.BREAK_FRAMES - 1
+        )
+        self.pending[:n] |= broken | (y - camera_y + h > YWIN)
+
+        self._update_bullets(now, scale, camera_y)
+        self.layout.start()
+        await self._generation()
+
+    def _update_bullets(self, now, scale, camera_y):
+        m = self.bullet_count
+        if not m:
+            return
+        bullet_x, bullet_y = self.bullet_x[:m], self.bullet_y[:m]
+        self.bullet_previous[:m] = bullet_y
+        exact = bullet_y + self.bullet_carry[:m] + self.bullet_speed * scale
+        bullet_y[:] = _round_half_away(exact)
+        self.bullet_carry[:m] = exact - bullet_y
+        done = (bullet_y - camera_y) < -50
+        n = self.count
+        rows = np.flatnonzero(self.monster[:n] & ~self.monster_dead[:n])
+        if rows.size:
+            monster_x = self.monster_x[rows]
+            monster_y = self.y[rows] - MONSTER_SIZE[1]
+            # swept like Bullet.update: the span between the previous and new y
+            previous = self.bullet_previous[:m]
+            path_top = np.minimum(previous, bullet_y)[:, None]
+            path_bottom = np.maximum(previous, bullet_y)[:, None] + BULLET_SIZE[1]
+            hits = (
+                (bullet_x[:, None] < monster_x + MONSTER_SIZE[0]) & (bullet_x[:, None] + BULLET_SIZE[0] > monster_x)
+                & (path_top < monster_y + MONSTER_SIZE[1]) & (path_bottom > monster_y)
+            )
+            # a monster can only absorb the first bullet that reaches it
+            for b in np.flatnonzero(hits.any(axis=1)):
+                for j in np.flatnonzero(hits[b]):
+                    row = rows[j]
+                    if not self.monster_dead[row]:
+                        self.monster_dead[row] = True
+                        self.monster_death[row] = now
+                        done[b] = True
+                        break
+        self.__bullets_to_remove.extend(int(i) for i in self.bullet_id[:m][done])
+
+    def draw(self, surface):
+        n = self.count
+        now = self.world.animations.now
+        camera = self.world.camera
+        offset, alpha = round(camera.view_y), camera.alpha
+        top = self.y[:n] - offset
+        visible = np.flatnonzero((top - self.REACH < YWIN) & (top + self.h[:n] > 0))
+        monster_x = _interpolate(self.monster_previous[:n], self.monster_x[:n], alpha)
+        breaking, trampoline = self.break_sequence, self.trampoline_sequence
+        blits = []
+        for i in visible.tolist():
+            x, y = int(self.x[i]), int(top[i])
+            if self.breaking[i]:
+                frame = breaking.index(now - int(self.break_start[i]))
+                blits.append((breaking.frames[frame], (x, y)))
+            else:
+                blits.append((breaking.frames[0] if self.breakable[i] else self.normal_image, (x, y)))
+            if self.bonus[i]:
+                frame = trampoline.index(now - int(self.bonus_start[i]))
+                bonus_x = x + int(self.w[i]) // 2 - Bonus.WIDTH // 2
+                blits.append((trampoline.frames[frame], (bonus_x, y - Bonus.HEIGHT)))
+            if self.monster[i]:
+                image = self.monster_images[1 if self.monster_dead[i] else 0]
+                blits.append((image, (int(monster_x[i]), y - MONSTER_SIZE[1])))
+        m = self.bullet_count
+        bullet_y = _interpolate(self.bullet_previous[:m], self.bullet_y[:m], alpha) - offset
+        for bx, by in zip(self.bullet_x[:m].tolist(), bullet_y.tolist()):
+            blits.append((self.bullet_image, (bx, by)))
+        for image, dest in blits:
+            surface.blit(image, dest)
+
+class WorldConfig:
+    # tuning constants a world is built from; defaults are the module constants
+    FIELDS = {
+        "platform_size": PLATFORM_SIZE,
+        "platform_distance_gap": PLATFORM_DISTANCE_GAP,
+        "max_platform_number": MAX_PLATFORM_NUMBER,
+        "bonus_spawn_chance": BONUS_SPAWN_CHANCE,
+        "breakable_platform_chance": BREAKABLE_PLATFORM_CHANCE,
+        "monster_spawn_chance": MONSTER_SPAWN_CHANCE,
+        # None: spawn_table() of the three chances above
+        "spawn_table": None,
+        "monster_speed": MONSTER_SPEED,
+        "gravity": GRAVITY,
+        "player_jumpforce": PLAYER_JUMPFORCE,
+        "player_bonus_jumpforce": PLAYER_BONUS_JUMPFORCE,
+        "bullet_speed": BULLET_SPEED,
+        "bullet_cooldown": BULLET_COOLDOWN,
+    }
+
+    def __init__(self, **overrides):
+        unknown = set(overrides) - set(self.FIELDS)
+        if unknown:
+            raise TypeError(f"unknown WorldConfig fields: {', '.join(sorted(unknown))}")
+        for name, default in self.FIELDS.items():
+            setattr(self, name, overrides.get(name, default))
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+# One game's simulation state. Entities reach the clock, camera and level
+# through their world, so any number of worlds can run side by side.
+SNAPSHOT_MAGIC = b"DJWS"
+SNAPSHOT_VERSION = 1
+
+class World:
+    # snapshot() layout, little-endian: header, clocks/score/camera/player,
+    # rng, counts, layout chunk sizes, then layout rows, platforms, bullets
+    # and queued bullet removals as packed records
+    SNAPSHOT_HEADER = struct.Struct("<4sBd")
+    SNAPSHOT_STATE = struct.Struct("<IIi?iiiiidiiddiiddb??i")
+    SNAPSHOT_RNG = struct.Struct("<B625Id")
+    SNAPSHOT_COUNTS = struct.Struct("<?iHBHHH")
+    SNAPSHOT_CHUNK = struct.Struct("<H")
+    SNAPSHOT_ROW = struct.Struct("<iiB")
+    SNAPSHOT_PLATFORM = struct.Struct("<iiBiiidibi")
+    SNAPSHOT_BULLET = struct.Struct("<iidi")
+    SNAPSHOT_REMOVAL = struct.Struct("<H")
+
+    def __init__(self, config=None, sim_hz=FPS, level_backend="object"):
+        self.config = config or WorldConfig()
+        self.clock = FrameClock(sim_hz)
+        self.animations = AnimationClock(self.clock)
+        self.camera = Camera(self.clock)
+        self.level = ArrayLevel(self) if level_backend == "array" else Level(self)
         self.player = Player(
+            self,
             HALF_XWIN - PLAYER_SIZE[0]//2,
             HALF_YWIN + HALF_YWIN//2,
             *PLAYER_SIZE,
             PLAYER_COLOR
         )
-        self.background = Background()
-        self.main_menu = MainMenu()
-        self.game_over_screen = GameOverScreen()
-        self.game_state = GameState.MENU
         self.score = 0
-        self.score_txt = SMALL_FONT.render("0 m", True, GRAY)
-        self.score_pos = Vector2(10, 10)
 
-    def reset(self):
+    def reset(self, seed=None):
+        self.clock.reset()
+        self.animations.reset()
         self.camera.reset()
-        self.lvl.reset()
+        self.level.layout.cancel()
+        self.level.reset(seed)
         self.player.reset()
         self.score = 0
-        self.score_txt = SMALL_FONT.render("0 m", True, GRAY)
+
+    async def close(self):
+        await self.level.layout.stop()
+
+    async def advance(self, prof=None):
+        if prof:
+            prof.begin("player")
+        self.player.update()
+        if prof:
+            prof.begin("level")
+        await self.level.update()
+        if prof:
+            prof.begin("camera")
+        self.clock.advance()
+        self.animations.tick()
+
+    def follow(self):
+        self.camera.update(self.player.rect)
+        self.score = -self.camera.state.y//METRE
+
+    async def step(self):
+        await self.advance()
+        if self.player.dead:
+            return False
+        self.follow()
+        return True
+
+    def snapshot(self):
+        # Everything the simulation reads, as numbers; no surfaces. It can be
+        # restored into any world with the same config and rate, on either
+        # level backend.
+        last_y, rows, ready = self.level.layout.save()
+        platforms, bullets, removals = self.level.save()
+        version, internal, gauss = self.level.rng.getstate()
+        parts = [
+            self.SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, self.clock.fps),
+            self.SNAPSHOT_STATE.pack(
+                self.clock.frame, self.clock.ticks, *self.animations.save(), self.score,
+                *self.camera.save(), *self.player.save()
+            ),
+            self.SNAPSHOT_RNG.pack(version, *internal, math.nan if gauss is None else gauss),
+            self.SNAPSHOT_COUNTS.pack(
+                last_y is not None, last_y or 0, len(rows), len(ready), len(platforms), len(bullets), len(removals)
+            ),
+        ]
+        parts.extend(self.SNAPSHOT_CHUNK.pack(len(chunk)) for chunk in ready)
+        for chunk in (rows, *ready):
+            parts.extend(
+                self.SNAPSHOT_ROW.pack(x, y, bonus | breakable << 1 | monster << 2)
+                for x, y, bonus, breakable, monster in chunk
+            )
+        # the seven flags of Level.PLATFORM_STATE share a byte
+        parts.extend(
+            self.SNAPSHOT_PLATFORM.pack(p[0], p[1], sum(flag << i for i, flag in enumerate(p[2:9])), *p[9:])
+            for p in platforms
+        )
+        parts.extend(self.SNAPSHOT_BULLET.pack(*bullet) for bullet in bullets)
+        parts.extend(self.SNAPSHOT_REMOVAL.pack(i) for i in removals)
+        return b"".join(parts)
+
+    def restore(self, data):
+        magic, version, fps = self.SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"not a version {SNAPSHOT_VERSION} world snapshot")
+        if fps != self.clock.fps:
+            raise ValueError(f"snapshot was taken at {fps:g} Hz, this world steps at {self.clock.fps:g} Hz")
+        offset = self.SNAPSHOT_HEADER.size
+        state = self.SNAPSHOT_STATE.unpack_from(data, offset)
+        offset += self.SNAPSHOT_STATE.size
+        rng = self.SNAPSHOT_RNG.unpack_from(data, offset)
+        offset += self.SNAPSHOT_RNG.size
+        has_last_y, last_y, row_count, chunk_count, platform_count, bullet_count, removal_count = (
+            self.SNAPSHOT_COUNTS.unpack_from(data, offset)
+        )
+        offset += self.SNAPSHOT_COUNTS.size
+
+        def records(record, count):
+            nonlocal offset
+            end = offset + record.size * count
+            values = list(record.iter_unpack(data[offset:end]))
+            offset = end
+            return values
+
+        chunk_sizes = [size for size, in records(self.SNAPSHOT_CHUNK, chunk_count)]
+        rows = [(x, y, bool(flags & 1), bool(flags & 2), bool(flags & 4))
+                for x, y, flags in records(self.SNAPSHOT_ROW, row_count + sum(chunk_sizes))]
+        ready = []
+        start = row_count
+        for size in chunk_sizes:
+            ready.append(rows[start:start + size])
+            start += size
+        platforms = [(x, y, *(bool(flags >> i & 1) for i in range(7)), *rest)
+                     for x, y, flags, *rest in records(self.SNAPSHOT_PLATFORM, platform_count)]
+        bullets = records(self.SNAPSHOT_BULLET, bullet_count)
+        removals = [i for i, in records(self.SNAPSHOT_REMOVAL, removal_count)]
+
+        self.clock.frame, self.clock.ticks = state[:2]
+        self.animations.load(*state[2:5])
+        self.score = state[5]
+        self.camera.load(*state[6:10])
+        self.player.load(*state[10:])
+        gauss = rng[-1]
+        self.level.rng.setstate((rng[0], rng[1:-1], None if math.isnan(gauss) else gauss))
+        self.level.layout.load(last_y if has_last_y else None, rows[:row_count], ready)
+        self.level.load(platforms, bullets, removals)
+
+    def clone(self):
+        # an independent world in this one's state, e.g. to try inputs ahead
+        world = World(self.config, self.clock.fps, "array" if isinstance(self.level, ArrayLevel) else "object")
+        world.restore(self.snapshot())
+        return world
+
+# The last `capacity` snapshots of a world, for rewinding it: push() after
+# each step, rewind(world, n) to go back n pushes.
+class SnapshotRing:
+    def __init__(self, capacity=FPS * 10):
+        self.snapshots = deque(maxlen=capacity)
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def push(self, world):
+        self.snapshots.append(world.snapshot())
+
+    def rewind(self, world, steps=1):
+        # restores the snapshot `steps` pushes back (the oldest kept if there
+        # are not that many) and drops the newer ones; returns the steps taken
+        steps = min(steps, len(self.snapshots) - 1)
+        if steps < 0:
+            return 0
+        for _ in range(steps):
+            self.snapshots.pop()
+        world.restore(self.snapshots[-1])
+        return steps
+
+    def clear(self):
+        self.snapshots.clear()
+
+MENU_ASSETS = [
+    (os.path.join("assets", "main_menu.png"), DISPLAY, True),
+]
+
+GAMEPLAY_ASSETS = [
+    *[(path, size, spacing is not None) for path, size, _, spacing in BACKGROUND_LAYERS],
+    (os.path.join("assets", "blocks", "normalblock.png"), PLATFORM_SIZE, True),
+    *[(os.path.join("assets", "blocks", f"breakable-block-{i}.png"), PLATFORM_SIZE, True) for i in range(4)],
+    (os.path.join("assets", "normalmonster", "monster.png"), MONSTER_SIZE, True),
+    (os.path.join("assets", "normalmonster", "dead-monster.png"), MONSTER_SIZE, True),
+    (os.path.join("assets", "trampoline", "trampoline.png"), (Bonus.WIDTH, Bonus.HEIGHT), True),
+    (os.path.join("assets", "trampoline", "trampoline-activate.png"), (Bonus.WIDTH, Bonus.HEIGHT), True),
+    *[(os.path.join("assets", "player", f"{state}.png"), PLAYER_SIZE, True) for state in [
+        PlayerState.IDLE_RIGHT, PlayerState.IDLE_LEFT,
+        PlayerState.JUMP_RIGHT, PlayerState.JUMP_LEFT,
+        PlayerState.SHOOT, PlayerState.SHOOT_JUMP
+    ]],
+]
+
+REPLAY_MAGIC = b"DJRP"
+REPLAY_VERSION = 3
+REPLAY_KEYS = (K_LEFT, K_RIGHT, K_SPACE)
+
+class Replay:
+    HEADER = struct.Struct("<4sBIHII")
+    EVENT = struct.Struct("<IB")
+
+    def __init__(self, seed, fps=FPS):
+        self.seed = seed
+        self.fps = fps
+        self.frames = 0
+        self.events = []
+        self.__by_frame = {}
+
+    @staticmethod
+    def records(event):
+        return event.type in (KEYDOWN, KEYUP) and event.key in REPLAY_KEYS
+
+    def add(self, frame, event):
+        code = REPLAY_KEYS.index(event.key) << 1 | (event.type == KEYDOWN)
+        self.events.append((frame, code))
+        self.__by_frame.setdefault(frame, []).append(self._decode(code))
+
+    @staticmethod
+    def _decode(code):
+        return pygame.event.Event(KEYDOWN if code & 1 else KEYUP, key=REPLAY_KEYS[code >> 1])
+
+    def events_at(self, frame):
+        return self.__by_frame.get(frame, ())
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.HEADER.pack(
+                REPLAY_MAGIC, REPLAY_VERSION, self.seed, self.fps, self.frames, len(self.events)
+            ))
+            for frame, code in self.events:
+                f.write(self.EVENT.pack(frame, code))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, seed, fps, frames, count = cls.HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"{path} is not a version {REPLAY_VERSION} replay")
+        replay = cls(seed, fps)
+        replay.frames = frames
+        for frame, code in cls.EVENT.iter_unpack(data[cls.HEADER.size:cls.HEADER.size + count * cls.EVENT.size]):
+            replay.events.append((frame, code))
+            replay.__by_frame.setdefault(frame, []).append(cls._decode(code))
+        return replay
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+PROFILE_FRAMES = 600
+PROFILE_PHASES = ("events", "player", "level", "camera", "render", "tick")
+
+# Per-frame phase timings. With a capacity only the last `capacity` frames
+# are kept, so it can stay on for a whole session.
+class PhaseTimer:
+    def __init__(self, capacity=None):
+        self.capacity = capacity
+        self.samples = {}
+        self.counts = {}
+        self.frames = deque(maxlen=capacity)
+        self.__phase = None
+        self.__start = 0.0
+        self.__spans = []
+
+    def begin(self, phase):
+        now = time.perf_counter()
+        if self.__phase:
+            self.__spans.append((self.__phase, self.__start, now - self.__start))
+        self.__phase = phase
+        self.__start = now
+
+    def end_frame(self, **counts):
+        self.begin(None)
+        totals = {}
+        for phase, _, elapsed in self.__spans:
+            totals[phase] = totals.get(phase, 0.0) + elapsed
+        totals["frame"] = sum(totals.values())
+        for phase, elapsed in totals.items():
+            self.samples.setdefault(phase, deque(maxlen=self.capacity)).append(elapsed)
+        for name, value in counts.items():
+            self.counts.setdefault(name, deque(maxlen=self.capacity)).append(value)
+        self.frames.append((self.__spans, totals, counts))
+        self.__spans = []
+
+    def summary(self):
+        return {
+            phase: {
+                "p50": percentile(values, 50) * 1000,
+                "p90": percentile(values, 90) * 1000,
+                "p99": percentile(values, 99) * 1000,
+                "max": max(values) * 1000,
+            }
+            for phase, values in self.samples.items()
+        }
+
+    def trace_events(self):
+        # Chrome trace-event format, viewable in chrome://tracing or Perfetto
+        events = []
+        origin = None
+        for spans, totals, counts in self.frames:
+            if not spans:
+                continue
+            if origin is None:
+                origin = spans[0][1]
+            start = (spans[0][1] - origin) * 1e6
+            events.append({"name": "frame", "cat": "frame", "ph": "X", "pid": 1, "tid": 1,
+                           "ts": start, "dur": totals["frame"] * 1e6})
+            for phase, begin, elapsed in spans:
+                events.append({"name": phase, "cat": "phase", "ph": "X", "pid": 1, "tid": 1,
+                               "ts": (begin - origin) * 1e6, "dur": elapsed * 1e6})
+            if counts:
+                events.append({"name": "entities", "ph": "C", "pid": 1, "ts": start, "args": counts})
+        return events
+
+    def export_trace(self, path):
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f)
+
+class ProfilerOverlay:
+    WIDTH, HEIGHT = 260, 190
+    GRAPH_HEIGHT = 90
+    MS_SCALE = 2
+    REFRESH = 15
+    COLORS = {
+        "events": (255, 200, 60), "player": ANDROID_GREEN, "level": (60, 160, 255),
+        "camera": (200, 90, 255), "render": (255, 90, 90), "tick": GRAY,
+    }
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.font = ASSETS.font(18)
+        self.panel = pygame.Surface((self.WIDTH, self.HEIGHT), SRCALPHA)
+        self.text = None
+        self.age = 0
+
+    def _render_text(self):
+        summary = self.profiler.summary()
+        lines = ["phase     p50    p99    max ms"]
+        for phase in ("frame",) + PROFILE_PHASES:
+            if phase in summary:
+                s = summary[phase]
+                lines.append(f"{phase:<8} {s['p50']:6.2f} {s['p99']:6.2f} {s['max']:6.2f}")
+        counts = self.profiler.counts
+        if counts:
+            lines.append("  ".join(f"{name} {values[-1]}" for name, values in counts.items()))
+        text = pygame.Surface((self.WIDTH, len(lines) * 12), SRCALPHA)
+        for i, line in enumerate(lines):
+            text.blit(self.font.render(line, True, WHITE), (4, i * 12))
+        return text
+
+    def draw(self, surface):
+        if self.text is None or self.age >= self.REFRESH:
+            self.text = self._render_text()
+            self.age = 0
+        self.age += 1
+        panel = self.panel
+        panel.fill((0, 0, 0, 170))
+        bottom = self.GRAPH_HEIGHT
+        frames = list(self.profiler.frames)[-self.WIDTH:]
+        for x, (_, totals, _) in enumerate(frames, self.WIDTH - len(frames)):
+            y = bottom
+            for phase in PROFILE_PHASES:
+                height = totals.get(phase, 0.0) * 1000 * self.MS_SCALE
+                if height >= 1:
+                    pygame.draw.line(panel, self.COLORS[phase], (x, y), (x, y - height))
+                    y -= height
+        budget = bottom - 1000 / FPS * self.MS_SCALE
+        pygame.draw.line(panel, WHITE, (0, budget), (self.WIDTH, budget))
+        panel.blit(self.text, (0, bottom + 4))
+        if isinstance(surface, TextureTarget):
+            surface.stream(panel)
+        surface.blit(panel, (XWIN - self.WIDTH - 10, 10))
+
+def merge_rects(rects):
+    merged = []
+    for rect in rects:
+        rect = rect.copy()
+        i = rect.collidelist(merged)
+        while i >= 0:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+# Stands in for the display surface and remembers where each blit landed.
+class DirtyRects:
+    def __init__(self, surface):
+        self.surface = surface
+        self.previous = []
+        self.current = []
+        self.pushed_pixels = 0
+        self.background = None
+
+    def __getattr__(self, name):
+        return getattr(self.surface, name)
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        rect = self.surface.blit(source, dest, area, special_flags)
+        if rect.width and rect.height:
+            self.current.append(rect)
+        return rect
+
+    def restore(self, background, draw):
+        if background != self.background:
+            self.background = background
+            self.previous = [self.surface.get_rect()]
+            draw(self.surface)
+            return
+        for rect in self.previous:
+            self.surface.set_clip(rect)
+            draw(self.surface)
+        self.surface.set_clip(None)
+
+    def flush(self):
+        rects = merge_rects(self.previous + self.current)
+        pygame.display.update(rects)
+        self.pushed_pixels = sum(rect.width * rect.height for rect in rects)
+        self.previous = merge_rects(self.current)
+        self.current = []
+
+# Stands in for the display surface on an SDL2 Renderer, hardware
+# accelerated where there is a GPU and SDL's software renderer where not.
+# A surface is uploaded to a texture the first time it is blitted and the
+# texture is reused for as long as the surface lives, so surfaces are taken
+# to stay as they were; draw a new one to show something else, or stream()
+# one that is redrawn in place after each redraw to upload it again.
+class TextureTarget:
+    def __init__(self, size=DISPLAY, title="Doodle Jump", hidden=False):
+        global video
+        from pygame._sdl2 import video
+        self.size = size
+        self.rect = pygame.Rect((0, 0), size)
+        self.window = video.Window(title, size=size, hidden=hidden)
+        self.renderer = video.Renderer(self.window, accelerated=-1)
+        # id(surface): [weak reference, texture]. The reference's callback
+        # drops the entry as the surface goes, before its id can be reused,
+        # so a lookup by id needs no new weakref per blit.
+        self.textures = {}
+        self.uploads = 0
+
+    def texture(self, surface):
+        entry = self.textures.get(id(surface))
+        if entry is None:
+            key = id(surface)
+            ref = weakref.ref(surface, lambda _, textures=self.textures: textures.pop(key, None))
+            entry = self.textures[key] = [ref, video.Texture.from_surface(self.renderer, surface)]
+            self.uploads += 1
+        return entry[1]
+
+    def stream(self, surface):
+        # uploads what the surface holds now; blits until the next stream() reuse it
+        entry = self.textures.get(id(surface))
+        if entry is None:
+            self.texture(surface)
+        else:
+            entry[1].update(surface)
+            self.uploads += 1
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        texture = self.texture(source)
+        if area is None:
+            rect = pygame.Rect(int(dest[0]), int(dest[1]), texture.width, texture.height)
+        else:
+            area = pygame.Rect(area)
+            rect = pygame.Rect(int(dest[0]), int(dest[1]), area.width, area.height)
+        clipped = rect.clip(self.rect)
+        if clipped:
+            texture.draw(area, rect)
+        return clipped
+
+    def blits(self, blit_sequence, doreturn=True):
+        rects = [self.blit(*args) for args in blit_sequence]
+        return rects if doreturn else None
+
+    def fill(self, color, rect=None):
+        self.renderer.draw_color = color
+        self.renderer.fill_rect(pygame.Rect(rect) if rect else self.rect)
+        return pygame.Rect(rect) if rect else self.rect.copy()
+
+    def get_size(self):
+        return self.size
+
+    def get_rect(self, **kwargs):
+        rect = self.rect.copy()
+        for name, value in kwargs.items():
+            setattr(rect, name, value)
+        return rect
+
+    def to_surface(self):
+        return self.renderer.to_surface()
+
+    def present(self):
+        self.renderer.present()
+
+    def close(self):
+        # SDL has to let go of the textures and renderer before pygame.quit()
+        self.textures.clear()
+        self.renderer = None
+        self.window.destroy()
+
+for entity in (Monster, Bullet, Bonus, Platform):
+    entity.pool = Pool(entity)
+
+STARTUP_STREAM_BUDGET = 0.008
+
+# Times startup from the first line of this module to the first frame, then
+# works through the queued loading jobs a slice at a time between frames. A
+# job is a generator that yields the name of each step it has just finished.
+class StartupLoader:
+    def __init__(self, start=STARTED):
+        self.start = start
+        self.timings = []
+        self.first_frame = None
+        self.loaded = None
+        self.__last = start
+        self.__jobs = deque()
+
+    @property
+    def loading(self):
+        return bool(self.__jobs)
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.timings.append((name, now - self.__last, self.first_frame is None))
+        self.__last = now
+
+    def run(self, name, step):
+        result = step()
+        self.mark(name)
+        return result
+
+    def add(self, job):
+        self.__jobs.append(job)
+
+    def frame_drawn(self):
+        if self.first_frame is None:
+            self.mark("first frame")
+            self.first_frame = self.__last - self.start
+
+    def stream(self, budget):
+        deadline = time.perf_counter() + budget
+        self.__last = time.perf_counter()
+        while self.__jobs:
+            self.__step()
+            if time.perf_counter() >= deadline:
+                break
+
+    def finish(self):
+        self.__last = time.perf_counter()
+        while self.__jobs:
+            self.__step()
+
+    def __step(self):
+        try:
+            self.mark(next(self.__jobs[0]))
+        except StopIteration:
+            self.__jobs.popleft()
+            if not self.__jobs:
+                self.loaded = time.perf_counter() - self.start
+
+    def report(self):
+        if self.first_frame is None:
+            lines = ["startup (no frame drawn yet)"]
+        else:
+            lines = [f"first frame after {self.first_frame * 1000:.1f} ms"]
+        lines += [f"  {name:<40} {seconds * 1000:8.1f} ms" for name, seconds, early in self.timings if early]
+        later = [(name, seconds) for name, seconds, early in self.timings if not early]
+        if later:
+            lines.append(f"loaded behind the menu by {self.loaded * 1000:.1f} ms "
+                         f"({sum(s for _, s in later) * 1000:.1f} ms of work in {len(later)} steps)")
+            lines += [f"  {name:<40} {seconds * 1000:8.1f} ms" for name, seconds in later]
+        return "\n".join(lines)
+
+class Game(Singleton):
+    def __init__(self, headless=False, seed=None, record=None, replay=None, dirty_rects=False,
+                 level_backend="object", sim_hz=FPS, render_fps=FPS, trace=None, startup_profile=False,
+                 spectators=None, render_backend="surface", config=None):
+        self.startup = StartupLoader()
+        self.startup.mark("imports")
+        self.startup_profile = startup_profile
+        self.__alive = True
+        self.headless = headless
+        self.seed = seed
+        self.record_path = record
+        self.recording = None
+        self.replay = replay
+        self.trace_path = trace
+        self.profiler = PhaseTimer(PROFILE_FRAMES) if trace else None
+        self.overlay = None
+        # anything with publish(world), called after each step (spectator.SpectatorServer)
+        self.spectators = spectators
+        # a replay only reproduces at the simulation rate it was recorded at
+        self.sim_hz = replay.fps if replay else sim_hz
+        self.render_fps = render_fps
+        self.render_backend = render_backend
+        if headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            pygame.display.quit()
+        self.window = self.startup.run("display", self._open_window)
+        # a renderer redraws the whole frame anyway
+        self.dirty_rects = DirtyRects(self.window) if dirty_rects and render_backend == "surface" else None
+        self.clock = pygame.time.Clock()
+        self.main_menu = self.startup.run("menu", MainMenu)
+        self.game_state = GameState.MENU
+        self.score = 0
+        self.score_pos = Vector2(10, 10)
+        # everything else streams in while the menu is up; headless there is no menu to wait on
+        self.startup.add(self._load_gameplay(config, level_backend))
+        if headless:
+            self.startup.finish()
+
+    def _open_window(self):
+        # only the subsystems the game uses; pygame.init() would also open
+        # the audio device and joysticks. Fonts initialize on first use.
+        pygame.display.init()
+        if self.render_backend == "renderer":
+            # a window with a renderer cannot have a display surface too, so a
+            # hidden one gives convert() the pixel format to load images in
+            pygame.display.set_mode((1, 1), pygame.HIDDEN)
+            return TextureTarget(DISPLAY)
+        window = pygame.display.set_mode(DISPLAY, FLAGS)
+        pygame.display.set_caption("Doodle Jump")
+        return window
+
+    def _load_gameplay(self, config, level_backend):
+        for path in ASSETS.preload(GAMEPLAY_ASSETS):
+            yield os.path.relpath(path, "assets")
+        self.world = World(config, self.sim_hz, level_backend)
+        yield "world"
+        self.background = Background()
+        yield "background"
+        self.score_hud = ScoreHUD(ASSETS.font(24, "arial"), GRAY)
+        self.score_txt = self.score_hud.render(0)
+        yield "score font"
+        self.game_over_screen = GameOverScreen()
+        yield "game over screen"
+
+    def _stream_assets(self):
+        startup = self.startup
+        if startup.first_frame is None:
+            startup.frame_drawn()
+        if startup.loading:
+            startup.stream(STARTUP_STREAM_BUDGET)
+            if not startup.loading:
+                self._report_startup()
+
+    def _report_startup(self):
+        if self.startup_profile:
+            print(self.startup.report())
+            self.startup_profile = False
+
+    @property
+    def frame_clock(self):
+        return self.world.clock
+
+    @property
+    def camera(self):
+        return self.world.camera
+
+    @property
+    def lvl(self):
+        return self.world.level
+
+    @property
+    def player(self):
+        return self.world.player
+
+    def reset(self, seed=None):
+        if self.startup.loading:
+            self.startup.finish()
+            self._report_startup()
+        if seed is None:
+            seed = self.replay.seed if self.replay else self.seed
+        if seed is None:
+            seed = random.getrandbits(32)
+        if self.replay and self.replay.fps != self.sim_hz:
+            self.sim_hz = self.replay.fps
+            self.frame_clock.configure(self.sim_hz)
+        self.world.reset(seed)
+        self.score = 0
+        self.score_txt = self.score_hud.render(0)
         self.game_state = GameState.PLAYING
+        if self.record_path:
+            self.recording = Replay(seed, self.sim_hz)
+
+    def _finish_recording(self):
+        if self.recording:
+            self.recording.frames = self.frame_clock.frame
+            self.recording.save(self.record_path)
+            self.recording = None
+
+    def close(self):
+        self._finish_recording()
+        if self.trace_path and self.profiler:
+            self.profiler.export_trace(self.trace_path)
+        self.__alive = False
+
+    def toggle_overlay(self):
+        if self.overlay:
+            self.overlay = None
+            if not self.trace_path:
+                self.profiler = None
+        else:
+            if not self.profiler:
+                self.profiler = PhaseTimer(PROFILE_FRAMES)
+            self.overlay = ProfilerOverlay(self.profiler)
 
     def _event_loop(self):
+        if self.profiler:
+            self.profiler.begin("events")
         for event in pygame.event.get():
-            if event.type == QUIT:
+            if event.type == QUIT or event.type == WINDOWCLOSE:
                 self.close()
             elif event.type == KEYDOWN:
                 if event.key == K_ESCAPE:
                     self.close()
+                elif event.key == K_F3:
+                    self.toggle_overlay()
                 elif event.key == K_RETURN:
                     if self.game_state == GameState.MENU:
                         self.reset()
                     elif self.game_state == GameState.GAME_OVER:
                         self.game_state = GameState.MENU
-            if self.game_state == GameState.PLAYING:
+            if self.game_state == GameState.PLAYING and not self.replay:
                 self.player.handle_event(event)
+                if self.recording and Replay.records(event):
+                    self.recording.add(self.frame_clock.frame, event)
 
     async def _update_loop(self):
+        prof = self.profiler
         if self.game_state == GameState.MENU:
             self.main_menu.update()
         elif self.game_state == GameState.PLAYING:
-            self.player.update()
-            await self.lvl.update()
-            if not self.player.dead:
-                self.camera.update(self.player.rect)
-                self.score = -self.camera.state.y//50
-                self.score_txt = SMALL_FONT.render(f"{self.score} m", True, GRAY)
+            if self.replay:
+                for event in self.replay.events_at(self.frame_clock.frame):
+                    self.player.handle_event(event)
+            await self.world.advance(prof)
+            replay_over = self.replay and self.frame_clock.frame >= self.replay.frames
+            if not self.player.dead and not replay_over:
+                self.world.follow()
+                self.score = self.world.score
+                self.score_txt = self.score_hud.render(self.score)
             else:
                 self.game_state = GameState.GAME_OVER
                 self.game_over_screen.update(self.score)
+                self._finish_recording()
+            if self.spectators:
+                self.spectators.publish(self.world)
         elif self.game_state == GameState.GAME_OVER:
             pass
 
     def _render_loop(self):
+        if self.profiler:
+            self.profiler.begin("render")
+        if self.game_state == GameState.PLAYING:
+            self.camera.interpolate(self.frame_clock.alpha)
+        if self.dirty_rects:
+            self._render_dirty()
+            return
         if self.game_state == GameState.MENU:
             self.main_menu.draw(self.window)
         elif self.game_state == GameState.PLAYING:
-            self.background.draw(self.window, self.camera.state.y)
-            self.lvl.draw(self.window)
-            self.player.draw(self.window)
-            self.window.blit(self.score_txt, self.score_pos)
+            self.draw_frame(self.window)
         elif self.game_state == GameState.GAME_OVER:
             self.game_over_screen.draw(self.window)
-        pygame.display.update()
-        self.clock.tick(FPS)
+        if self.overlay:
+            self.overlay.draw(self.window)
+        if isinstance(self.window, TextureTarget):
+            self.window.present()
+        else:
+            pygame.display.update()
+
+    def draw_frame(self, surface):
+        self.background.draw(surface, round(self.camera.view_y))
+        self._draw_playing(surface)
+
+    def _draw_playing(self, surface):
+        self.lvl.draw(surface)
+        self.player.draw(surface)
+        surface.blit(self.score_txt, self.score_pos)
+
+    def _render_dirty(self):
+        # Static layers are redrawn only where last frame's sprites were, or
+        # everywhere when they change (new screen, camera scrolled).
+        dirty = self.dirty_rects
+        if self.game_state == GameState.MENU:
+            dirty.restore(GameState.MENU, self.main_menu.draw_background)
+            self.main_menu.draw_foreground(dirty)
+        elif self.game_state == GameState.PLAYING:
+            camera_y = round(self.camera.view_y)
+            dirty.restore((GameState.PLAYING, camera_y), lambda surface: self.background.draw(surface, camera_y))
+            self._draw_playing(dirty)
+        elif self.game_state == GameState.GAME_OVER:
+            dirty.restore((GameState.GAME_OVER, self.score), self.game_over_screen.draw)
+        if self.overlay:
+            self.overlay.draw(dirty)
+        dirty.flush()
+
+    async def simulate(self, frames=None, render=False):
+        self.reset()
+        count = 0
+        start = time.perf_counter()
+        while self.game_state == GameState.PLAYING and (frames is None or count < frames):
+            await self._update_loop()
+            if render:
+                self._render_loop()
+            if self.profiler:
+                self.profiler.end_frame()
+            count += 1
+            await asyncio.sleep(0)
+        elapsed = time.perf_counter() - start
+        return {
+            "frames": count,
+            "seconds": elapsed,
+            "fps": count / elapsed if elapsed else 0.0,
+            "score": self.score,
+            "dead": self.player.dead,
+        }
 
     async def run(self):
+        # Fixed timestep: the simulation advances in 1/sim_hz steps to catch up
+        # with the wall clock, and the frame drawn blends the last two steps.
+        # A slow machine renders fewer frames but the game keeps its speed.
+        step = 1 / self.sim_hz
+        lag = 0.0
+        previous = time.perf_counter()
         while self.__alive:
+            now = time.perf_counter()
+            lag += min(now - previous, MAX_FRAME_TIME)
+            previous = now
             self._event_loop()
-            await self._update_loop()
+            if self.game_state == GameState.PLAYING:
+                while lag >= step and self.game_state == GameState.PLAYING:
+                    await self._update_loop()
+                    lag -= step
+                self.frame_clock.alpha = lag / step if self.game_state == GameState.PLAYING else 1.0
+            else:
+                await self._update_loop()
+                lag = 0.0
             self._render_loop()
+            self._stream_assets()
+            prof = self.profiler
+            if prof:
+                prof.begin("tick")
+            self.clock.tick(self.render_fps)
+            if prof:
+                if self.game_state == GameState.PLAYING:
+                    prof.end_frame(**self.lvl.counts())
+                else:
+                    prof.end_frame()
             await asyncio.sleep(0)
+        await self.world.close()
+        if isinstance(self.window, TextureTarget):
+            self.window.close()
         pygame.quit()
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Doodle Jump")
+    parser.add_argument("--headless", action="store_true",
+                        help="simulate without a window as fast as possible")
+    parser.add_argument("--frames", type=int, default=None,
+                        help="number of frames to simulate in headless mode (default: until death)")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="only push the screen regions that changed to the display")
+    parser.add_argument("--sim-hz", type=int, default=FPS,
+                        help="simulation steps per second (default: %(default)s)")
+    parser.add_argument("--render-fps", type=int, default=FPS,
+                        help="cap on frames drawn per second (default: %(default)s)")
+    parser.add_argument("--trace", metavar="PATH", default=None,
+                        help=f"profile every frame and write the last {PROFILE_FRAMES} as a Chrome trace on exit")
+    parser.add_argument("--level-backend", choices=("object", "array"), default="object",
+                        help="store platforms as objects or as NumPy arrays")
+    parser.add_argument("--render-backend", choices=("surface", "renderer"), default="surface",
+                        help="blit onto the display surface or copy textures with an SDL2 Renderer")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed the level generator for reproducible runs")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print the time to the first frame, step by step, once loading is done")
+    parser.add_argument("--record", metavar="PATH", default=None,
+                        help="record each game's input to a replay file")
+    parser.add_argument("--replay", metavar="PATH", default=None,
+                        help="play back a recorded replay file")
+    args = parser.parse_args(argv)
+    if args.dirty_rects and args.render_backend == "renderer":
+        parser.error("--dirty-rects only applies to --render-backend surface")
+    return args
+
 async def main():
-    game = Game()
+    args = parse_args(sys.argv[1:])
+    replay = Replay.load(args.replay) if args.replay else None
+    if args.headless:
+        game = Game(headless=True, seed=args.seed, replay=replay, level_backend=args.level_backend,
+                    sim_hz=args.sim_hz)
+        stats = await game.simulate(args.frames)
+        print(f"Simulated {stats['frames']} frames in {stats['seconds']:.3f}s "
+              f"({stats['fps']:.0f} frames/s), score {stats['score']} m, "
+              f"{'dead' if stats['dead'] else 'alive'}")
+        pygame.quit()
+        return
+    game = Game(seed=args.seed, record=args.record, replay=replay, dirty_rects=args.dirty_rects,
+                level_backend=args.level_backend, sim_hz=args.sim_hz, render_fps=args.render_fps,
+                trace=args.trace, startup_profile=args.startup_profile, render_backend=args.render_backend)
     await game.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,216 @@
+import os
+import sys
+import gc
+import json
+import time
+import asyncio
+import argparse
+import statistics
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from main import Game, World, ASSETS, Platform, Monster, Bonus, Bullet, FPS
+from sweep import policy, drive, STALL_FRAMES
+
+# frames in an hour of play; slopes are reported per hour so they read the same at any --frames
+HOUR = FPS * 60 * 60
+MEMORY_SLOPE = 64 * 1024
+ENTITY_SLOPE = 1.0
+POOLS = (Platform, Monster, Bonus, Bullet)
+# shoot this often whatever the policy says, so bullets keep cycling too
+SHOT_INTERVAL = FPS // 2
+
+def live_surfaces():
+    # Surfaces are not tracked by gc themselves, so count the distinct ones
+    # that some tracked object (a dict, list, sprite, cache...) refers to
+    seen = set()
+    for obj in gc.get_objects():
+        for ref in gc.get_referents(obj):
+            if isinstance(ref, pygame.Surface):
+                seen.add(id(ref))
+    return len(seen)
+
+def entity_counts(world):
+    level = world.level
+    counts = level.counts()
+    counts["layout_rows"] = len(level.layout.rows) + sum(len(chunk) for chunk in level.layout.ready)
+    for cls in POOLS:
+        counts[f"{cls.__name__.lower()}_pool"] = len(cls.pool.free)
+    counts["cached_surfaces"] = ASSETS.stats()["surfaces"]
+    return counts
+
+def pooled_objects():
+    # gc-tracked objects parked in the free lists, with their instance dicts
+    return sum(1 + sum(1 for ref in gc.get_referents(obj) if gc.is_tracked(ref))
+               for cls in POOLS for obj in cls.pool.free)
+
+def traced_memory():
+    # what the game holds, leaving out this harness's own growing list of samples
+    snapshot = tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, __file__),))
+    return sum(stat.size for stat in snapshot.statistics("filename"))
+
+def growth(samples, key):
+    # Least-squares growth per hour of play, and whether it is real: counts
+    # like bullets in flight wander up and down, so the rise the fit predicts
+    # over the samples has to clear twice the scatter around the fit too.
+    frames = [sample["frame"] for sample in samples]
+    if len(set(frames)) < 2:
+        return 0.0, False
+    values = [sample[key] for sample in samples]
+    fit = statistics.linear_regression(frames, values)
+    scatter = statistics.pstdev(v - (fit.slope * f + fit.intercept) for f, v in zip(frames, values))
+    return fit.slope * HOUR, fit.slope * (frames[-1] - frames[0]) > 2 * scatter
+
+def fired():
+    return Bullet.pool.created + Bullet.pool.reused
+
+async def soak(world, game, frames, interval, seed, progress, stall_frames=STALL_FRAMES):
+    samples = []
+    games = stalls = 0
+    longest = game_start = 0
+    best = progress_frame = 0
+    collections = [s["collections"] for s in gc.get_stats()]
+    start = time.perf_counter()
+    world.reset(seed)
+    served, shots = world.level.layout.served, fired()
+    frame = 0
+
+    def take_sample():
+        gc.collect()
+        current = traced_memory()
+        # only atomic values, so gc stops tracking the sample and gc_objects stays the
+        # game's; the free lists are left out as they only grow to the busiest moment
+        sample = {
+            "frame": frame,
+            "seconds": time.perf_counter() - start,
+            "traced_bytes": current,
+            "peak_bytes": tracemalloc.get_traced_memory()[1],
+            "gc_objects": len(gc.get_objects()) - pooled_objects(),
+            "surfaces": live_surfaces(),
+            "games": games,
+        }
+        for generation, (stats, before) in enumerate(zip(gc.get_stats(), collections)):
+            sample[f"gc{generation}_collections"] = stats["collections"] - before
+        sample.update(entity_counts(world))
+        samples.append(sample)
+        if progress:
+            print(f"{frame:10d} frames  {current / 1024:9.1f} KiB  {sample['surfaces']:5d} surfaces  "
+                  f"{sample['platforms']:3d} platforms  {sample['bullets']:3d} bullets  {games} games",
+                  flush=True)
+
+    def shooting_policy(world):
+        direction, shoot = policy(world)
+        return direction, shoot or frame % SHOT_INTERVAL == 0
+
+    take_sample()
+    async for alive in drive(world, frames, shooting_policy):
+        if world.score > best:
+            best, progress_frame = world.score, frame
+        elif alive and frame - progress_frame >= stall_frames:
+            # bouncing in place exercises nothing; start the next game
+            alive = False
+            stalls += 1
+        if not alive:
+            games += 1
+            longest = max(longest, frame + 1 - game_start)
+            game_start = frame + 1
+            best, progress_frame = 0, frame + 1
+            world.reset(seed + games)
+        if game:
+            # drawing is what moves camera_rect, so let it run as in the game
+            game.score_txt = game.score_hud.render(world.score)
+            game.camera.interpolate(1.0)
+            game.draw_frame(game.window)
+        frame += 1
+        if frame % interval == 0:
+            take_sample()
+    return samples, {"games": games, "stalls": stalls, "longest_game": max(longest, frames - game_start),
+                     "platforms": world.level.layout.served - served, "bullets": fired() - shots,
+                     "seconds": time.perf_counter() - start}
+
+def idle(totals):
+    # a soak that never recycles platforms, bullets or games proves nothing about leaks
+    return [f"no {key} were cycled" for key in ("platforms", "bullets", "games") if not totals[key]]
+
+def check(samples, warmup, max_memory_slope, max_entity_slope):
+    # fit after the warmup so filling caches and pools does not count as growth
+    steady = samples[int(len(samples) * warmup):]
+    # a free list only grows to the most objects ever live at once, so it
+    # is reported but not judged; the live counts are what would leak
+    keys = ["traced_bytes"] + [key for key in samples[0] if key not in (
+        "frame", "seconds", "traced_bytes", "peak_bytes", "games")
+        and not key.endswith(("_collections", "_pool"))]
+    slopes = {}
+    failures = []
+    for key in keys:
+        slopes[key], steady_growth = growth(steady, key)
+        if key == "traced_bytes":
+            if steady_growth and slopes[key] > max_memory_slope:
+                failures.append(f"traced memory grows {slopes[key] / 1024:.1f} KiB/hour "
+                                f"(limit {max_memory_slope / 1024:.1f})")
+            continue
+        # gc_objects moves by dozens with whatever is in flight, so it gets more room
+        limit = max_entity_slope * (100 if key == "gc_objects" else 1)
+        if steady_growth and slopes[key] > limit:
+            failures.append(f"{key} grows {slopes[key]:.2f}/hour (limit {limit:g})")
+    return slopes, failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Play one long headless session and fail if memory or entity counts keep growing"
+    )
+    parser.add_argument("--frames", type=int, default=1000000)
+    parser.add_argument("--interval", type=int, default=FPS * 60 * 5, help="frames between samples")
+    parser.add_argument("--seed", type=int, default=0, help="first seed; each new game uses the next")
+    parser.add_argument("--stall-frames", type=int, default=STALL_FRAMES,
+                        help="start a new game after this many frames without gaining height")
+    parser.add_argument("--level-backend", choices=("object", "array"), default="object")
+    parser.add_argument("--render", action="store_true", help="also draw every frame into a headless window")
+    parser.add_argument("--warmup", type=float, default=0.1, help="fraction of samples left out of the fit")
+    parser.add_argument("--max-memory-slope", type=float, default=MEMORY_SLOPE / 1024,
+                        help="KiB of traced memory growth allowed per hour of play (default: %(default)g)")
+    parser.add_argument("--max-entity-slope", type=float, default=ENTITY_SLOPE,
+                        help="growth of any entity, pool or surface count allowed per hour (default: %(default)g)")
+    parser.add_argument("--quiet", action="store_true", help="only print the summary")
+    parser.add_argument("--json", metavar="PATH", help="write the samples, slopes and verdict as JSON")
+    args = parser.parse_args(argv)
+
+    if args.render:
+        game = Game(headless=True, level_backend=args.level_backend)
+        world = game.world
+    else:
+        game = None
+        pygame.display.set_mode((1, 1))
+        world = World(level_backend=args.level_backend)
+    tracemalloc.start()
+    samples, totals = asyncio.run(soak(world, game, args.frames, args.interval, args.seed, not args.quiet,
+                                           args.stall_frames))
+    tracemalloc.stop()
+    slopes, failures = check(samples, args.warmup, args.max_memory_slope * 1024, args.max_entity_slope)
+    failures += idle(totals)
+
+    print(f"{args.frames} frames ({args.frames / HOUR:.1f} hours of play, {totals['games']} games of which "
+          f"{totals['stalls']} stalled, longest {totals['longest_game']} frames) in {totals['seconds']:.0f}s, "
+          f"{len(samples)} samples")
+    print(f"cycled {totals['platforms']} platforms and {totals['bullets']} bullets")
+    print(f"growth per hour after a {args.warmup:.0%} warmup:")
+    print(f"  {'traced_bytes':<16} {slopes['traced_bytes'] / 1024:+10.1f} KiB")
+    for key, value in slopes.items():
+        if key != "traced_bytes":
+            print(f"  {key:<16} {value:+10.2f}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK: no steady growth")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"frames": args.frames, "level_backend": args.level_backend, "render": args.render,
+                       **totals, "slopes": slopes, "failures": failures, "samples": samples}, f, indent=1)
+    pygame.quit()
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,445 @@
+import os
+import sys
+import json
+import time
+import base64
+import struct
+import asyncio
+import socket
+import hashlib
+import argparse
+import subprocess
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from main import Game, World, Replay, PlayerState, percentile, FPS
+
+# Wire format, little-endian. Every message starts with HEADER; a keyframe
+# then lists every platform, a delta lists the platforms removed from and
+# changed or added since its keyframe, and both end with all bullets.
+# Platforms are keyed by their y, which no two share. Over raw TCP each
+# message is prefixed with its length; over WebSocket it is one binary frame.
+KEYFRAME, DELTA = 0, 1
+KEYFRAME_INTERVAL = FPS
+HEADER = struct.Struct("<BIIiiiiB")  # kind, frame, keyframe id, camera y, score, player x, y, state
+PLATFORM = struct.Struct("<iiBi")  # y, x, flags, monster x
+COUNT = struct.Struct("<H")
+REMOVED = struct.Struct("<i")
+BULLET = struct.Struct("<ii")
+LENGTH = struct.Struct("<I")
+PLAYER_STATES = (
+    PlayerState.IDLE_RIGHT, PlayerState.IDLE_LEFT, PlayerState.JUMP_RIGHT,
+    PlayerState.JUMP_LEFT, PlayerState.SHOOT, PlayerState.SHOOT_JUMP,
+)
+# platform flags
+BREAKABLE, BREAKING, BONUS, MONSTER, MONSTER_DEAD = (1 << i for i in range(5))
+
+# bytes a viewer may have in flight, in the kernel and in asyncio each; past
+# that it is sent newer messages only, so a slow viewer lags by at most this
+VIEWER_BUFFER = 4096
+
+# what a fake slow viewer asks the kernel and asyncio to buffer for it
+SLOW_VIEWER_BUFFER = 256
+
+RAW_HELLO = b"DJSP"
+WEBSOCKET_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+def platform_state(world):
+    platforms = {}
+    for platform in world.level.platforms:
+        monster = platform.monster
+        flags = (
+            BREAKABLE * platform.breakable | BREAKING * platform.breaking | BONUS * (platform.bonus is not None)
+            | (MONSTER | MONSTER_DEAD * monster.dead if monster else 0)
+        )
+        platforms[platform.rect.y] = (platform.rect.x, flags, monster.rect.x if monster else 0)
+    return platforms
+
+# Encodes a world once per step. Deltas are against the last keyframe, not
+# the previous message, so a viewer that missed messages can decode the next
+# one as long as it has that keyframe.
+class StateEncoder:
+    def __init__(self, keyframe_interval=KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.key_id = 0
+        self.key_frame = None
+        self.keyframe = {}
+
+    def encode(self, world):
+        player = world.player
+        frame = world.clock.frame
+        player.update_state()
+        platforms = platform_state(world)
+        # a new game starts over at frame 0, so it gets a keyframe straight away
+        key = self.key_frame is None or not 0 <= frame - self.key_frame < self.keyframe_interval
+        if key:
+            self.key_id += 1
+            self.key_frame = frame
+            self.keyframe = platforms
+        parts = [HEADER.pack(
+            KEYFRAME if key else DELTA, frame, self.key_id, world.camera.state.y, world.score,
+            player.rect.x, player.rect.y, PLAYER_STATES.index(player.current_state),
+        )]
+        if key:
+            parts.append(COUNT.pack(len(platforms)))
+            parts.extend(PLATFORM.pack(y, *record) for y, record in platforms.items())
+        else:
+            removed = [y for y in self.keyframe if y not in platforms]
+            changed = [(y, record) for y, record in platforms.items() if self.keyframe.get(y) != record]
+            parts.append(COUNT.pack(len(removed)))
+            parts.extend(REMOVED.pack(y) for y in removed)
+            parts.append(COUNT.pack(len(changed)))
+            parts.extend(PLATFORM.pack(y, *record) for y, record in changed)
+        bullets = world.level.bullets
+        parts.append(COUNT.pack(len(bullets)))
+        parts.extend(BULLET.pack(bullet.rect.x, bullet.rect.y) for bullet in bullets)
+        return key, b"".join(parts)
+
+# The viewer side: turns messages back into a state dict. Returns None for
+# a delta whose keyframe it has not seen.
+class StateDecoder:
+    def __init__(self):
+        self.key_id = None
+        self.keyframe = {}
+
+    def decode(self, message):
+        kind, frame, key_id, camera_y, score, x, y, state = HEADER.unpack_from(message)
+        offset = HEADER.size
+
+        def records(record):
+            nonlocal offset
+            count, = COUNT.unpack_from(message, offset)
+            offset += COUNT.size
+            end = offset + count * record.size
+            values = record.iter_unpack(message[offset:end])
+            offset = end
+            return values
+
+        if kind == KEYFRAME:
+            self.key_id = key_id
+            self.keyframe = {py: (px, flags, monster_x) for py, px, flags, monster_x in records(PLATFORM)}
+            platforms = self.keyframe
+        elif key_id != self.key_id:
+            return None
+        else:
+            platforms = dict(self.keyframe)
+            for py, in records(REMOVED):
+                del platforms[py]
+            platforms.update((py, (px, flags, monster_x)) for py, px, flags, monster_x in records(PLATFORM))
+        return {
+            "frame": frame, "camera_y": camera_y, "score": score,
+            "player": (x, y, PLAYER_STATES[state]), "platforms": platforms, "bullets": list(records(BULLET)),
+        }
+
+def websocket_header(length):
+    if length < 126:
+        return struct.pack("!BB", 0x82, length)
+    if length < 1 << 16:
+        return struct.pack("!BBH", 0x82, 126, length)
+    return struct.pack("!BBQ", 0x82, 127, length)
+
+class _Viewer:
+    __slots__ = ("writer", "websocket", "pending", "key_id", "wake", "sent", "dropped")
+
+    def __init__(self, writer, websocket):
+        self.writer = writer
+        self.websocket = websocket
+        self.pending = None
+        self.key_id = None
+        self.wake = asyncio.Event()
+        self.sent = 0
+        self.dropped = 0
+
+# Publishes each step to every connected viewer. A message is encoded and
+# framed once and then handed to all viewers; each viewer holds only the
+# newest one, so one that cannot keep up skips messages (and is sent the
+# current keyframe first when it needs it) while publish() never waits on
+# a socket. Viewers connect over WebSocket or send RAW_HELLO for raw TCP.
+class SpectatorServer:
+    def __init__(self, host="127.0.0.1", port=8765, keyframe_interval=KEYFRAME_INTERVAL):
+        self.host = host
+        self.port = port
+        self.encoder = StateEncoder(keyframe_interval)
+        self.viewers = set()
+        self.keyframe = None
+        self.published = 0
+        self.bytes_published = 0
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        for viewer in list(self.viewers):
+            viewer.writer.close()
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    def publish(self, world):
+        key, message = self.encoder.encode(world)
+        framed = (LENGTH.pack(len(message)) + message, websocket_header(len(message)) + message)
+        if key:
+            self.keyframe = framed
+        self.published += 1
+        self.bytes_published += len(message)
+        for viewer in self.viewers:
+            if viewer.pending is not None:
+                viewer.dropped += 1
+            viewer.pending = framed
+            viewer.wake.set()
+
+    def stats(self):
+        return {
+            "viewers": len(self.viewers),
+            "published": self.published,
+            "bytes_published": self.bytes_published,
+            "sent": sum(viewer.sent for viewer in self.viewers),
+            "dropped": sum(viewer.dropped for viewer in self.viewers),
+        }
+
+    async def _handshake(self, reader, writer):
+        hello = await reader.readexactly(4)
+        if hello == RAW_HELLO:
+            return False
+        if hello != b"GET ":
+            raise ConnectionError("not a spectator client")
+        request = await reader.readuntil(b"\r\n\r\n")
+        headers = {}
+        for line in request.decode("latin-1").split("\r\n")[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        key = headers.get("sec-websocket-key")
+        if not key:
+            raise ConnectionError("not a WebSocket upgrade")
+        accept = base64.b64encode(hashlib.sha1(key.encode() + WEBSOCKET_GUID).digest()).decode()
+        writer.write((
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode())
+        return True
+
+    async def _serve(self, reader, writer):
+        try:
+            viewer = _Viewer(writer, await self._handshake(reader, writer))
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            writer.close()
+            return
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, VIEWER_BUFFER)
+        writer.transport.set_write_buffer_limits(high=VIEWER_BUFFER)
+        self.viewers.add(viewer)
+        sender = asyncio.ensure_future(self._send(viewer))
+        try:
+            # nothing viewers send matters; reading only notices when they leave
+            while await reader.read(4096):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self.viewers.discard(viewer)
+            sender.cancel()
+            writer.close()
+
+    async def _send(self, viewer):
+        writer = viewer.writer
+        try:
+            while True:
+                await viewer.wake.wait()
+                viewer.wake.clear()
+                framed, viewer.pending = viewer.pending, None
+                if viewer.key_id != self.encoder.key_id:
+                    writer.write(self.keyframe[viewer.websocket])
+                    viewer.key_id = self.encoder.key_id
+                    viewer.sent += 1
+                if framed is not self.keyframe:
+                    writer.write(framed[viewer.websocket])
+                    viewer.sent += 1
+                await writer.drain()
+        except ConnectionError:
+            writer.close()
+
+# --- load test -------------------------------------------------------------
+
+async def _read_raw(reader):
+    length, = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+    return await reader.readexactly(length)
+
+async def _read_websocket(reader):
+    head = await reader.readexactly(2)
+    length = head[1] & 0x7f
+    if length == 126:
+        length, = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        length, = struct.unpack("!Q", await reader.readexactly(8))
+    return await reader.readexactly(length)
+
+async def _fake_viewer(port, websocket, delay, stats):
+    sock = socket.socket()
+    if delay:
+        # a slow reader with the smallest window the kernel allows and next
+        # to no buffering of its own, like a phone on a bad link, so the
+        # server's buffers fill and it has to skip messages
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SLOW_VIEWER_BUFFER)
+    sock.setblocking(False)
+    await asyncio.get_running_loop().sock_connect(sock, ("127.0.0.1", port))
+    reader, writer = await asyncio.open_connection(sock=sock, limit=SLOW_VIEWER_BUFFER if delay else 2 ** 16)
+    if websocket:
+        key = base64.b64encode(os.urandom(16)).decode()
+        writer.write((
+            f"GET / HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+        ).encode())
+        await reader.readuntil(b"\r\n\r\n")
+        read = _read_websocket
+    else:
+        writer.write(RAW_HELLO)
+        read = _read_raw
+    decoder = StateDecoder()
+    try:
+        while True:
+            message = await read(reader)
+            stats["messages"] += 1
+            stats["bytes"] += len(message)
+            if decoder.decode(message) is None:
+                stats["undecodable"] += 1
+            if delay:
+                await asyncio.sleep(delay)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+async def run_viewers(port, count, slow, delay, websocket_share):
+    fast = {"messages": 0, "bytes": 0, "undecodable": 0}
+    slowed = {"messages": 0, "bytes": 0, "undecodable": 0}
+    tasks = [
+        _fake_viewer(port, i % round(1 / websocket_share) == 0 if websocket_share else False,
+                     delay if i < slow else 0, slowed if i < slow else fast)
+        for i in range(count)
+    ]
+    await asyncio.gather(*tasks)
+    print(json.dumps({"fast": fast, "slow": slowed}), flush=True)
+
+async def _play(world, server, frames, realtime, seed):
+    from sweep import drive
+
+    world.reset(seed)
+    step = 1 / FPS
+    publish_times = []
+    start = time.perf_counter()
+    frame = 0
+    async for alive in drive(world, frames):
+        if not alive:
+            seed += 1
+            world.reset(seed)
+        began = time.perf_counter()
+        server.publish(world)
+        publish_times.append(time.perf_counter() - began)
+        frame += 1
+        if realtime:
+            await asyncio.sleep(max(0.0, start + frame * step - time.perf_counter()))
+        else:
+            await asyncio.sleep(0)
+    return publish_times
+
+async def load_test(args):
+    pygame.display.set_mode((1, 1))
+    server = SpectatorServer(port=0, keyframe_interval=args.keyframe_interval)
+    await server.start()
+    world = World()
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    await _play(world, server, args.frames, not args.fast, args.seed)
+    baseline_cpu, baseline_wall = time.process_time() - cpu, time.perf_counter() - wall
+
+    # the viewers run in their own process so only the server's CPU is counted here
+    viewers = await asyncio.create_subprocess_exec(
+        sys.executable, os.path.abspath(__file__), "viewers", "--port", str(server.port),
+        "--count", str(args.viewers), "--slow", str(args.slow), "--delay", str(args.delay),
+        "--websocket-share", str(args.websocket_share), stdout=subprocess.PIPE,
+        env={**os.environ, "PYGAME_HIDE_SUPPORT_PROMPT": "1"},
+    )
+    while len(server.viewers) < args.viewers:
+        await asyncio.sleep(0.01)
+    before = server.stats()
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    publish_times = await _play(world, server, args.frames, not args.fast, args.seed)
+    loaded_cpu, loaded_wall = time.process_time() - cpu, time.perf_counter() - wall
+    after = server.stats()
+    await server.close()
+    received = json.loads((await viewers.communicate())[0])
+
+    sent = after["sent"] - before["sent"]
+    published = after["bytes_published"] - before["bytes_published"]
+    per_frame = (loaded_cpu - baseline_cpu) / args.frames
+    viewer_bytes = received["fast"]["bytes"] + received["slow"]["bytes"]
+    print(f"{args.viewers} viewers ({args.slow} slow, reading every {args.delay * 1000:.0f} ms), "
+          f"{args.frames} frames, keyframe every {args.keyframe_interval}")
+    print(f"server CPU: {baseline_cpu / args.frames * 1e6:.0f} us/frame alone, "
+          f"{loaded_cpu / args.frames * 1e6:.0f} us/frame with viewers, "
+          f"{per_frame / args.viewers * 1e6:.1f} us/frame per viewer "
+          f"({per_frame / args.viewers * FPS * 100:.2f}% of a core per viewer at {FPS} Hz)")
+    print(f"publish(): median {percentile(publish_times, 50) * 1e6:.0f} us, "
+          f"p99 {percentile(publish_times, 99) * 1e6:.0f} us, max {max(publish_times) * 1e3:.2f} ms")
+    print(f"encoded {published / args.frames:.0f} B/frame = {published / loaded_wall / 1024:.1f} KiB/s per viewer; "
+          f"delivered {viewer_bytes / loaded_wall / 1024:.1f} KiB/s in total")
+    print(f"messages sent {sent}, dropped for slow viewers {after['dropped'] - before['dropped']}; "
+          f"received fast {received['fast']['messages']}, slow {received['slow']['messages']}, "
+          f"undecodable {received['fast']['undecodable'] + received['slow']['undecodable']}")
+    if baseline_wall:
+        print(f"game loop wall time {baseline_wall:.2f}s alone, {loaded_wall:.2f}s with viewers")
+
+async def serve(args):
+    replay = Replay.load(args.replay) if args.replay else None
+    server = SpectatorServer(args.host, args.port, args.keyframe_interval)
+    await server.start()
+    print(f"spectators can connect to ws://{args.host}:{server.port}/ (or raw TCP after sending {RAW_HELLO!r})")
+    game = Game(seed=args.seed, replay=replay, level_backend=args.level_backend, sim_hz=args.sim_hz,
+                spectators=server)
+    await game.run()
+    await server.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream live games to spectators as delta-encoded state")
+    commands = parser.add_subparsers(dest="command", required=True)
+    play = commands.add_parser("serve", help="play the game and stream it to spectators")
+    play.add_argument("--host", default="127.0.0.1")
+    play.add_argument("--port", type=int, default=8765)
+    play.add_argument("--keyframe-interval", type=int, default=KEYFRAME_INTERVAL)
+    play.add_argument("--seed", type=int, default=None)
+    play.add_argument("--replay", metavar="PATH", default=None)
+    play.add_argument("--level-backend", choices=("object", "array"), default="object")
+    play.add_argument("--sim-hz", type=int, default=FPS)
+    test = commands.add_parser("loadtest", help="stream a scripted game to local fake viewers and report the cost")
+    test.add_argument("--viewers", type=int, default=100)
+    test.add_argument("--slow", type=int, default=10, help="how many viewers read slowly")
+    test.add_argument("--delay", type=float, default=0.1, help="seconds a slow viewer waits after each message")
+    test.add_argument("--websocket-share", type=float, default=0.5, help="fraction of viewers using WebSocket")
+    test.add_argument("--frames", type=int, default=600)
+    test.add_argument("--keyframe-interval", type=int, default=KEYFRAME_INTERVAL)
+    test.add_argument("--fast", action="store_true", help="do not pace the game at its real rate")
+    test.add_argument("--seed", type=int, default=0)
+    fake = commands.add_parser("viewers")
+    fake.add_argument("--port", type=int, required=True)
+    fake.add_argument("--count", type=int, required=True)
+    fake.add_argument("--slow", type=int, default=0)
+    fake.add_argument("--delay", type=float, default=0.1)
+    fake.add_argument("--websocket-share", type=float, default=0.5)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        asyncio.run(serve(args))
+    elif args.command == "loadtest":
+        asyncio.run(load_test(args))
+        pygame.quit()
+    else:
+        asyncio.run(run_viewers(args.port, args.count, args.slow, args.delay, args.websocket_share))
+
+if __name__ == "__main__":
+    main()
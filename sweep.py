@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+import itertools
+import statistics
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from main import World, WorldConfig, percentile, FPS, YWIN
+
+# a game that gains no height for this long is stuck bouncing, not surviving
+STALL_FRAMES = FPS * 10
+# a falling player lands on whatever its body overlaps, so a platform this
+# far above the top of a jump can still be reached
+REACH_ABOVE = 20
+
+def policy(world):
+    # Steer under the highest platform the current jump can still reach and
+    # shoot monsters that are straight above. Breakable platforms count: one
+    # is often the only way up, and landing on it still jumps.
+    player = world.player
+    rect = player.rect
+    vy = player._velocity.y
+    reach = rect.bottom - (vy * vy / (2 * world.config.gravity) if vy < 0 else 0)
+    target = None
+    shoot = False
+    for platform in world.level.query(rect.top - YWIN, rect.bottom + YWIN):
+        monster = platform.monster
+        if monster and not monster.dead and monster.rect.y < rect.y:
+            shoot = shoot or abs(monster.rect.centerx - rect.centerx) < 20
+        if platform.rect.y >= reach - REACH_ABOVE:
+            target = platform
+    direction = 0
+    if target is not None:
+        dx = target.rect.centerx - rect.centerx
+        stop = player._velocity.x ** 2 / 1.2 + 5
+        if dx > stop:
+            direction = 1
+        elif dx < -stop:
+            direction = -1
+    return direction, shoot
+
+async def drive(world, frames, policy=policy):
+    # Steps the world up to `frames` times on the policy's input, yielding
+    # whether the game is still going after each step; what to do when it
+    # ends (stop, reset, count it) is up to the caller.
+    for _ in range(frames):
+        direction, shoot = policy(world)
+        world.player.move(direction)
+        if shoot:
+            world.player.shoot()
+        yield await world.step()
+
+async def play_games(world, seeds, frames, stall_frames=STALL_FRAMES):
+    results = []
+    for seed in seeds:
+        world.reset(seed)
+        alive = True
+        stalled = False
+        frame = progress = best = 0
+        async for alive in drive(world, frames):
+            frame += 1
+            if world.score > best:
+                best, progress = world.score, frame
+            elif frame - progress >= stall_frames:
+                stalled = True
+                break
+            if not alive:
+                break
+        results.append({"seed": seed, "score": world.score, "frames": frame, "alive": alive and not stalled,
+                        "stalled": stalled})
+    return results
+
+def init_worker():
+    # images are converted for the display format, so each process needs a mode
+    pygame.display.set_mode((1, 1))
+
+def run_batch(params, seeds, frames, backend, spawns=None, stall_frames=STALL_FRAMES):
+    world = World(WorldConfig(**params, spawn_table=spawns), level_backend=backend)
+    return params, asyncio.run(play_games(world, seeds, frames, stall_frames))
+
+def parse_param(text):
+    name, _, values = text.partition("=")
+    # a spawn table is not a value to sweep; --spawn-table sets it for every set
+    fields = [field for field, default in WorldConfig.FIELDS.items() if default is not None]
+    if name not in fields or not values:
+        raise argparse.ArgumentTypeError(f"expected NAME=V1,V2,... with NAME one of {', '.join(fields)}")
+    default = WorldConfig.FIELDS[name]
+    if isinstance(default, tuple):
+        parsed = [tuple(int(v) for v in value.split(":")) for value in values.split(",")]
+    else:
+        parsed = [type(default)(value) for value in values.split(",")]
+    return name, parsed
+
+def summarize(params, games):
+    scores = [g["score"] for g in games]
+    return {
+        "params": params,
+        "games": len(games),
+        "score_mean": statistics.fmean(scores),
+        "score_median": statistics.median(scores),
+        "score_p90": percentile(scores, 90),
+        "score_max": max(scores),
+        # stalled games are not survivors
+        "survival": sum(g["alive"] for g in games) / len(games),
+        "stalls": sum(g["stalled"] for g in games),
+        "frames_mean": statistics.fmean(g["frames"] for g in games),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play many seeded headless games per parameter set")
+    parser.add_argument("--param", dest="params", action="append", type=parse_param, default=[],
+                        metavar="NAME=V1,V2", help="WorldConfig field to sweep; tuples as 50:210 (repeatable)")
+    parser.add_argument("--games", type=int, default=100, help="games per parameter set")
+    parser.add_argument("--frames", type=int, default=FPS * 60, help="frame limit per game")
+    parser.add_argument("--seed", type=int, default=0, help="first seed; games use consecutive seeds")
+    parser.add_argument("--stall-frames", type=int, default=STALL_FRAMES,
+                        help="end a game as stalled after this many frames without gaining height")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch", type=int, default=25, help="games per task sent to a worker")
+    parser.add_argument("--level-backend", choices=("object", "array"), default="object")
+    parser.add_argument("--spawn-table", metavar="PATH", help="JSON spawn table to play with (see main.spawn_table)")
+    parser.add_argument("--json", metavar="PATH", help="write per-game results and summaries as JSON")
+    args = parser.parse_args(argv)
+
+    spawns = None
+    if args.spawn_table:
+        with open(args.spawn_table) as f:
+            spawns = json.load(f)
+    names = [name for name, _ in args.params]
+    grid = [dict(zip(names, values)) for values in itertools.product(*(v for _, v in args.params))]
+    seeds = list(range(args.seed, args.seed + args.games))
+    tasks = [
+        (params, seeds[i:i + args.batch], args.frames, args.level_backend, spawns, args.stall_frames)
+        for params in grid for i in range(0, len(seeds), args.batch)
+    ]
+
+    results = {}
+    start = time.perf_counter()
+    if args.workers == 1:
+        init_worker()
+        batches = (run_batch(*task) for task in tasks)
+    else:
+        pool = ProcessPoolExecutor(args.workers, initializer=init_worker)
+        batches = (future.result() for future in as_completed([pool.submit(run_batch, *t) for t in tasks]))
+    for params, games in batches:
+        results.setdefault(json.dumps(params, sort_keys=True), []).extend(games)
+    if args.workers != 1:
+        pool.shutdown()
+    elapsed = time.perf_counter() - start
+
+    summaries = [summarize(params, results[json.dumps(params, sort_keys=True)]) for params in grid]
+    total_games = sum(s["games"] for s in summaries)
+    total_frames = sum(g["frames"] for games in results.values() for g in games)
+    for s in summaries:
+        label = " ".join(f"{k}={v}" for k, v in s["params"].items()) or "defaults"
+        print(f"{label:<48} games {s['games']:5d}  score mean {s['score_mean']:7.1f}  "
+              f"median {s['score_median']:6.1f}  p90 {s['score_p90']:6d}  "
+              f"survival {s['survival'] * 100:5.1f}%  stalls {s['stalls']:4d}  frames {s['frames_mean']:7.0f}")
+    print(f"{total_games} games, {total_frames} frames in {elapsed:.2f}s with {args.workers} workers "
+          f"({total_games / elapsed:.1f} games/s, {total_frames / elapsed:.0f} frames/s)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "workers": args.workers,
+                "seconds": elapsed,
+                "summaries": summaries,
+                "games": {key: games for key, games in results.items()},
+            }, f, indent=2)
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
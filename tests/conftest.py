@@ -0,0 +1,42 @@
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+# the game loads its assets relative to the working directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+
+import pygame
+import pytest
+
+@pytest.fixture(scope="session", autouse=True)
+def display():
+    # loading images needs a display mode, even a headless one
+    pygame.display.set_mode((1, 1))
+    yield
+    pygame.quit()
+
+@pytest.fixture
+def play():
+    # drives a world as sweep.py plays for up to `frames` steps, calling
+    # after(world) after each one; False if the game ended first. The inputs
+    # only depend on the world, so equal worlds get equal inputs
+    import asyncio
+
+    from sweep import drive
+
+    def play(world, frames, after=None):
+        async def run():
+            async for alive in drive(world, frames):
+                if not alive:
+                    return False
+                if after is not None:
+                    after(world)
+            return True
+
+        return asyncio.run(run())
+
+    return play
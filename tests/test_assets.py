@@ -0,0 +1,35 @@
+import pygame
+
+from main import Game, ASSETS, GAMEPLAY_ASSETS
+
+def test_gameplay_images_are_resident_before_playing(monkeypatch, play):
+    game = Game(headless=True, seed=2)
+    assert not game.startup.loading
+    misses = ASSETS.misses
+    for path, size, alpha in GAMEPLAY_ASSETS:
+        ASSETS.image(path, size, alpha)
+    assert ASSETS.misses == misses
+
+    resident = set(GAMEPLAY_ASSETS)
+    cached = ASSETS.image
+
+    def image(path, size=None, alpha=True):
+        assert (path, size, alpha) in resident, f"{path} at {size} was not loaded up front"
+        return cached(path, size, alpha)
+
+    def load(*args, **kwargs):
+        raise AssertionError(f"image decoded mid-game: {args[0]}")
+
+    # what is built on first use from here on (animation frames, solid
+    # stand-ins) comes from images already in the cache
+    monkeypatch.setattr(ASSETS, "image", image)
+    monkeypatch.setattr(pygame.image, "load", load)
+    world = game.world
+
+    def draw(world):
+        game.camera.interpolate(1.0)
+        game.draw_frame(game.window)
+
+    game.reset()
+    assert play(world, 900, draw)
+    assert world.score > 100
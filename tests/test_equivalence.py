@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from batch import random_actions, run_batch, run_worlds, differences
+from main import World
+from sweep import policy, drive
+
+# random input rarely lives long, so many short games
+WORLDS = 128
+FRAMES = 2000
+
+@pytest.mark.parametrize("hz", [60, 15])
+def test_batch_matches_worlds(hz):
+    # what `python batch.py --compare` checks, on fewer worlds
+    direction, shoot = random_actions(WORLDS, FRAMES, 0)
+    batch, steps, _ = run_batch(WORLDS, FRAMES, 0, direction, shoot, hz)
+    results, world_steps, _ = asyncio.run(run_worlds(WORLDS, FRAMES, 0, direction, shoot, hz))
+    assert steps == world_steps
+    assert differences(batch, results) == []
+
+@pytest.mark.parametrize("hz", [60, 15])
+def test_level_backends_match(hz):
+    # sweep.py's inputs, taken from one world and given to both, leave the
+    # same snapshot on both level backends after every step
+    async def play(seed):
+        worlds = [World(sim_hz=hz), World(sim_hz=hz, level_backend="array")]
+        for world in worlds:
+            world.reset(seed)
+        inputs = []
+
+        def lead(world):
+            inputs.append(policy(world))
+            return inputs[-1]
+
+        # the array world is given whatever the object world just was
+        follower = drive(worlds[1], FRAMES, lambda world: inputs[-1])
+        frame = 0
+        async for alive in drive(worlds[0], FRAMES, lead):
+            assert alive == await anext(follower)
+            assert worlds[0].snapshot() == worlds[1].snapshot(), f"seed {seed} differs at step {frame}"
+            if not alive:
+                return
+            frame += 1
+
+    for seed in range(8):
+        asyncio.run(play(seed))
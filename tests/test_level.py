@@ -0,0 +1,22 @@
+import asyncio
+
+from main import World, WorldConfig
+
+def test_removed_platforms_leave_the_rest_in_order():
+    world = World(WorldConfig(max_platform_number=40))
+    world.reset(1)
+    level = world.level
+    asyncio.run(level.update())
+    platforms = list(level.platforms)
+    # a run at the front, two apart, one at the end, and one queued twice
+    gone = platforms[:3] + [platforms[10], platforms[12], platforms[-1], platforms[12]]
+    for platform in gone:
+        level.remove_platform(platform)
+    asyncio.run(level.update())
+    kept = [p for p in platforms if p not in gone]
+    assert level.platforms[:len(kept)] == kept
+    ys = [p.rect.y for p in level.platforms]
+    assert ys == sorted(ys, reverse=True)
+    top, bottom = kept[8].rect.y, kept[5].rect.y
+    assert all(p in level.query(top, bottom) for p in kept[5:9])
+    world.level.layout.cancel()
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from main import World, WorldConfig, FPS, XWIN, PLAYER_SIZE
+
+def bounces(hz, count=3):
+    # how far the player rises after each of its first landings
+    world = World(sim_hz=hz)
+    world.reset(0)
+    player = world.player
+    rises = []
+    base = top = None
+
+    async def play():
+        nonlocal base, top
+        while len(rises) < count:
+            falling = player._velocity.y
+            assert await world.step()
+            y = player.position[1]
+            if player._velocity.y < falling:
+                if base is not None:
+                    rises.append(base - top)
+                base = top = y
+            elif base is not None:
+                top = min(top, y)
+
+    asyncio.run(play())
+    return rises
+
+def flight(hz, frames):
+    # height above the take-off point at every step of a jump from mid-air
+    world = World(sim_hz=hz)
+    world.reset(0)
+    player = world.player
+    player.jump()
+    start = player.position[1]
+    heights = {}
+
+    async def play():
+        while world.clock.frame * world.clock.scale < frames:
+            await world.step()
+            heights[world.clock.frame * world.clock.scale] = start - player.position[1]
+
+    asyncio.run(play())
+    return heights
+
+def bounce_heights(hz, gap, count=3):
+    # rect.bottom at each landing on a tower of full-width platforms gap apart
+    config = WorldConfig(platform_size=(XWIN, 4), platform_distance_gap=(gap, gap),
+                         spawn_table={"kind": {"normal": 1}})
+    world = World(config, sim_hz=hz)
+    world.reset(0)
+    player = world.player
+    bottoms = []
+
+    async def play():
+        while len(bottoms) < count and world.clock.frame < hz * 10:
+            falling = player._velocity.y
+            assert await world.step()
+            if player._velocity.y < falling:
+                bottoms.append(player.rect.bottom)
+
+    asyncio.run(play())
+    return bottoms
+
+def test_jump_height_does_not_depend_on_sim_rate():
+    reference = bounces(FPS)
+    assert reference == pytest.approx([194.2] * 3, abs=0.01)
+    for hz in (120, 30, 15):
+        assert bounces(hz) == pytest.approx(reference, abs=1e-6)
+
+def test_coarse_steps_land_on_the_60hz_path():
+    reference = flight(FPS, 16)
+    for hz in (120, 30, 15, 7.5):
+        heights = flight(hz, 16)
+        for frame, height in heights.items():
+            if frame in reference:
+                assert height == pytest.approx(reference[frame], abs=1e-6)
+
+def test_coarse_steps_land_at_the_top_of_the_jump():
+    # the next platform is as high as a jump can reach: the top of the jump
+    # plus the player's height, since a falling player lands on whatever its
+    # body overlaps; an 8 frame step samples the arc 7.5 px below its top
+    gap = 192 + PLAYER_SIZE[1]
+    reference = bounce_heights(FPS, gap)
+    assert [a - b for a, b in zip(reference, reference[1:])] == [gap, gap]
+    for hz in (30, 15, 7.5):
+        assert bounce_heights(hz, gap) == reference
@@ -0,0 +1,18 @@
+import pygame
+
+from main import TextureTarget, ProfilerOverlay, PhaseTimer, PROFILE_FRAMES
+
+def test_textures_upload_once_per_change():
+    target = TextureTarget(hidden=True)
+    try:
+        sprite = pygame.Surface((10, 10))
+        for _ in range(5):
+            target.blit(sprite, (0, 0))
+        assert target.uploads == 1
+        # the overlay redraws its panel every frame, and uploads it once for it
+        overlay = ProfilerOverlay(PhaseTimer(PROFILE_FRAMES))
+        for _ in range(10):
+            overlay.draw(target)
+        assert target.uploads == 1 + 10
+    finally:
+        target.close()
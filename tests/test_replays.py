@@ -0,0 +1,47 @@
+import asyncio
+import glob
+
+import pytest
+
+from bench import bench_replays, make_corpus
+from main import Replay, FPS
+
+CORPUS = sorted(glob.glob("replays/*.djr"))
+
+@pytest.fixture
+def replays(tmp_path):
+    # recorded by the code under test, so these hold at any REPLAY_VERSION
+    make_corpus(str(tmp_path), 2, FPS * 10, 0)
+    return sorted(glob.glob(str(tmp_path / "*.djr")))
+
+def test_corpus_is_current():
+    # what `python bench.py replay replays/*.djr` reads; regenerate it with
+    # `python bench.py make-corpus replays --count 4` when REPLAY_VERSION changes
+    assert CORPUS
+    for path in CORPUS:
+        assert Replay.load(path).frames
+
+def test_replays_play_the_same_twice(replays):
+    first, _ = asyncio.run(bench_replays(replays, 1, False))
+    second, _ = asyncio.run(bench_replays(replays, 1, False))
+    for path in replays:
+        assert first[path]["frames"] > 0
+        assert (first[path]["frames"], first[path]["score"]) == (second[path]["frames"], second[path]["score"])
+
+def test_replay_round_trip(replays, tmp_path):
+    replay = Replay.load(replays[0])
+    path = tmp_path / "copy.djr"
+    replay.save(path)
+    with open(replays[0], "rb") as original, open(path, "rb") as copy:
+        assert original.read() == copy.read()
+    loaded = Replay.load(path)
+    assert (loaded.seed, loaded.fps, loaded.frames) == (replay.seed, replay.fps, replay.frames)
+    assert loaded.events == replay.events
+
+def test_other_versions_are_refused(replays, tmp_path):
+    data = bytearray(open(replays[0], "rb").read())
+    data[4] += 1
+    path = tmp_path / "newer.djr"
+    path.write_bytes(data)
+    with pytest.raises(ValueError):
+        Replay.load(path)
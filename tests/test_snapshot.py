@@ -0,0 +1,61 @@
+import pytest
+
+from main import World, SnapshotRing
+
+@pytest.mark.parametrize("backend", ["object", "array"])
+def test_snapshot_round_trip(backend, play):
+    world = World(level_backend=backend)
+    world.reset(2)
+    assert play(world, 500)
+    data = world.snapshot()
+    copy = World(level_backend=backend)
+    copy.restore(data)
+    assert copy.snapshot() == data
+    # and they stay in step
+    assert play(world, 300) == play(copy, 300)
+    assert copy.snapshot() == world.snapshot()
+
+def test_snapshot_moves_between_backends(play):
+    world = World()
+    world.reset(2)
+    assert play(world, 500)
+    data = world.snapshot()
+    copy = World(level_backend="array")
+    copy.restore(data)
+    assert copy.snapshot() == data
+    # new platforms and monsters come out the same on both backends too
+    assert play(world, 300) == play(copy, 300)
+    assert copy.snapshot() == world.snapshot()
+
+def test_snapshot_needs_the_same_rate():
+    world = World()
+    world.reset(0)
+    with pytest.raises(ValueError):
+        World(sim_hz=30).restore(world.snapshot())
+
+def test_clone_is_independent(play):
+    world = World(level_backend="array")
+    world.reset(2)
+    assert play(world, 300)
+    copy = world.clone()
+    data = world.snapshot()
+    play(copy, 300)
+    assert world.snapshot() == data
+    play(world, 300)
+    assert world.snapshot() == copy.snapshot()
+
+def test_ring_rewinds(play):
+    world = World()
+    world.reset(4)
+    ring = SnapshotRing(capacity=50)
+    ring.push(world)
+    assert play(world, 100, ring.push)
+    assert len(ring) == 50
+    kept = ring.snapshots[-11]
+    assert ring.rewind(world, 10) == 10
+    assert world.snapshot() == kept
+    assert len(ring) == 40
+    # more than it holds goes back to the oldest
+    oldest = ring.snapshots[0]
+    assert ring.rewind(world, 100) == 39
+    assert world.snapshot() == oldest
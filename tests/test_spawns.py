@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from main import SpawnTable, WorldConfig, SPAWN_FLAGS
+
+# bonuses get likelier up to 100 m and never come on breakable platforms
+TABLE = {
+    "kind": {"normal": 3, "breakable": 1},
+    "bonus": {"none": 4, "bonus": {"weight": [[0, 0], [100, 2]], "not_with": ["breakable"]}},
+}
+OUTCOMES = [("normal", "none"), ("normal", "bonus"), ("breakable", "none"), ("breakable", "bonus")]
+
+def odds(table, metres):
+    # what the alias table gives each outcome: its own share of slot i plus
+    # what the slots aliased to it give up
+    b = min(max(int(metres // table.band), 0), table.last)
+    probability, alias = table.probability[b], table.alias[b]
+    result = [p / table.n for p in probability]
+    for i, p in enumerate(probability):
+        result[alias[i]] += (1 - p) / table.n
+    return result
+
+@pytest.mark.parametrize("metres, expected", [
+    (0, [0.75, 0.0, 0.25, 0.0]),
+    (50, [0.6, 0.15, 0.25, 0.0]),
+    # held flat past the last point
+    (500, [0.5, 0.25, 0.25, 0.0]),
+])
+def test_alias_table_odds(metres, expected):
+    table = SpawnTable(TABLE)
+    assert table.outcomes == OUTCOMES
+    assert odds(table, metres) == pytest.approx(expected)
+
+def test_sampled_frequencies():
+    table = SpawnTable(TABLE)
+    count = 200000
+    uniforms = np.random.default_rng(0).random(count)
+    outcomes = table.sample_many(np.full(count, 50.0), uniforms)
+    frequencies = np.bincount(outcomes, minlength=table.n) / count
+    assert frequencies == pytest.approx([0.6, 0.15, 0.25, 0.0], abs=0.005)
+
+def test_sample_many_matches_sample():
+    table = SpawnTable(TABLE)
+    rng = np.random.default_rng(1)
+    metres = rng.uniform(-20, 150, 5000)
+    uniforms = rng.random(5000)
+    many = table.sample_many(metres, uniforms)
+    assert many.tolist() == [table.sample(m, u) for m, u in zip(metres, uniforms)]
+    assert table.flags_many(many).tolist() == [list(table.flags[i]) for i in many]
+
+def test_default_table_keeps_the_classic_chances():
+    config = WorldConfig()
+    table = SpawnTable.for_config(config)
+    chance = dict(zip(SPAWN_FLAGS, [0.0] * len(SPAWN_FLAGS)))
+    for p, flags in zip(odds(table, 0), table.flags):
+        for flag, on in zip(SPAWN_FLAGS, flags):
+            chance[flag] += p * on
+    normal = config.breakable_platform_chance / (config.breakable_platform_chance + 1)
+    assert chance["breakable"] == pytest.approx(1 - normal)
+    assert chance["bonus"] == pytest.approx(normal / (config.bonus_spawn_chance + 1))
+    assert chance["monster"] == pytest.approx(normal / (config.monster_spawn_chance + 1))
+
+@pytest.mark.parametrize("table", [
+    {"kind": {}},
+    {"kind": {"normal": -1}},
+    {"kind": {"normal": 1}, "bonus": {"bonus": {"weight": 1, "not_with": ["later"]}}},
+    {"kind": {"normal": 0}},
+])
+def test_bad_tables(table):
+    with pytest.raises(ValueError):
+        SpawnTable(table)
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from main import World
+from spectator import (
+    StateEncoder, StateDecoder, SpectatorServer, platform_state, KEYFRAME_INTERVAL, _fake_viewer, _play,
+)
+
+def stream(play, world, frames, encoder):
+    # each step's encoded message next to what a viewer should decode from it
+    sent = []
+
+    def record(world):
+        key, message = encoder.encode(world)
+        player = world.player
+        sent.append((key, message, {
+            "frame": world.clock.frame, "camera_y": world.camera.state.y, "score": world.score,
+            "player": (player.rect.x, player.rect.y, player.current_state),
+            "platforms": platform_state(world),
+            "bullets": [(bullet.rect.x, bullet.rect.y) for bullet in world.level.bullets],
+        }))
+
+    play(world, frames, record)
+    return sent
+
+@pytest.mark.parametrize("backend", ["object", "array"])
+def test_deltas_rebuild_the_world(backend, play):
+    world = World(level_backend=backend)
+    world.reset(2)
+    sent = stream(play, world, KEYFRAME_INTERVAL * 8, StateEncoder())
+    assert len(sent) == KEYFRAME_INTERVAL * 8
+    decoder = StateDecoder()
+    for key, message, state in sent:
+        assert decoder.decode(message) == state
+    keyframes = [len(message) for key, message, _ in sent if key]
+    deltas = [len(message) for key, message, _ in sent if not key]
+    assert len(keyframes) == 8
+    assert sum(deltas) / len(deltas) < sum(keyframes) / len(keyframes)
+
+def test_viewer_that_missed_messages(play):
+    world = World()
+    world.reset(2)
+    sent = stream(play, world, KEYFRAME_INTERVAL * 3, StateEncoder())
+    decoder = StateDecoder()
+    # joining mid-stream, deltas are unreadable until the next keyframe
+    first_key = next(i for i, (key, _, _) in enumerate(sent) if key and i)
+    for _, message, _ in sent[1:first_key]:
+        assert decoder.decode(message) is None
+    # after that, any delta against a seen keyframe decodes on its own
+    for i, (key, message, state) in enumerate(sent[first_key:]):
+        if key or i % 7 == 0:
+            assert decoder.decode(message) == state
+
+def test_new_game_starts_with_a_keyframe(play):
+    world = World()
+    world.reset(2)
+    encoder = StateEncoder()
+    stream(play, world, 10, encoder)
+    world.reset(3)
+    key, _ = encoder.encode(world)
+    assert key
+
+def test_slow_viewer_skips_while_fast_ones_keep_up():
+    frames = KEYFRAME_INTERVAL * 10
+
+    async def run():
+        server = SpectatorServer(port=0)
+        await server.start()
+        stats = [{"messages": 0, "bytes": 0, "undecodable": 0} for _ in range(3)]
+        # the last one reads a message every half second, so it stops reading for the whole game
+        viewers = [asyncio.ensure_future(_fake_viewer(server.port, websocket, delay, counts))
+                   for websocket, delay, counts in zip((False, True, False), (0, 0, 0.5), stats)]
+        while len(server.viewers) < 3:
+            await asyncio.sleep(0.01)
+        world = World()
+        await _play(world, server, frames, False, 2)
+        dropped = sorted(viewer.dropped for viewer in server.viewers)
+        await server.close()
+        await asyncio.gather(*viewers[:2])
+        # what the slow one still has buffered would take minutes to read
+        viewers[2].cancel()
+        await asyncio.gather(viewers[2], return_exceptions=True)
+        return dropped, stats
+
+    dropped, (fast, websocket, slow) = asyncio.run(run())
+    assert dropped[:2] == [0, 0]
+    assert dropped[2] > 0
+    for counts in (fast, websocket):
+        assert counts["messages"] >= frames
+    assert slow["messages"] < frames
+    assert fast["undecodable"] == websocket["undecodable"] == slow["undecodable"] == 0